@@ -0,0 +1,212 @@
+"""Packed model artifact store for cross-validation outputs.
+
+Instead of writing one small joblib file per (site, year, quantile) model, models for a fold are
+appended to a single bundle file. Each model is compressed independently and the bundle ends with
+a JSON index of byte offsets, so a single model can be looked up and unpickled without touching
+the others. Bundles are read through a memory map. The index also records an optional key for each
+model, e.g., the result cache key of the task that trained it, so that an unchanged model can be
+copied from the previous bundle when a fold is rewritten.
+
+Bundle layout:
+
+    [model 0 bytes][model 1 bytes]...[JSON index bytes][8-byte little-endian index offset]
+"""
+
+import io
+import json
+import mmap
+from pathlib import Path
+import struct
+from typing import Any, Iterator
+
+import joblib
+
+BUNDLE_SUFFIX = ".bundle"
+FOOTER = struct.Struct("<Q")
+
+ArtifactKey = tuple[str, int, float]
+# Byte offset, compressed size, and optional key of a model in a bundle
+IndexEntry = tuple[int, int, str | None]
+
+
+def artifact_name(site_id: str, year: int, quantile: float) -> str:
+    """Name of a model within a bundle. Matches the file stems previously used in `models/`."""
+    return f"{site_id}-{year}-{quantile}"
+
+
+class ArtifactWriter:
+    """Writes models to a single bundle file. Use as a context manager so that the index is
+    written when done. Models are written to a temporary file next to the bundle, which replaces
+    the bundle only once the index has been written. If an exception is raised in the `with`
+    block, the temporary file is removed and any existing bundle is left as it was. Until then,
+    models of the existing bundle can be copied over with `reuse`.
+
+    Args:
+        path (Path): Path to the bundle file. Will be overwritten if it exists.
+        compress (int): zlib compression level passed to joblib.dump for each model.
+    """
+
+    def __init__(self, path: Path, compress: int = 3):
+        self.path = Path(path)
+        self.compress = compress
+        self.index: dict[str, IndexEntry] = {}
+        self._tmp_path = self.path.with_suffix(".tmp")
+        self._fp = self._tmp_path.open("wb")
+        # Bundle being replaced, opened on first use by `reuse`
+        self._previous: ArtifactBundle | None = None
+
+    def add(
+        self, site_id: str, year: int, quantile: float, model: Any, key: str | None = None
+    ) -> int:
+        """Compress and append a model to the bundle, recording `key` with it in the index.
+        Returns the compressed size in bytes."""
+        buffer = io.BytesIO()
+        joblib.dump(model, buffer, compress=self.compress)
+        return self._write(artifact_name(site_id, year, quantile), buffer.getvalue(), key)
+
+    def reuse(self, site_id: str, year: int, quantile: float, key: str) -> tuple[Any, int] | None:
+        """Copy a model from the existing bundle at this writer's path if it was written with the
+        same key. The compressed bytes are copied as is, without recompressing.
+
+        Returns:
+            tuple[Any, int] | None: the model and its compressed size in bytes, or None if the
+                existing bundle doesn't have the model with this key
+        """
+        if self._previous is None:
+            if not self.path.exists():
+                return None
+            self._previous = ArtifactBundle(self.path)
+        name = artifact_name(site_id, year, quantile)
+        if self._previous.key(site_id, year, quantile) != key:
+            return None
+        payload = self._previous.payload(site_id, year, quantile)
+        self._write(name, payload, key)
+        return joblib.load(io.BytesIO(payload)), len(payload)
+
+    def _write(self, name: str, payload: bytes, key: str | None) -> int:
+        if name in self.index:
+            raise KeyError(f"Model {name} has already been written to {self.path}")
+        self.index[name] = (self._fp.tell(), len(payload), key)
+        self._fp.write(payload)
+        return len(payload)
+
+    def _close_previous(self):
+        if self._previous is not None:
+            self._previous.close()
+            self._previous = None
+
+    def close(self):
+        """Write the index and footer, close the file, and move it to the bundle path."""
+        if self._fp.closed:
+            return
+        index_offset = self._fp.tell()
+        self._fp.write(json.dumps(self.index).encode("utf-8"))
+        self._fp.write(FOOTER.pack(index_offset))
+        self._fp.close()
+        self._close_previous()
+        self._tmp_path.replace(self.path)
+
+    def abort(self):
+        """Close and remove the partially written file without touching the bundle path."""
+        if self._fp.closed:
+            return
+        self._fp.close()
+        self._close_previous()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "ArtifactWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ArtifactBundle:
+    """Read-only, memory-mapped view of a bundle file written by `ArtifactWriter`. Only the
+    index is parsed on open; models are decompressed and unpickled individually on lookup.
+
+    Args:
+        path (Path): Path to the bundle file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with self.path.open("rb") as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        (index_offset,) = FOOTER.unpack_from(self._mmap, len(self._mmap) - FOOTER.size)
+        self.index: dict[str, IndexEntry] = json.loads(
+            self._mmap[index_offset : len(self._mmap) - FOOTER.size]
+        )
+
+    def load(self, site_id: str, year: int, quantile: float) -> Any:
+        """Load a single model from the bundle."""
+        return joblib.load(io.BytesIO(self.payload(site_id, year, quantile)))
+
+    def payload(self, site_id: str, year: int, quantile: float) -> bytes:
+        """Compressed bytes of a single model."""
+        offset, size = self.index[artifact_name(site_id, year, quantile)][:2]
+        return self._mmap[offset : offset + size]
+
+    def key(self, site_id: str, year: int, quantile: float) -> str | None:
+        """Key recorded with a model, or None if the model isn't in the bundle or has no key.
+        Bundles written before keys were recorded have no keys."""
+        entry = self.index.get(artifact_name(site_id, year, quantile))
+        return entry[2] if entry is not None and len(entry) > 2 else None
+
+    def __contains__(self, key: ArtifactKey) -> bool:
+        return artifact_name(*key) in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self) -> "ArtifactBundle":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ArtifactStore:
+    """Directory of bundles, one per fold or experiment, e.g., `models/2010.bundle`. Bundles are
+    opened lazily and kept open for repeated lookups.
+
+    Args:
+        root (Path): Directory containing bundle files.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._bundles: dict[str, ArtifactBundle] = {}
+
+    def bundle_path(self, name: str | int) -> Path:
+        return self.root / f"{name}{BUNDLE_SUFFIX}"
+
+    def writer(self, name: str | int, compress: int = 3) -> ArtifactWriter:
+        """Get a writer for a new bundle. Any open reader for the same bundle is closed first."""
+        self.root.mkdir(exist_ok=True, parents=True)
+        if (bundle := self._bundles.pop(str(name), None)) is not None:
+            bundle.close()
+        return ArtifactWriter(self.bundle_path(name), compress=compress)
+
+    def bundle(self, name: str | int) -> ArtifactBundle:
+        if str(name) not in self._bundles:
+            self._bundles[str(name)] = ArtifactBundle(self.bundle_path(name))
+        return self._bundles[str(name)]
+
+    def load(self, name: str | int, site_id: str, year: int, quantile: float) -> Any:
+        """Load a single model from the named bundle."""
+        return self.bundle(name).load(site_id, year, quantile)
+
+    def close(self):
+        for bundle in self._bundles.values():
+            bundle.close()
+        self._bundles.clear()
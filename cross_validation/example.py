@@ -1,3 +1,4 @@
+import argparse
 import json
 from pathlib import Path
 from typing import Hashable, Any
@@ -5,17 +6,28 @@ from typing import Hashable, Any
 from loguru import logger
 from tqdm import tqdm
 
-import joblib
 import numpy as np
 import pandas as pd
 from sklearn.metrics import mean_pinball_loss
 from sklearn.model_selection import LeaveOneGroupOut
 from sklearn.ensemble import GradientBoostingRegressor
 
+from artifacts import ArtifactStore
+from features import asof_aggregate, month_key
+from incremental import ExpandingWindowSplit, fit_incremental
+from profiling import TaskProfiler, measure
+from result_cache import ResultCache, task_key
+
 WORKING_DIR = Path(__file__).parent
 DATA_DIR = WORKING_DIR.parent / "data"
 MODELS_DIR = WORKING_DIR / "models"
-MODELS_DIR.mkdir(exist_ok=True)
+CACHE_DIR = WORKING_DIR / "cache"
+
+QUANTILES = [0.1, 0.5, 0.9]
+# Expanding-window CV: number of initial years only used for training, and number of boosting
+# stages added to the previous fold's models when training incrementally
+EXPANDING_MIN_TRAIN_YEARS = 5
+WARM_START_N_ESTIMATORS = 20
 
 
 # Metrics are copied from https://github.com/drivendataorg/water-supply-forecast-rodeo-runtime/blob/main/scoring/score.py
@@ -71,32 +83,213 @@ def preprocess(src_dir: Path, data_dir: Path, preprocessed_dir: Path) -> dict[Ha
     mnf = pd.read_csv(data_dir / "cross_validation_monthly_flow.csv")
     sf = pd.read_csv(data_dir / "cross_validation_submission_format.csv")
     sf["issue_date"] = pd.to_datetime(sf["issue_date"])
-    merged = sf.merge(
-        mnf,
-        left_on=[sf.site_id, sf.issue_date.dt.year],
-        right_on=["site_id", "forecast_year"],
-        how="left",
+    sf["forecast_year"] = sf["issue_date"].dt.year
+
+    # Get mean flow volume for the same water year for months before the `issue_date`'s month
+    mnf["month_key"] = month_key(mnf["year"], mnf["month"])
+    sf["month_key"] = month_key(sf["issue_date"].dt.year, sf["issue_date"].dt.month)
+    agg = asof_aggregate(
+        events=mnf,
+        queries=sf,
+        by=["site_id", "forecast_year"],
+        event_time="month_key",
+        query_time="month_key",
+        value="volume",
+        aggs=("mean", "size"),
     )
-
-    # Filter to flow data that occurs before the `issue_date` in the same `forecast_year`
-    filtered_df = merged[
-        (merged["year"] < merged["issue_date"].dt.year)
-        | (
-            (merged["year"] == merged["issue_date"].dt.year)
-            & (merged["month"] < merged["issue_date"].dt.month)
-        )
-    ]
-    # Get mean flow volume for the same water year up until the `issue_date`
-    mean_volume = filtered_df.groupby(["site_id", "issue_date"]).volume.mean().reset_index()
-    mean_volume["month"] = mean_volume.issue_date.dt.month
+    # Drop rows that have no flow data before the `issue_date`
+    mean_volume = sf.loc[agg["size"] > 0, ["site_id", "issue_date"]].assign(
+        volume=agg["mean"], month=sf["issue_date"].dt.month
+    )
+    mean_volume = mean_volume.sort_values(["site_id", "issue_date"], ignore_index=True)
 
     return {"mean_volume": mean_volume}
 
 
-def main():
+def cross_validate(
+    labels: pd.DataFrame,
+    features: pd.DataFrame,
+    pred_columns: pd.Index,
+    splitter: LeaveOneGroupOut | ExpandingWindowSplit,
+    artifact_store: ArtifactStore,
+    result_cache: ResultCache,
+    profiler: TaskProfiler,
+    cv_mode: str = "logo",
+    incremental: bool = False,
+    profile_memory: bool = False,
+) -> tuple[dict[str, dict[str, float]], list[pd.DataFrame]]:
+    """Train and evaluate a model per site and quantile for each fold of `splitter`. If
+    `incremental` is True, each fold's models continue training from the previous fold's models
+    (see `incremental.fit_incremental`); this is only meaningful with `ExpandingWindowSplit`.
+    Bundles of models for modes other than "logo" are prefixed with the mode name, e.g.,
+    models/expanding-2010.bundle. Fit and predict time, model size, and, if `profile_memory` is
+    True, peak memory for each task are recorded with `profiler`.
+
+    Returns a dictionary of scores for each fold's test year and a list of each fold's predictions.
+    """
+    feature_cols = features.columns
+    scores = {}
+
+    # Keep track of predictions generated for each fold to construct the final submission
+    all_preds = []
+
+    # Most recent model and its cache key for each (site, quantile) when training incrementally
+    previous_models = {}
+
+    for train_indices, test_indices in splitter.split(labels.volume.values, groups=labels.year):
+        # Split labels into train and test
+        train_labels, test_labels = labels.iloc[train_indices], labels.iloc[test_indices]
+        assert test_labels.year.nunique() == 1
+        year = test_labels.year.iloc[0]
+        logger.info(year)
+
+        ## Loop over sites. Here we train a model per site.
+        # You may not need to do this if you have a single model for all sites.
+        # Or you may want to loop over issue dates if you train models per issue dates.
+
+        # Keep track of predictions for each site.
+        site_dfs = []
+        bundle_name = year if cv_mode == "logo" else f"{cv_mode}-{year}"
+        with artifact_store.writer(bundle_name) as artifact_writer:
+            for site in tqdm(test_labels.index.get_level_values("site_id").unique()):
+                # Generate train and test sets for the given site
+                site_train_mask = train_labels.index.get_level_values("site_id") == site
+                site_train_y = train_labels[site_train_mask].copy()
+                site_train_X = site_train_y.merge(
+                    features,
+                    how="left",
+                    left_index=True,
+                    right_index=True,
+                    suffixes=("_labels", None),
+                )[feature_cols].fillna(-1)
+
+                site_test_mask = test_labels.index.get_level_values("site_id") == site
+                site_test_y = test_labels[site_test_mask].copy()
+                site_test_X = site_test_y.merge(
+                    features,
+                    how="left",
+                    left_index=True,
+                    right_index=True,
+                    suffixes=("_labels", None),
+                )[feature_cols].fillna(-1)
+
+                # Train a model and generate predictions for each quantile
+                site_preds = []
+                for quantile in QUANTILES:
+                    params = {"loss": "quantile", "alpha": quantile, "random_state": 8}
+                    previous_model, previous_key = previous_models.get(
+                        (site, quantile), (None, None)
+                    )
+                    key_params = {"estimator": GradientBoostingRegressor.__name__, **params}
+                    if incremental:
+                        # Incremental results also depend on the model they continue from
+                        key_params |= {
+                            "init": previous_key,
+                            "n_new_estimators": WARM_START_N_ESTIMATORS,
+                        }
+                    cache_key = task_key(
+                        key_params,
+                        site_train_X,
+                        site_train_y.volume,
+                        site_test_X,
+                        site_test_y.volume,
+                    )
+                    cached = result_cache.get(bundle_name, cache_key)
+                    if cached is not None:
+                        # Models aren't cached with results. Copy the model from the fold's
+                        # previous bundle if it was trained by the same task.
+                        reused = artifact_writer.reuse(site, year, quantile, cache_key)
+                        if reused is None:
+                            result_cache.discard(bundle_name, cache_key)
+                            cached = None
+                    if cached is None:
+                        ## TRAIN
+                        with measure(profile_memory) as fit_profile:
+                            model = fit_incremental(
+                                GradientBoostingRegressor(**params),
+                                site_train_X.values,
+                                site_train_y.volume.values,
+                                previous=previous_model if incremental else None,
+                                n_new_estimators=WARM_START_N_ESTIMATORS,
+                            )
+
+                        ## TEST
+                        with measure(profile_memory) as predict_profile:
+                            preds = model.predict(site_test_X.values)
+                        task_scores = {
+                            "mean_quantile_loss": 2
+                            * mean_pinball_loss(site_test_y.volume.values, preds, alpha=quantile)
+                        }
+                        task_profile = {
+                            "fit_seconds": fit_profile["seconds"],
+                            "predict_seconds": predict_profile["seconds"],
+                            "peak_memory_bytes": None,
+                        }
+                        if profile_memory:
+                            task_profile["peak_memory_bytes"] = max(
+                                fit_profile["peak_memory_bytes"],
+                                predict_profile["peak_memory_bytes"],
+                            )
+                        result_cache.put(bundle_name, cache_key, preds, task_scores, task_profile)
+
+                        ## SAVE MODELS
+                        model_size = artifact_writer.add(site, year, quantile, model, cache_key)
+                    else:
+                        (model, model_size), preds = reused, cached["predictions"]
+                        # Report the cost from when the cached task was originally run
+                        task_profile = cached.get("profile") or {
+                            "fit_seconds": None,
+                            "predict_seconds": None,
+                            "peak_memory_bytes": None,
+                        }
+                    previous_models[(site, quantile)] = (model, cache_key)
+
+                    profiler.record(
+                        cv_mode,
+                        year,
+                        site,
+                        quantile,
+                        task_profile,
+                        model_size_bytes=model_size,
+                        cached=cached is not None,
+                    )
+
+                    site_preds.append(preds)
+
+                # Cache predictions as a dataframe
+                site_df = pd.DataFrame(
+                    np.column_stack(site_preds),
+                    columns=pred_columns,
+                    index=site_test_X.index,
+                )
+                site_dfs.append(site_df)
+        # Only save the fold's results once its bundle has been written
+        result_cache.flush(bundle_name)
+
+        # Concat and reorder all predictions
+        fold_preds = pd.concat(site_dfs).loc[test_labels.index]
+        all_preds.append(fold_preds)
+
+        # Calculate scores
+        amql = averaged_mean_quantile_loss(test_labels.volume.values, fold_preds.values)
+        ic = interval_coverage(test_labels.volume.values, fold_preds.values)
+        scores[str(year)] = {"averaged_mean_quantile_loss": amql, "interval_coverage": ic}
+
+    return scores, all_preds
+
+
+def main(cv_mode: str = "logo", profile_memory: bool = False):
     """This main function performs year-wise leave-one-out cross-validation over the 20-year
     Hindcast period. It trains a new model for every fold (one water year as test) using
     precalculated features. Finally, it generates a correctly formatted submission csv.
+
+    With `cv_mode` "expanding" or "both", it also performs expanding-window cross-validation,
+    where each fold trains only on earlier years and continues training from the previous fold's
+    models. Scores for the years covered by both modes are logged side by side.
+
+    Fit time, predict time, and model size for each (fold, site, quantile) task are written to
+    cv_profile.json with a summary of the slowest sites. If `profile_memory` is True, peak memory
+    is also measured, at the cost of slower training.
     """
     # Load data. These files can be found on the Final Stage data download page
     # https://www.drivendata.org/competitions/262/reclamation-water-supply-forecast-final/data/
@@ -112,88 +305,90 @@ def main():
         right_on=["site_id", "year"],
         how="left",
     ).set_index(INDEX)
+    pred_columns = submission_format.set_index(INDEX).columns
 
     # Fetch precalcuated features from assets
     assets = preprocess(WORKING_DIR, DATA_DIR, None)
     features = assets["mean_volume"].set_index(INDEX)
-    feature_cols = features.columns
 
     #### CROSS-VALIDATION ####
 
-    # Initialize Leave-One-Group-Out cross-validator
-    # and a dictionary to keep track of scores for each fold
-    logo = LeaveOneGroupOut()
-    scores = {}
+    # Models for each fold are packed into one bundle file, e.g., models/2010.bundle
+    artifact_store = ArtifactStore(MODELS_DIR)
 
-    # Keep track of predictions generated for each fold to construct the final submission
-    all_preds = []
+    # Results for each (fold, site, quantile) are cached by a hash of their data and
+    # hyperparameters so that re-running only retrains tasks whose inputs changed
+    result_cache = ResultCache(CACHE_DIR)
 
-    # Perform Leave-One-Group-Out cross-validation
-    for train_indices, test_indices in logo.split(labels.volume.values, groups=labels.year):
-        # Split labels into train and test
-        train_labels, test_labels = labels.iloc[train_indices], labels.iloc[test_indices]
-        assert test_labels.year.nunique() == 1
-        year = test_labels.year.iloc[0]
-        logger.info(year)
-
-        ## Loop over sites. Here we train a model per site.
-        # You may not need to do this if you have a single model for all sites.
-        # Or you may want to loop over issue dates if you train models per issue dates.
-
-        # Keep track of predictions for each site.
-        site_dfs = []
-        for site in tqdm(test_labels.index.get_level_values("site_id").unique()):
-            # Generate train and test sets for the given site
-            site_train_mask = train_labels.index.get_level_values("site_id") == site
-            site_train_y = train_labels[site_train_mask].copy()
-            site_train_X = site_train_y.merge(
-                features, how="left", left_index=True, right_index=True, suffixes=("_labels", None)
-            )[feature_cols].fillna(-1)
-
-            site_test_mask = test_labels.index.get_level_values("site_id") == site
-            site_test_y = test_labels[site_test_mask].copy()
-            site_test_X = site_test_y.merge(
-                features, how="left", left_index=True, right_index=True, suffixes=("_labels", None)
-            )[feature_cols].fillna(-1)
-
-            # Train a model and generate predictions for each quantile
-            site_preds = []
-            for quantile in [0.1, 0.5, 0.9]:
-                ## TRAIN
-                model = GradientBoostingRegressor(
-                    loss="quantile", alpha=quantile, random_state=8
-                ).fit(site_train_X.values, site_train_y.volume.values)
-
-                ## SAVE MODELS
-                joblib.dump(model, MODELS_DIR / f"{site}-{year}-{quantile}.joblib")
-
-                ## TEST
-                site_preds.append(model.predict(site_test_X.values))
-
-            # Cache predictions as a dataframe
-            site_df = pd.DataFrame(
-                np.column_stack(site_preds),
-                columns=submission_format.set_index(INDEX).columns,
-                index=site_test_X.index,
-            )
-            site_dfs.append(site_df)
+    # Fit time, predict time, peak memory, and model size for each (fold, site, quantile) task
+    profiler = TaskProfiler()
 
-        # Concat and reorder all predictions
-        fold_preds = pd.concat(site_dfs).loc[test_labels.index]
-        all_preds.append(fold_preds)
+    scores = {}
+    if cv_mode in ("logo", "both"):
+        # Perform Leave-One-Group-Out cross-validation
+        scores, all_preds = cross_validate(
+            labels,
+            features,
+            pred_columns,
+            LeaveOneGroupOut(),
+            artifact_store,
+            result_cache,
+            profiler,
+            profile_memory=profile_memory,
+        )
 
-        # Calculate scores
-        amql = averaged_mean_quantile_loss(test_labels.volume.values, fold_preds.values)
-        ic = interval_coverage(test_labels.volume.values, fold_preds.values)
-        scores[str(year)] = {"averaged_mean_quantile_loss": amql, "interval_coverage": ic}
+    expanding_scores = {}
+    if cv_mode in ("expanding", "both"):
+        # Perform expanding-window cross-validation, training incrementally across folds
+        expanding_scores, _ = cross_validate(
+            labels,
+            features,
+            pred_columns,
+            ExpandingWindowSplit(min_train_groups=EXPANDING_MIN_TRAIN_YEARS),
+            artifact_store,
+            result_cache,
+            profiler,
+            cv_mode="expanding",
+            incremental=True,
+            profile_memory=profile_memory,
+        )
 
+    artifact_store.close()
+    logger.info(
+        "Reused {} cached task results, trained {} tasks", result_cache.hits, result_cache.misses
+    )
     for year, d in scores.items():
         logger.info(
             f"{year} - amql: {d['averaged_mean_quantile_loss']} / " f"ic: {d['interval_coverage']}"
         )
+    for year, d in expanding_scores.items():
+        msg = (
+            f"{year} expanding - amql: {d['averaged_mean_quantile_loss']} / "
+            f"ic: {d['interval_coverage']}"
+        )
+        if year in scores:
+            msg += f" (logo amql: {scores[year]['averaged_mean_quantile_loss']})"
+        logger.info(msg)
+
+    # Profile of each task and the sites that dominate training cost
+    profile_path = WORKING_DIR / "cv_profile.json"
+    logger.info("Writing task profiles to {}", profile_path)
+    profiler.write(profile_path)
+    for site, row in profiler.site_summary().head(5).iterrows():
+        logger.info(
+            f"{site} - fit: {row['fit_seconds']:.2f}s / predict: {row['predict_seconds']:.2f}s / "
+            f"share of total: {row['share_of_total_seconds']:.1%}"
+        )
 
     # You can write scores out to analyze later. Feel free to save additional information,
     # e.g. performance for each site
+    if expanding_scores:
+        expanding_scores_path = WORKING_DIR / "cv_scores_expanding.json"
+        logger.info("Writing expanding-window scores to {}", expanding_scores_path)
+        expanding_scores_path.write_text(json.dumps(expanding_scores, indent=2))
+    if not scores:
+        return
+
     scores_path = WORKING_DIR / "cv_scores.json"
     logger.info("Writing scores to {}", scores_path)
     scores_path.write_text(json.dumps(scores, indent=2))
@@ -213,6 +408,27 @@ def main():
     ic = interval_coverage(labels.volume.values, submission.values)
     logger.info(f"overall - amql: {amql} / " f"ic: {ic}")
 
+    if expanding_scores:
+        # Compare both modes over the years that expanding-window CV has folds for
+        years = list(expanding_scores)
+        for name, mode_scores in (("logo", scores), ("expanding", expanding_scores)):
+            amql = np.mean([mode_scores[y]["averaged_mean_quantile_loss"] for y in years])
+            ic = np.mean([mode_scores[y]["interval_coverage"] for y in years])
+            logger.info(f"{name} ({years[0]}-{years[-1]}) - amql: {amql} / ic: {ic}")
+
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Run cross-validation for the example model.")
+    parser.add_argument(
+        "--cv-mode",
+        choices=("logo", "expanding", "both"),
+        default="logo",
+        help="Leave-one-year-out (logo), expanding-window with incremental training, or both.",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Measure peak memory of each task with tracemalloc. Slows down training.",
+    )
+    args = parser.parse_args()
+    main(cv_mode=args.cv_mode, profile_memory=args.profile_memory)
@@ -0,0 +1,100 @@
+"""Vectorized feature helpers for the cross-validation example."""
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+AGGREGATIONS = ("sum", "mean", "count", "size")
+
+
+def month_key(year: np.ndarray | pd.Series, month: np.ndarray | pd.Series) -> np.ndarray:
+    """Integer key that orders (year, month) pairs, i.e., months since year 0."""
+    return np.asarray(year, dtype="int64") * 12 + np.asarray(month, dtype="int64")
+
+
+def _time_values(values: np.ndarray | pd.Series) -> np.ndarray:
+    """Convert datetimes or integers to comparable int64 values."""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").view("int64")
+    return values.astype("int64")
+
+
+def asof_aggregate(
+    events: pd.DataFrame,
+    queries: pd.DataFrame,
+    by: Sequence[str],
+    event_time: str,
+    query_time: str,
+    value: str,
+    aggs: Sequence[str] = ("mean",),
+) -> pd.DataFrame:
+    """For each query row, aggregate `value` over the event rows with the same `by` keys whose
+    `event_time` is strictly before the query's `query_time`.
+
+    This is equivalent to merging queries with events on `by`, filtering to earlier events, and
+    grouping by the query rows, but never materializes the merged cross product. Events are
+    sorted once by (group, time) and cumulative sums are taken; each query is then answered with
+    a `searchsorted` for its boundary and a subtraction of two prefix sums.
+
+    Times may be integers (e.g., from `month_key` for monthly data) or datetimes (e.g., for daily
+    data). Missing values are skipped the same way as pandas' groupby aggregations.
+
+    Args:
+        events (pd.DataFrame): Time series rows with columns `by`, `event_time`, and `value`.
+        queries (pd.DataFrame): Rows to compute features for with columns `by` and `query_time`.
+        by (Sequence[str]): Columns identifying a time series, e.g., ["site_id", "forecast_year"].
+        event_time (str): Column in events with the time an event becomes available.
+        query_time (str): Column in queries with the time of the query, e.g., issue date.
+        value (str): Column in events to aggregate.
+        aggs (Sequence[str]): Any of "sum", "mean", "count" (number of non-missing values), and
+            "size" (number of events including missing values).
+
+    Returns:
+        pd.DataFrame: Dataframe with one column per aggregation, aligned to the index of queries.
+    """
+    by = list(by)
+    unknown = set(aggs) - set(AGGREGATIONS)
+    if unknown:
+        raise ValueError(f"Unknown aggregations: {sorted(unknown)}")
+
+    # Assign shared integer group codes to event and query rows
+    codes = pd.concat([events[by], queries[by]], ignore_index=True).groupby(by).ngroup().values
+    event_groups, query_groups = codes[: len(events)], codes[len(events) :]
+
+    # Replace times by their rank among distinct event times so that (group, time) can be encoded
+    # into a single sortable int64 key
+    event_times = _time_values(events[event_time])
+    unique_times = np.unique(event_times)
+    stride = len(unique_times) + 1
+    event_keys = event_groups * stride + np.searchsorted(unique_times, event_times, side="left")
+    query_keys = query_groups * stride + np.searchsorted(
+        unique_times, _time_values(queries[query_time]), side="left"
+    )
+
+    order = np.argsort(event_keys, kind="stable")
+    event_keys = event_keys[order]
+    values = events[value].to_numpy(dtype="float64")[order]
+    is_valid = ~np.isnan(values)
+
+    # Prefix sums with a leading zero so that sum over [start, stop) is csum[stop] - csum[start]
+    csum = np.concatenate(([0.0], np.cumsum(np.where(is_valid, values, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(is_valid)))
+
+    # Events before the query are in [start, stop): start is the beginning of the query's group
+    stop = np.searchsorted(event_keys, query_keys, side="left")
+    start = np.searchsorted(event_keys, query_groups * stride, side="left")
+    # Queries whose keys did not match any group (e.g., missing keys) get no events
+    no_group = query_groups < 0
+    stop[no_group] = start[no_group]
+
+    total = csum[stop] - csum[start]
+    count = ccount[stop] - ccount[start]
+    results = {
+        "sum": total,
+        "mean": np.divide(total, count, out=np.full(len(total), np.nan), where=count > 0),
+        "count": count,
+        "size": stop - start,
+    }
+    return pd.DataFrame({agg: results[agg] for agg in aggs}, index=queries.index)
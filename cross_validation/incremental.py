@@ -0,0 +1,79 @@
+"""Expanding-window (forward-chaining) cross-validation with incremental training.
+
+In leave-one-year-out cross-validation every fold trains on all other years, including future
+ones, so each fold's models are trained from scratch. With an expanding window, each fold tests
+on one year and trains only on the years before it, which matches the operational forecasting
+setup. Since consecutive folds' training sets are nested, estimators that support it can continue
+training from the previous fold's model instead of starting over.
+"""
+
+import copy
+from typing import Any, Iterator
+
+import numpy as np
+
+
+class ExpandingWindowSplit:
+    """Cross-validator where each fold tests on one group (e.g., year) and trains on all groups
+    that sort before it. Has the same `split` interface as scikit-learn's `LeaveOneGroupOut`.
+
+    Args:
+        min_train_groups (int): Number of initial groups that are only used for training.
+    """
+
+    def __init__(self, min_train_groups: int = 1):
+        if min_train_groups < 1:
+            raise ValueError("min_train_groups must be at least one")
+        self.min_train_groups = min_train_groups
+
+    def split(self, X, y=None, groups=None) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        if groups is None:
+            raise ValueError("The 'groups' parameter should not be None.")
+        groups = np.asarray(groups)
+        unique_groups = np.unique(groups)
+        for test_group in unique_groups[self.min_train_groups :]:
+            yield np.flatnonzero(groups < test_group), np.flatnonzero(groups == test_group)
+
+    def get_n_splits(self, X=None, y=None, groups=None) -> int:
+        return max(len(np.unique(groups)) - self.min_train_groups, 0)
+
+
+def supports_incremental_fit(estimator: Any) -> bool:
+    """Whether `fit_incremental` can continue training from a previous fit of this estimator."""
+    # scikit-learn ensembles (GradientBoosting*, RandomForest*, ...) via warm_start, or
+    # LightGBM's scikit-learn API via init_model
+    return "warm_start" in estimator.get_params() or hasattr(estimator, "booster_")
+
+
+def fit_incremental(
+    estimator: Any,
+    X: np.ndarray,
+    y: np.ndarray,
+    previous: Any | None = None,
+    n_new_estimators: int = 20,
+) -> Any:
+    """Fit an estimator, continuing from a previously fitted model when possible.
+
+    - Estimators with a `warm_start` parameter: a copy of the previous model is refit with
+      `warm_start=True` and `n_new_estimators` more estimators, which are fit on the new data.
+    - LightGBM estimators: the unfitted estimator is fit with the previous model's booster as
+      `init_model`, adding the estimator's own `n_estimators` rounds.
+    - Otherwise, or if there is no previous model, the estimator is fit from scratch.
+
+    Args:
+        estimator: Unfitted estimator with the desired hyperparameters.
+        X (np.ndarray): Training features
+        y (np.ndarray): Training labels
+        previous: Fitted model from the previous fold, or None. Not modified.
+        n_new_estimators (int): Number of estimators to add for warm_start estimators.
+
+    Returns:
+        Fitted model
+    """
+    if previous is None or not supports_incremental_fit(previous):
+        return estimator.fit(X, y)
+    if "warm_start" in previous.get_params():
+        model = copy.deepcopy(previous)
+        model.set_params(warm_start=True, n_estimators=previous.n_estimators + n_new_estimators)
+        return model.fit(X, y)
+    return estimator.fit(X, y, init_model=previous.booster_)
@@ -0,0 +1,103 @@
+"""Resource and timing profiling for cross-validation tasks."""
+
+from contextlib import contextmanager
+import json
+from pathlib import Path
+import time
+import tracemalloc
+from typing import Any, Iterator
+
+import pandas as pd
+
+
+@contextmanager
+def measure(trace_memory: bool = False) -> Iterator[dict[str, float | None]]:
+    """Context manager that measures wall time of the enclosed block and, optionally, its peak
+    traced memory. The yielded dictionary is populated with "seconds" and "peak_memory_bytes" on
+    exit. Memory is measured with tracemalloc, which includes NumPy array allocations but slows
+    down allocation-heavy code considerably, so "peak_memory_bytes" is None unless
+    `trace_memory` is True.
+    """
+    result = {}
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace_memory:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
+        result["peak_memory_bytes"] = None
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            result["peak_memory_bytes"] = max(peak - baseline, 0)
+        if started_tracing:
+            tracemalloc.stop()
+
+
+class TaskProfiler:
+    """Collects a profile record for each (cv_mode, fold, site, quantile) task."""
+
+    def __init__(self):
+        self.records: list[dict[str, Any]] = []
+
+    def record(
+        self,
+        cv_mode: str,
+        fold: int,
+        site_id: str,
+        quantile: float,
+        profile: dict[str, float],
+        model_size_bytes: int,
+        cached: bool,
+    ):
+        """Add a task record. `profile` has keys "fit_seconds", "predict_seconds", and
+        "peak_memory_bytes" (None if not measured). For cached tasks, it is the profile from when
+        the task was run."""
+        self.records.append(
+            {
+                "cv_mode": cv_mode,
+                "fold": int(fold),
+                "site_id": site_id,
+                "quantile": quantile,
+                **profile,
+                "model_size_bytes": model_size_bytes,
+                "cached": cached,
+            }
+        )
+
+    def site_summary(self) -> pd.DataFrame:
+        """Per-site totals across folds and quantiles, sorted from slowest to fastest."""
+        df = pd.DataFrame.from_records(self.records).astype(
+            {
+                "fit_seconds": "float64",
+                "predict_seconds": "float64",
+                "peak_memory_bytes": "float64",
+            }
+        )
+        summary = df.groupby("site_id").agg(
+            fit_seconds=("fit_seconds", "sum"),
+            predict_seconds=("predict_seconds", "sum"),
+            max_peak_memory_bytes=("peak_memory_bytes", "max"),
+            total_model_size_bytes=("model_size_bytes", "sum"),
+            n_tasks=("fit_seconds", "size"),
+        )
+        summary["total_seconds"] = summary["fit_seconds"] + summary["predict_seconds"]
+        summary["share_of_total_seconds"] = (
+            summary["total_seconds"] / summary["total_seconds"].sum()
+        )
+        return summary.sort_values("total_seconds", ascending=False)
+
+    def write(self, path: Path, n_slowest: int = 10):
+        """Write all task records and a summary of the slowest sites to a JSON file."""
+        summary = self.site_summary().head(n_slowest).reset_index()
+        # Use null instead of NaN for JSON
+        summary = summary.astype(object).where(summary.notna(), None)
+        out = {
+            "slowest_sites": summary.to_dict(orient="records"),
+            "tasks": self.records,
+        }
+        Path(path).write_text(json.dumps(out, indent=2))
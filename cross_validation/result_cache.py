@@ -0,0 +1,112 @@
+"""Content-addressed cache for cross-validation task results.
+
+Each (fold, site, quantile) task is keyed by a hash of its training rows, test features, and
+model hyperparameters. When none of those change between runs, the cached predictions and scores
+are reused instead of retraining. Fitted models aren't cached here, since they are already saved
+in the fold's artifact bundle with their task key (see `artifacts.ArtifactWriter.reuse`).
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+import joblib
+import numpy as np
+import pandas as pd
+
+
+def _hash_frame(hasher, obj: pd.DataFrame | pd.Series):
+    """Update hasher with the values, index, and column labels of a pandas object."""
+    hasher.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    if isinstance(obj, pd.DataFrame):
+        hasher.update(json.dumps([str(c) for c in obj.columns]).encode("utf-8"))
+
+
+def task_key(params: dict[str, Any], *data: pd.DataFrame | pd.Series) -> str:
+    """Compute the cache key for a task from its hyperparameters and data.
+
+    Args:
+        params (dict[str, Any]): Estimator class name and hyperparameters. Must be JSON
+            serializable.
+        *data (pd.DataFrame | pd.Series): Everything the task result depends on, e.g., training
+            features and labels, test features, and test labels used for scoring.
+
+    Returns:
+        str: hex digest
+    """
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    for obj in data:
+        _hash_frame(hasher, obj)
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """Directory of cached task results, one joblib file per fold, e.g., `cache/2010.joblib`.
+    Each file is a dict of entries by task key, and each entry is a dict with keys "predictions",
+    "scores", and "profile". A fold's file is loaded on its first lookup, and the entries looked
+    up or added since are written with `flush` once the fold is done. Entries that weren't used
+    are dropped then, since their models are no longer in the fold's bundle.
+
+    Args:
+        root (Path): Cache directory.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(exist_ok=True, parents=True)
+        self.hits = 0
+        self.misses = 0
+        # Entries of each fold's file, and the entries used in this run to be written back
+        self._saved: dict[str, dict[str, dict[str, Any]]] = {}
+        self._pending: dict[str, dict[str, dict[str, Any]]] = {}
+
+    def path(self, fold: str | int) -> Path:
+        return self.root / f"{fold}.joblib"
+
+    def get(self, fold: str | int, key: str) -> dict[str, Any] | None:
+        """Return cached entry for key, or None if the task has not been run before."""
+        fold = str(fold)
+        if fold not in self._saved:
+            path = self.path(fold)
+            self._saved[fold] = joblib.load(path) if path.exists() else {}
+        entry = self._saved[fold].get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._pending.setdefault(fold, {})[key] = entry
+        return entry
+
+    def discard(self, fold: str | int, key: str):
+        """Drop an entry returned by `get` that can't be reused, e.g., because its model is no
+        longer in the fold's bundle. The lookup is counted as a miss instead of a hit."""
+        del self._pending[str(fold)][key]
+        self.hits -= 1
+        self.misses += 1
+
+    def put(
+        self,
+        fold: str | int,
+        key: str,
+        predictions: np.ndarray,
+        scores: dict[str, float],
+        profile: dict[str, float] | None = None,
+    ):
+        self._pending.setdefault(str(fold), {})[key] = {
+            "predictions": predictions,
+            "scores": scores,
+            "profile": profile,
+        }
+
+    def flush(self, fold: str | int):
+        """Write the entries looked up or added for a fold since it was first looked up."""
+        fold = str(fold)
+        entries = self._pending.pop(fold, {})
+        self._saved.pop(fold, None)
+        # Write to a temporary file first so an interrupted run doesn't leave a corrupt file
+        path = self.path(fold)
+        tmp_path = path.with_suffix(".tmp")
+        joblib.dump(entries, tmp_path)
+        tmp_path.replace(path)
@@ -0,0 +1,43 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+from wsfr_read.basin_attributes import (
+    get_basin_atlas_attributes,
+    get_basin_atlas_path,
+    read_basin_atlas_attributes,
+)
+from wsfr_read.basin_attributes.basin_atlas import _load_basin_atlas_attributes
+from wsfr_read.sites import read_geospatial
+
+
+def test_get_basin_atlas_attributes(tmp_path):
+    df = get_basin_atlas_attributes(level=12, cache_dir=tmp_path)
+    basins_gdf = read_geospatial("basins")
+    assert list(df.index) == list(basins_gdf["site_id"])
+    assert df.columns[:2].tolist() == ["n_subbasins", "covered_fraction"]
+    assert not any(col.isupper() for col in df.columns)
+
+    # Same as intersecting the full layer with each basin
+    subbasins_gdf = gpd.read_file(get_basin_atlas_path(), layer="BasinATLAS_v10_lev12")
+    subbasins_gdf = subbasins_gdf.to_crs("EPSG:5070")
+    basins = basins_gdf.set_index("site_id").to_crs("EPSG:5070").geometry
+    for site_id, basin in basins.iloc[:3].items():
+        areas = subbasins_gdf.geometry.intersection(basin).area
+        overlapping_df = subbasins_gdf[areas > 0]
+        areas = areas[areas > 0]
+        series = read_basin_atlas_attributes(site_id, level=12, cache_dir=tmp_path)
+        assert series["n_subbasins"] == len(overlapping_df)
+        np.testing.assert_allclose(series["covered_fraction"], areas.sum() / basin.area)
+        is_valid = overlapping_df["for_pc_sse"] != -999
+        np.testing.assert_allclose(
+            series["for_pc_sse"],
+            np.average(overlapping_df["for_pc_sse"][is_valid], weights=areas[is_valid]),
+        )
+        class_areas = areas.groupby(overlapping_df["clz_cl_smj"]).sum()
+        assert series["clz_cl_smj"] == class_areas.idxmax()
+
+    # Saved and loaded from the cache directory
+    saved_path = tmp_path / "basin_atlas" / "lev12_basin_attributes.parquet"
+    assert saved_path.exists()
+    pd.testing.assert_frame_equal(_load_basin_atlas_attributes(12, tmp_path), df)
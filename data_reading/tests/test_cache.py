@@ -0,0 +1,53 @@
+import os
+
+import pandas as pd
+
+from wsfr_read import cache_clear, cache_info
+from wsfr_read.cache import FileCache, _estimate_nbytes
+from wsfr_read.sites import read_spatial_index
+from wsfr_read.teleconnections import read_monthly_teleconnections, read_pdo_data
+
+
+def test_file_cache(tmp_path):
+    paths = [tmp_path / f"{i}.csv" for i in range(3)]
+    for i, path in enumerate(paths):
+        pd.DataFrame({"x": range(100 * (i + 1))}).to_csv(path, index=False)
+
+    file_cache = FileCache(max_bytes=4_000)
+    df = file_cache.get_or_load(paths[0], pd.read_csv, paths[0])
+    assert file_cache.get_or_load(paths[0], pd.read_csv, paths[0]) is df
+    assert (file_cache.hits, file_cache.misses) == (1, 1)
+
+    # Changed file is reloaded
+    pd.DataFrame({"x": range(50)}).to_csv(paths[0], index=False)
+    os.utime(paths[0], ns=(0, 0))
+    reloaded_df = file_cache.get_or_load(paths[0], pd.read_csv, paths[0])
+    assert reloaded_df is not df
+    assert len(reloaded_df) == 50
+    assert file_cache.info().entries == 1
+
+    # Least recently used entries are evicted when over budget
+    for path in paths[1:]:
+        file_cache.get_or_load(path, pd.read_csv, path)
+    info = file_cache.info()
+    assert info.current_bytes <= info.max_bytes
+    assert info.evictions > 0
+    file_cache.get_or_load(paths[2], pd.read_csv, paths[2])
+    assert file_cache.info().hits == 2
+
+
+def test_cache_info():
+    cache_clear()
+    df = read_pdo_data("2021-03-15")
+    pd.testing.assert_frame_equal(read_pdo_data("2021-03-15"), df)
+    info = cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+    assert info.current_bytes > 0
+
+
+def test_estimate_nbytes_of_indexes():
+    teleconnections = read_monthly_teleconnections()
+    assert _estimate_nbytes(teleconnections) > 2 * teleconnections.values.nbytes
+    basins_index = read_spatial_index("basins")
+    assert _estimate_nbytes(basins_index) > 16 * 4 * len(basins_index.geometries)
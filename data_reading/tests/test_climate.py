@@ -1,6 +1,16 @@
 import pandas as pd
 
-from wsfr_read.climate.cpc_outlooks import read_cpc_outlooks_precip, read_cpc_outlooks_temp
+from wsfr_read import cache_clear
+from wsfr_read.climate.cpc_outlooks import (
+    CPCOutlooksIndex,
+    _parse_outlook_for_year,
+    _read_outlook_for_year,
+    compile_cpc_outlooks,
+    get_site_climate_divisions,
+    read_cpc_outlooks_precip,
+    read_cpc_outlooks_temp,
+)
+from wsfr_read.sites import read_metadata
 
 
 def test_read_cpc_outlooks():
@@ -43,3 +53,45 @@ def test_read_cpc_outlooks():
                     assert pd.api.types.is_integer_dtype(df.index.get_level_values(ind))
             for col in df.columns:
                 assert pd.api.types.is_float_dtype(df[col])
+
+
+def test_compile_cpc_outlooks(tmp_path):
+    compiled_paths = compile_cpc_outlooks(cache_dir=tmp_path)
+    assert len(compiled_paths) > 0
+    assert all(path.exists() for path in compiled_paths)
+    for variable in ("temp", "precip"):
+        cache_clear()
+        compiled_df = _read_outlook_for_year(2010, variable, cache_dir=tmp_path)
+        pd.testing.assert_frame_equal(compiled_df, _parse_outlook_for_year(2010, variable))
+        # Second read is served from memory
+        assert _read_outlook_for_year(2010, variable, cache_dir=tmp_path) is compiled_df
+
+
+def test_get_site_climate_divisions(tmp_path):
+    cache_clear()
+    site_climate_divisions = get_site_climate_divisions(cache_dir=tmp_path)
+    assert set(site_climate_divisions) == set(read_metadata().index)
+    assert set(site_climate_divisions["hungry_horse_reservoir_inflow"]) == {20, 21}
+    assert all(len(cds) > 0 for cds in site_climate_divisions.values())
+    # Saved mapping is loaded in a new process
+    cache_clear()
+    assert get_site_climate_divisions(cache_dir=tmp_path) == site_climate_divisions
+
+
+def test_cpc_outlooks_index():
+    submission_format = pd.DataFrame(
+        {
+            "site_id": ["hungry_horse_reservoir_inflow"] * 3,
+            "issue_date": pd.to_datetime(["2011-01-01", "2011-03-15", "2013-07-22"]),
+        }
+    )
+    for variable, reader_fn in (
+        ("temp", read_cpc_outlooks_temp),
+        ("precip", read_cpc_outlooks_precip),
+    ):
+        index = CPCOutlooksIndex.from_submission_format(variable, submission_format)
+        for site_id, issue_date, df in index.iter_submission_format(submission_format):
+            assert df.index.get_level_values("issue_date").is_monotonic_increasing
+            pd.testing.assert_frame_equal(
+                df.sort_index(), reader_fn(issue_date, site_id=site_id).sort_index()
+            )
@@ -0,0 +1,88 @@
+import os
+import shutil
+
+import netCDF4
+import numpy as np
+import pandas as pd
+import shapely
+
+from wsfr_read.config import DATA_ROOT
+from wsfr_read.drought import grace_indicators, read_grace_indicators, read_pdsi
+from wsfr_read.sites import read_geospatial
+
+
+def _area_weighted_mean(values, lon, lat, geometry, cell_size):
+    """Area-weighted mean of a full grid over a geometry."""
+    lat_grid, lon_grid = np.meshgrid(lat, lon, indexing="ij")
+    half = cell_size / 2
+    cells = shapely.box(lon_grid - half, lat_grid - half, lon_grid + half, lat_grid + half)
+    weights = shapely.area(shapely.intersection(cells, geometry)) * np.cos(np.deg2rad(lat_grid))
+    is_valid = ~np.isnan(values) & (weights > 0)
+    return (values[is_valid] * weights[is_valid]).sum() / weights[is_valid].sum()
+
+
+def test_read_grace_indicators():
+    basins = read_geospatial("basins").set_index("site_id").geometry
+    paths = sorted((DATA_ROOT / "grace_indicators" / "FY2021").glob("*.nc4"))
+    for site_id in basins.index[:3]:
+        df = read_grace_indicators(site_id, "2021-01-20")
+        assert list(df.columns) == ["gws_inst", "rtzsm_inst", "sfsm_inst"]
+        assert df.index.name == "date"
+        assert df.index.is_monotonic_increasing
+        assert df.index.max() < pd.Timestamp("2021-01-20")
+        assert len(df) == sum(path.name.split(".")[1] < "A20210120" for path in paths)
+
+        # Same as the area-weighted mean of the full grid
+        date = df.index[-1]
+        path = next(path for path in paths if f"A{date:%Y%m%d}" in path.name)
+        with netCDF4.Dataset(path) as ds:
+            lon = ds.variables["lon"][:].astype("float64")
+            lat = ds.variables["lat"][:].astype("float64")
+            for variable in df.columns:
+                values = np.ma.filled(ds.variables[variable][0].astype("float64"), np.nan)
+                expected = _area_weighted_mean(values, lon, lat, basins[site_id], 0.125)
+                np.testing.assert_allclose(df.loc[date, variable], expected)
+
+
+def test_grace_rewritten_file(tmp_path, monkeypatch):
+    shutil.copytree(DATA_ROOT / "grace_indicators" / "FY2021", tmp_path / "FY2021")
+    monkeypatch.setattr(grace_indicators, "GRACE_DIR", tmp_path)
+    site_id = read_geospatial("basins")["site_id"].iloc[0]
+    df = read_grace_indicators(site_id, "2021-08-01")
+
+    # Rewrite the last file in place like the downloader does
+    path = sorted((tmp_path / "FY2021").glob("*.nc4"))[-1]
+    dir_mtime_ns = path.parent.stat().st_mtime_ns
+    with netCDF4.Dataset(path, "r+") as ds:
+        ds.variables["gws_inst"][:] = 50.0
+    mtime_ns = path.stat().st_mtime_ns + 10**9
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    assert path.parent.stat().st_mtime_ns == dir_mtime_ns
+
+    rewritten_df = read_grace_indicators(site_id, "2021-08-01")
+    assert df["gws_inst"].iloc[-1] != 50.0
+    np.testing.assert_allclose(rewritten_df["gws_inst"].iloc[-1], 50.0)
+    pd.testing.assert_frame_equal(rewritten_df.iloc[:-1], df.iloc[:-1])
+
+
+def test_read_pdsi():
+    basins = read_geospatial("basins").set_index("site_id").geometry
+    path = next((DATA_ROOT / "pdsi" / "FY2021").glob("pdsi_*.nc"))
+    with netCDF4.Dataset(path) as ds:
+        lon = ds.variables["lon"][:].astype("float64")
+        lat = ds.variables["lat"][:].astype("float64")
+        dates = pd.Timestamp("1900-01-01") + pd.to_timedelta(ds.variables["day"][:], unit="D")
+        variable = ds.variables["daily_mean_palmer_drought_severity_index"]
+        for site_id in basins.index[:3]:
+            df = read_pdsi(site_id, "2021-01-20")
+            assert list(df.columns) == ["pdsi"]
+            assert df.index.name == "date"
+            assert df.index.is_monotonic_increasing
+            assert len(df) == (dates < pd.Timestamp("2021-01-20")).sum()
+
+            # Same as the area-weighted mean of the full grid
+            position = len(df) - 1
+            assert df.index[-1] == dates[position]
+            values = np.ma.filled(variable[position].astype("float64"), np.nan)
+            expected = _area_weighted_mean(values, lon, lat, basins[site_id], 1 / 24)
+            np.testing.assert_allclose(df["pdsi"].iloc[-1], expected)
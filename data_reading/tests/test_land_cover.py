@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import rasterio
+import rasterio.features
+import shapely
+
+from wsfr_read.land_cover import (
+    build_nlcd_impervious_summary,
+    list_nlcd_impervious_members,
+    read_nlcd_impervious,
+    read_nlcd_release_dates,
+)
+from wsfr_read.land_cover.nlcd_impervious import ZIP_FILE
+from wsfr_read.sites import read_geospatial
+
+
+def test_build_nlcd_impervious_summary(tmp_path):
+    summary_path = build_nlcd_impervious_summary(cache_dir=tmp_path)
+    summary_df = pd.read_parquet(summary_path)
+    members = list_nlcd_impervious_members()
+    basins_gdf = read_geospatial("basins")
+    assert len(summary_df) == len(members) * len(basins_gdf)
+
+    # Same as a brute-force mask of each basin's window with the projected basin polygon, for the
+    # smallest basins so that the windows stay small on the 30 m grid
+    member = members[-1]
+    year_df = summary_df[summary_df["year"] == member.year].set_index("site_id")
+    with rasterio.open(f"/vsizip/{ZIP_FILE}/{member.name}") as src:
+        geometries = basins_gdf.geometry.to_crs(src.crs)
+        smallest = geometries.to_crs("EPSG:5070").area.nsmallest(3).index
+        for site_id, geometry in zip(basins_gdf.loc[smallest, "site_id"], geometries[smallest]):
+            window = rasterio.features.geometry_window(src, [geometry])
+            values = src.read(1, window=window)
+            cols, rows = np.meshgrid(np.arange(window.width) + 0.5, np.arange(window.height) + 0.5)
+            xx, yy = src.window_transform(window) * (cols, rows)
+            basin_values = values[shapely.contains_xy(geometry, xx, yy)]
+            assert year_df.loc[site_id, "n_cells"] == len(basin_values)
+            basin_values = basin_values[basin_values <= 100]
+            assert year_df.loc[site_id, "impervious_count"] == len(basin_values)
+            np.testing.assert_allclose(
+                year_df.loc[site_id, "impervious_fraction"], basin_values.mean() / 100
+            )
+
+    # Rebuilding skips years that were already summarized
+    mtime = summary_path.stat().st_mtime_ns
+    assert build_nlcd_impervious_summary(cache_dir=tmp_path) == summary_path
+    assert summary_path.stat().st_mtime_ns == mtime
+
+    # Only years released before the issue date
+    release_dates = read_nlcd_release_dates()
+    site_id = basins_gdf["site_id"].iloc[0]
+    issue_date = release_dates.iloc[-1]
+    df = read_nlcd_impervious(site_id, issue_date, cache_dir=tmp_path)
+    assert df.index.name == "year"
+    assert list(df.columns) == [
+        "release_date",
+        "impervious_fraction",
+        "impervious_count",
+        "n_cells",
+    ]
+    assert list(df.index) == list(release_dates.index[:-1])
+    assert (df["release_date"] < issue_date).all()
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from wsfr_read.streamflow import (
+    read_test_monthly_naturalized_flow,
+    read_test_monthly_naturalized_flow_batch,
+)
+
+
+def test_read_test_monthly_naturalized_flow():
+    df = read_test_monthly_naturalized_flow("hungry_horse_reservoir_inflow", "2021-03-15")
+    assert list(df.index.names) == ["year", "month"]
+    assert list(df.columns) == ["volume"]
+    assert df.shape[0] > 0
+    assert df.index.is_monotonic_increasing
+    assert df.index[0] == (2020, 10)
+    assert df.index[-1] == (2021, 2)
+
+
+def test_read_test_monthly_naturalized_flow_batch():
+    site_ids = ["hungry_horse_reservoir_inflow", "animas_r_at_durango", "animas_r_at_durango"]
+    issue_dates = ["2021-03-15", "2019-01-01", "2020-03-15"]
+    batch_df = read_test_monthly_naturalized_flow_batch(site_ids, issue_dates)
+    assert list(batch_df.index.names) == ["site_id", "issue_date", "year", "month"]
+    for site_id, issue_date in zip(site_ids[:2], issue_dates[:2]):
+        pd.testing.assert_frame_equal(
+            batch_df.loc[(site_id, pd.Timestamp(issue_date))],
+            read_test_monthly_naturalized_flow(site_id, issue_date),
+        )
+    # No test data for even forecast years
+    assert ("animas_r_at_durango", pd.Timestamp("2020-03-15")) not in batch_df.index.droplevel(
+        ["year", "month"]
+    )
@@ -0,0 +1,70 @@
+import numpy as np
+
+from wsfr_read.sites import AreaWeights, read_geospatial, read_grid_window, read_spatial_index
+
+
+def test_read_geospatial_is_cached():
+    assert read_geospatial("basins") is read_geospatial("basins")
+
+
+def test_spatial_index():
+    basins_gdf = read_geospatial("basins")
+    index = read_spatial_index("basins")
+    assert read_spatial_index("basins") is index
+
+    site_id = basins_gdf["site_id"].iloc[0]
+    geometry = basins_gdf.geometry.iloc[0]
+    minx, miny, maxx, maxy = index.bounds(site_id)
+
+    # Point-in-basin
+    point = geometry.representative_point()
+    matches = index.sites_containing_points([point.x, -200.0], [point.y, 0.0])
+    assert site_id in matches.loc[matches["point"] == 0, "site_id"].tolist()
+    assert (matches["point"] == 1).sum() == 0
+    expected = basins_gdf.loc[basins_gdf.intersects(point), "site_id"].tolist()
+    assert matches["site_id"].tolist() == expected
+
+    # Bounding box
+    assert site_id in index.sites_intersecting_bbox(minx, miny, maxx, maxy)
+    assert index.sites_intersecting_bbox(-200.0, -10.0, -190.0, -5.0) == []
+
+    # Raster window with descending latitudes
+    x = np.arange(-125.0, -66.0, 0.1) + 0.05
+    y = np.arange(53.0, 24.0, -0.1) - 0.05
+    rows, cols = index.raster_window(site_id, x, y)
+    assert x[cols][0] - 0.05 <= minx and x[cols][-1] + 0.05 >= maxx
+    assert y[rows][-1] - 0.05 <= miny and y[rows][0] + 0.05 >= maxy
+    assert x[cols.start + 1] - 0.05 > minx and y[rows.start + 1] + 0.05 < maxy
+    padded_rows, padded_cols = index.raster_window(site_id, x, y, pad=2)
+    assert padded_cols == slice(cols.start - 2, cols.stop + 2)
+    assert index.raster_window(site_id, x, y[::-1]) == (
+        slice(len(y) - rows.stop, len(y) - rows.start),
+        cols,
+    )
+
+
+class _Variable:
+    """Masked array with named dimensions, like a netCDF4.Variable."""
+
+    def __init__(self, data: np.ma.MaskedArray, dimensions: tuple[str, ...]):
+        self.data = data
+        self.dimensions = dimensions
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+
+def test_read_grid_window():
+    # Stored as (lon, day, lat), read as (day, lat, lon)
+    data = np.ma.masked_equal(np.arange(4 * 3 * 5, dtype="int32").reshape(4, 3, 5), 31)
+    variable = _Variable(data, ("lon", "day", "lat"))
+    weights = AreaWeights(rows=slice(1, 3), cols=slice(2, 4), weights=np.full((2, 2), 0.25))
+    expected = data.filled(-1).transpose(1, 2, 0)[:, 1:3, 2:4].astype("float64")
+    expected[expected == -1] = np.nan
+
+    window = read_grid_window(variable, weights, ("day", "lat", "lon"))
+    assert window.dtype == "float64"
+    np.testing.assert_array_equal(window, expected)
+    np.testing.assert_array_equal(
+        read_grid_window(variable, weights, ("day", "lat", "lon"), {"day": 1}), expected[1]
+    )
@@ -0,0 +1,271 @@
+import gzip
+import os
+import shutil
+import tarfile
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from wsfr_read import cache_clear
+from wsfr_read.config import DATA_ROOT
+from wsfr_read.sites import read_geospatial
+from wsfr_read.snowpack import (
+    build_snodas_basin_summaries,
+    cdec,
+    compile_cdec,
+    compile_snotel,
+    get_snodas_grid_coords,
+    read_cdec,
+    read_cdec_forecast_year,
+    read_snodas_basin_stats,
+    read_snodas_basin_summary,
+    read_snodas_grid,
+    read_snotel,
+    read_snotel_arrays,
+    read_snotel_forecast_year,
+    snotel,
+)
+from wsfr_read.snowpack.cdec import _parse_cdec_forecast_year
+from wsfr_read.snowpack.snotel import _parse_snotel_forecast_year
+
+
+def test_read_snotel():
+    site_id = "hungry_horse_reservoir_inflow"
+    df = read_snotel(site_id, "2021-03-15")
+    assert list(df.index.names) == ["stationTriplet", "date"]
+    assert list(df.columns) == [
+        "WTEQ_DAILY",
+        "SNWD_DAILY",
+        "PREC_DAILY",
+        "TMAX_DAILY",
+        "TMIN_DAILY",
+        "TAVG_DAILY",
+    ]
+    assert (df.dtypes == "float32").all()
+    assert df.index.get_level_values("date").max() < pd.Timestamp("2021-03-15")
+
+    # Same as reading the station data files
+    sites_df = pd.read_csv(DATA_ROOT / "snotel" / "sites_to_snotel_stations.csv")
+    for station_triplet in sites_df.loc[sites_df["site_id"] == site_id, "stationTriplet"]:
+        path = DATA_ROOT / "snotel" / "FY2021" / f"{station_triplet.replace(':', '_')}.csv"
+        if not path.exists():
+            assert station_triplet not in df.index.get_level_values("stationTriplet")
+            continue
+        expected = pd.read_csv(path, index_col="date", parse_dates=["date"])
+        expected = expected.reindex(columns=df.columns).astype("float32")
+        pd.testing.assert_frame_equal(
+            df.loc[station_triplet], expected[expected.index < "2021-03-15"], check_freq=False
+        )
+
+    arrays = read_snotel_arrays(site_id, "2021-03-15", in_basin_only=True)
+    assert arrays.in_basin.all()
+    assert arrays.values.shape == (len(arrays.station_triplets), len(arrays.dates), 6)
+
+
+def test_compile_snotel(tmp_path):
+    compiled_paths = compile_snotel([2021], cache_dir=tmp_path)
+    assert [path.name for path in compiled_paths] == ["FY2021.npz"]
+    compiled = read_snotel_forecast_year(2021, cache_dir=tmp_path)
+    expected = _parse_snotel_forecast_year(2021)
+    for field in expected._fields:
+        np.testing.assert_array_equal(getattr(compiled, field), getattr(expected, field))
+
+
+def _rewrite_in_place(path, df):
+    """Rewrite a data file like the downloaders do, with a later modification time in case the
+    file system's timestamps are coarse."""
+    df.to_csv(path)
+    mtime_ns = path.stat().st_mtime_ns + 10**9
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_snotel_rewritten_station_file(tmp_path, monkeypatch):
+    snotel_dir = tmp_path / "snotel"
+    shutil.copytree(DATA_ROOT / "snotel" / "FY2021", snotel_dir / "FY2021")
+    monkeypatch.setattr(snotel, "SNOTEL_DIR", snotel_dir)
+    cache_dir = tmp_path / "cache"
+    compile_snotel([2021], cache_dir=cache_dir)
+    data = read_snotel_forecast_year(2021, cache_dir=cache_dir)
+    assert read_snotel_forecast_year(2021, cache_dir=cache_dir) is data
+
+    path = sorted((snotel_dir / "FY2021").glob("*.csv"))[0]
+    df = pd.read_csv(path, index_col="date")
+    df["WTEQ_DAILY"] = 123.0
+    dir_mtime_ns = path.parent.stat().st_mtime_ns
+    _rewrite_in_place(path, df)
+    assert path.parent.stat().st_mtime_ns == dir_mtime_ns
+
+    # Recompiling replaces the out of date compiled file, which is reloaded
+    compile_snotel([2021], cache_dir=cache_dir)
+    data = read_snotel_forecast_year(2021, cache_dir=cache_dir)
+    assert data.station_triplets[0] == path.stem.replace("_", ":")
+    np.testing.assert_array_equal(data.values[0, : len(df), 0], 123.0)
+
+    # A new process that doesn't recompile doesn't load the out of date compiled file
+    df["WTEQ_DAILY"] = 456.0
+    _rewrite_in_place(path, df)
+    cache_clear()
+    data = read_snotel_forecast_year(2021, cache_dir=cache_dir)
+    np.testing.assert_array_equal(data.values[0, : len(df), 0], 456.0)
+
+
+def test_snotel_empty_station_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(snotel, "SNOTEL_DIR", tmp_path)
+    (tmp_path / "FY2021").mkdir()
+    for name in ("1000_WA_SNTL.csv", "1001_WA_SNTL.csv"):
+        (tmp_path / "FY2021" / name).write_text("date," + ",".join(snotel.ELEMENT_COLUMNS) + "\n")
+    data = _parse_snotel_forecast_year(2021)
+    assert list(data.station_triplets) == ["1000:WA:SNTL", "1001:WA:SNTL"]
+    assert len(data.dates) == 0
+    assert data.values.shape == (2, 0, 6)
+
+
+def test_read_cdec():
+    site_id = "hungry_horse_reservoir_inflow"
+    df = read_cdec(site_id, "2021-03-15")
+    assert list(df.index.names) == ["station_id", "date"]
+    assert list(df.columns) == [2, 3, 18, 30, 31, 32, 82, 237, 238]
+    assert (df.dtypes == "float32").all()
+
+    # Same as pivoting the long-format station data files
+    sites_df = pd.read_csv(DATA_ROOT / "cdec" / "sites_to_cdec_stations.csv")
+    for station_id in sites_df.loc[sites_df["site_id"] == site_id, "station_id"]:
+        path = DATA_ROOT / "cdec" / "FY2021" / f"{station_id}.csv"
+        if not path.exists():
+            assert station_id not in df.index.get_level_values("station_id")
+            continue
+        long_df = pd.read_csv(path, parse_dates=["date"]).replace({"value": {-9999: np.nan}})
+        expected = long_df.pivot(index="date", columns="SENSOR_NUM", values="value")
+        expected = expected.reindex(columns=df.columns).astype("float32")
+        pd.testing.assert_frame_equal(
+            df.loc[station_id],
+            expected[expected.index < "2021-03-15"],
+            check_names=False,
+            check_freq=False,
+        )
+
+
+def test_compile_cdec(tmp_path):
+    compile_cdec([2021], cache_dir=tmp_path)
+    compiled = read_cdec_forecast_year(2021, cache_dir=tmp_path)
+    expected = _parse_cdec_forecast_year(2021)
+    for field in expected._fields:
+        np.testing.assert_array_equal(getattr(compiled, field), getattr(expected, field))
+
+
+def test_cdec_rewritten_station_file(tmp_path, monkeypatch):
+    cdec_dir = tmp_path / "cdec"
+    shutil.copytree(DATA_ROOT / "cdec" / "FY2021", cdec_dir / "FY2021")
+    monkeypatch.setattr(cdec, "CDEC_DIR", cdec_dir)
+    cache_dir = tmp_path / "cache"
+    compile_cdec([2021], cache_dir=cache_dir)
+    read_cdec_forecast_year(2021, cache_dir=cache_dir)
+
+    path = sorted((cdec_dir / "FY2021").glob("*.csv"))[0]
+    df = pd.read_csv(path, index_col="stationId")
+    df["value"] = 123.0
+    _rewrite_in_place(path, df)
+
+    # Recompiling replaces the out of date compiled file, which is reloaded
+    compile_cdec([2021], cache_dir=cache_dir)
+    data = read_cdec_forecast_year(2021, cache_dir=cache_dir)
+    assert data.station_ids[0] == path.stem
+    station_values = data.values[0]
+    assert (station_values[~np.isnan(station_values)] == 123.0).all()
+    assert (~np.isnan(station_values)).any()
+
+    # A new process that doesn't recompile doesn't load the out of date compiled file
+    df["value"] = 456.0
+    _rewrite_in_place(path, df)
+    cache_clear()
+    station_values = read_cdec_forecast_year(2021, cache_dir=cache_dir).values[0]
+    assert (station_values[~np.isnan(station_values)] == 456.0).all()
+
+
+def test_cdec_missing_sensor_num(tmp_path, monkeypatch):
+    monkeypatch.setattr(cdec, "CDEC_DIR", tmp_path)
+    (tmp_path / "FY2021").mkdir()
+    (tmp_path / "FY2021" / "ABC.csv").write_text(
+        "stationId,durCode,SENSOR_NUM,sensorType,date,obsDate,value,dataFlag,units\n"
+        "ABC,D,3,SNOW WC,2020-10-1 0:0,2020-10-1 0:0,1.5, ,INCHES\n"
+        "ABC,D,,SNOW WC,2020-10-2 0:0,2020-10-2 0:0,2.5, ,INCHES\n"
+        "ABC,D,3,SNOW WC,2020-10-3 0:0,2020-10-3 0:0,3.5, ,INCHES\n"
+    )
+    data = _parse_cdec_forecast_year(2021)
+    sensor_position = cdec.SENSOR_NUMBERS.index(3)
+    np.testing.assert_array_equal(data.values[0, :, sensor_position], [1.5, np.nan, 3.5])
+
+
+def test_cdec_empty_station_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(cdec, "CDEC_DIR", tmp_path)
+    (tmp_path / "FY2021").mkdir()
+    for name in ("ABC.csv", "DEF.csv"):
+        (tmp_path / "FY2021" / name).write_text(
+            "stationId,durCode,SENSOR_NUM,sensorType,date,obsDate,value,dataFlag,units\n"
+        )
+    data = _parse_cdec_forecast_year(2021)
+    assert list(data.station_ids) == ["ABC", "DEF"]
+    assert len(data.dates) == 0
+    assert data.values.shape == (2, 0, len(cdec.SENSOR_NUMBERS))
+
+
+def test_read_snodas_grid():
+    grid = read_snodas_grid("2021-01-02", "swe")
+    assert grid.dtype == np.int16
+    assert grid.shape == (3351, 6935)
+
+    path = DATA_ROOT / "snodas" / "FY2021" / "SNODAS_20210102.tar"
+    with tarfile.open(path) as tar:
+        (name,) = [
+            name
+            for name in tar.getnames()
+            if name.startswith("us_ssmv11034tS__T0001TTNATS") and name.endswith(".dat.gz")
+        ]
+        data = gzip.decompress(tar.extractfile(name).read())
+    np.testing.assert_array_equal(grid, np.frombuffer(data, dtype=">i2").reshape(grid.shape))
+
+    x, y = get_snodas_grid_coords("2021-01-02")
+    assert x.shape == (6935,) and y.shape == (3351,)
+    np.testing.assert_allclose([x[0], y[0]], [-124.733333 + 0.0041667, 52.875 - 0.0041667])
+    assert np.all(np.diff(x) > 0) and np.all(np.diff(y) < 0)
+
+
+def test_read_snodas_basin_stats():
+    stats_df = read_snodas_basin_stats("2021-01-02", "swe")
+    basins_gdf = read_geospatial("basins")
+    assert stats_df.index.tolist() == basins_gdf["site_id"].tolist()
+
+    # Same as masking the full grid with each basin polygon
+    grid = read_snodas_grid("2021-01-02", "swe")
+    x, y = get_snodas_grid_coords("2021-01-02")
+    xx, yy = np.meshgrid(x, y)
+    for site_id, geometry in zip(basins_gdf["site_id"][:3], basins_gdf.geometry[:3]):
+        values = grid[shapely.contains_xy(geometry, xx, yy)]
+        assert stats_df.loc[site_id, "n_cells"] == len(values)
+        values = values[values != -9999] / 1000
+        assert stats_df.loc[site_id, "count"] == len(values)
+        np.testing.assert_allclose(
+            stats_df.loc[site_id, ["mean", "sum"]], [values.mean(), values.sum()]
+        )
+
+
+def test_build_snodas_basin_summaries(tmp_path):
+    (summary_path,) = build_snodas_basin_summaries([2021], cache_dir=tmp_path, max_workers=2)
+    df = pd.read_parquet(summary_path)
+    assert df["date"].nunique() == len(list((DATA_ROOT / "snodas" / "FY2021").glob("*.tar")))
+
+    summary_df = read_snodas_basin_summary("boise_r_nr_boise", "2021-01-03", cache_dir=tmp_path)
+    assert summary_df.index.max() < pd.Timestamp("2021-01-03")
+    stats_df = read_snodas_basin_stats("2021-01-02", "swe")
+    np.testing.assert_allclose(
+        summary_df.loc["2021-01-02", ["swe_mean", "swe_covered_fraction"]],
+        stats_df.loc["boise_r_nr_boise", ["mean", "covered_fraction"]],
+        rtol=1e-6,
+    )
+
+    # Only missing days are processed on re-run
+    last_date = df["date"].max()
+    df[df["date"] < last_date].to_parquet(summary_path, index=False)
+    build_snodas_basin_summaries([2021], cache_dir=tmp_path, max_workers=1)
+    pd.testing.assert_frame_equal(pd.read_parquet(summary_path), df)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 from wsfr_read import teleconnections
@@ -77,3 +78,43 @@ def test_soi():
     assert df[df["year"] == 2020].shape[0] == 12
     assert df.equals(df.sort_values(["year", "month"]))
     assert (df["year"].values[-1], df["month"].values[-1]) < (2021, 3)
+
+
+def test_monthly_teleconnections():
+    monthly = teleconnections.read_monthly_teleconnections()
+    issue_dates = pd.to_datetime(["2011-01-01", "2021-03-15", "2023-07-22"])
+    window = monthly.window(issue_dates, n_months=3)
+    assert window.shape == (3, 3, len(monthly.columns))
+    for issue_date, values in zip(issue_dates, window):
+        latest = dict(zip(monthly.columns, values[-1]))
+        assert np.isclose(
+            latest["pdo_index"],
+            teleconnections.read_pdo_data(issue_date)["pdo_index"].iloc[-1],
+            equal_nan=True,
+        )
+        assert np.isclose(
+            latest["oni_anom"], teleconnections.read_oni_data(issue_date)["ANOM"].iloc[-1]
+        )
+        mjo_df = teleconnections.read_mjo_data(issue_date)
+        prev_month_df = mjo_df[mjo_df["DATE"].dt.to_period("M") == issue_date.to_period("M") - 1]
+        assert np.isclose(latest["mjo_index_1"], prev_month_df["INDEX_1"].mean())
+    # Window frame has the most recent month as lag 0
+    window_df = monthly.window_frame(issue_dates, n_months=3)
+    assert window_df.shape == (3, 3 * len(monthly.columns))
+    np.testing.assert_array_equal(window_df["soi_lag0"].values, window[:, -1, 2])
+    # Issue dates before the data are all missing
+    assert np.isnan(monthly.window(["1900-01-01"], n_months=2)).all()
+
+
+def test_modifying_results_does_not_change_cached_data():
+    for reader in (
+        teleconnections.read_mjo_data,
+        teleconnections.read_pdo_data,
+        teleconnections.read_pna_data,
+        teleconnections.read_soi_data,
+    ):
+        df = reader("2021-03-15")
+        expected = df.copy()
+        df.iloc[:, -1] = np.nan
+        df.fillna(0, inplace=True)
+        pd.testing.assert_frame_equal(reader("2021-03-15"), expected)
@@ -1,7 +1,14 @@
 import datetime
 
+import numpy as np
+import pandas as pd
+
 from wsfr_read.sites import read_metadata
-from wsfr_read.streamflow import read_usgs_streamflow_data
+from wsfr_read.streamflow import (
+    read_usgs_streamflow_data,
+    read_usgs_streamflow_stats,
+    read_usgs_streamflow_stats_batch,
+)
 
 
 def test_read_usgs_streamflow_data():
@@ -9,3 +16,29 @@ def test_read_usgs_streamflow_data():
     assert list(df.columns.values) == ["datetime", "discharge_cfs_mean"]
     assert df.shape[0] > 0
     assert max(df["datetime"]).date() == datetime.date(2021, 3, 14)
+
+
+def test_read_usgs_streamflow_stats():
+    df = read_usgs_streamflow_data("animas_r_at_durango", "2021-03-15")
+    stats = read_usgs_streamflow_stats("animas_r_at_durango", "2021-03-15")
+    assert np.isclose(stats.total, df["discharge_cfs_mean"].sum())
+    assert np.isclose(stats.mean, df["discharge_cfs_mean"].mean())
+    assert stats.count == df["discharge_cfs_mean"].count()
+
+    last_week = df[df["datetime"].dt.date >= datetime.date(2021, 3, 8)]
+    stats = read_usgs_streamflow_stats("animas_r_at_durango", "2021-03-15", n_days=7)
+    assert np.isclose(stats.total, last_week["discharge_cfs_mean"].sum())
+    assert stats.count == last_week["discharge_cfs_mean"].count()
+
+
+def test_read_usgs_streamflow_stats_batch():
+    site_ids = ["animas_r_at_durango", "boise_r_nr_boise", "animas_r_at_durango"]
+    issue_dates = ["2021-03-15", "2019-01-01", "2023-07-22"]
+    stats_df = read_usgs_streamflow_stats_batch(site_ids, issue_dates, n_days=30)
+    assert list(stats_df.columns) == ["total", "mean", "count"]
+    assert stats_df.shape[0] == 3
+    for (site_id, issue_date), row in stats_df.iterrows():
+        stats = read_usgs_streamflow_stats(site_id, issue_date, n_days=30)
+        assert np.isclose(row["total"], stats.total)
+        assert row["count"] == stats.count
+    assert stats_df.index.get_level_values("issue_date").equals(pd.to_datetime(issue_dates))
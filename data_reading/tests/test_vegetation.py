@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import shapely
+import xarray as xr
+
+from wsfr_read.config import DATA_ROOT
+from wsfr_read.sites import read_geospatial
+from wsfr_read.vegetation import modis_vegetation, read_modis_vegetation
+
+
+def test_read_modis_vegetation():
+    site_id = "boise_r_nr_boise"
+    df = read_modis_vegetation(site_id, "2021-03-01")
+    assert list(df.index.names) == ["start_date", "end_date"]
+    assert list(df.columns) == ["ndvi_mean", "evi_mean", "ndvi_count", "evi_count", "n_cells"]
+    assert df.index.get_level_values("end_date").is_monotonic_increasing
+    assert len(read_modis_vegetation(site_id, df.index[-1][1])) == len(df) - 1
+
+    # Same as masking the full tiles of the first composite with the projected basin polygon
+    sites_df = pd.read_csv(DATA_ROOT / "modis_vegetation" / "FY2021" / "sites_to_items.csv")
+    sites_df = sites_df[sites_df["site_id"] == site_id]
+    sites_df = sites_df[pd.to_datetime(sites_df["end_datetime"]).dt.date == df.index[0][1].date()]
+    basins_gdf = read_geospatial("basins")
+    basin = basins_gdf[basins_gdf["site_id"] == site_id]
+    values = []
+    for item_id in sites_df["item_id"]:
+        path = DATA_ROOT / "modis_vegetation" / "FY2021" / item_id / "vegetation.nc"
+        with xr.open_dataset(path, mask_and_scale=False) as ds:
+            geometry = basin.to_crs(ds["spatial_ref"].attrs["crs_wkt"]).geometry.iloc[0]
+            xx, yy = np.meshgrid(ds["x"].values, ds["y"].values)
+            ndvi = ds["500m_16_days_NDVI"].values[0]
+            values.append(ndvi[shapely.contains_xy(geometry, xx, yy)])
+    values = np.concatenate(values)
+    assert df["n_cells"].iloc[0] == len(values)
+    values = values[values != -3000] * 0.0001
+    assert df["ndvi_count"].iloc[0] == len(values)
+    np.testing.assert_allclose(df["ndvi_mean"].iloc[0], values.mean())
+
+
+def test_read_modis_vegetation_added_item(tmp_path, monkeypatch):
+    site_id = "boise_r_nr_boise"
+    source_dir = DATA_ROOT / "modis_vegetation" / "FY2021"
+    fy_dir = tmp_path / "FY2021"
+    fy_dir.mkdir()
+    (fy_dir / "sites_to_items.csv").write_bytes((source_dir / "sites_to_items.csv").read_bytes())
+    item_dirs = sorted(path for path in source_dir.iterdir() if path.is_dir())
+    # Leave out the vegetation files of the last composite
+    missing_prefix = item_dirs[-1].name.split(".")[1]
+    for item_dir in item_dirs:
+        (fy_dir / item_dir.name).mkdir()
+        if missing_prefix not in item_dir.name:
+            (fy_dir / item_dir.name / "vegetation.nc").symlink_to(item_dir / "vegetation.nc")
+    monkeypatch.setattr(modis_vegetation, "MODIS_DIR", tmp_path)
+
+    partial_df = read_modis_vegetation(site_id, "2021-03-01")
+    for item_dir in item_dirs:
+        if missing_prefix in item_dir.name:
+            (fy_dir / item_dir.name / "vegetation.nc").symlink_to(item_dir / "vegetation.nc")
+    df = read_modis_vegetation(site_id, "2021-03-01")
+    assert len(df) == len(partial_df) + 1
+    pd.testing.assert_frame_equal(df.iloc[:-1], partial_df)
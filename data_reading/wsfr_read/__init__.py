@@ -1,3 +1,11 @@
 """Data ingestion code for the Water Supply Forecast Rodeo on DrivenData."""
 
+from wsfr_read.cache import cache_clear, cache_info, set_cache_max_bytes
+
 __version__ = "0.1.0"
+
+__all__ = [
+    "cache_clear",
+    "cache_info",
+    "set_cache_max_bytes",
+]
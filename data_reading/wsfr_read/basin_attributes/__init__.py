@@ -0,0 +1,11 @@
+from wsfr_read.basin_attributes.basin_atlas import (
+    get_basin_atlas_attributes,
+    get_basin_atlas_path,
+    read_basin_atlas_attributes,
+)
+
+__all__ = [
+    "get_basin_atlas_attributes",
+    "get_basin_atlas_path",
+    "read_basin_atlas_attributes",
+]
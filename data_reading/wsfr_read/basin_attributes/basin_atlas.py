@@ -0,0 +1,160 @@
+"""Attributes of each drainage basin from BasinATLAS, the HydroATLAS attributes of HydroBASINS
+subbasins. The geodatabase is read directly from the zip archive through GDAL's `/vsizip/`
+virtual file system, and only the subbasins within each drainage basin's bounding box are read.
+"""
+
+from pathlib import Path, PurePosixPath
+import re
+import zipfile
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from wsfr_read.cache import cached_read, is_compiled_current
+from wsfr_read.config import CACHE_ROOT, DATA_ROOT, GEOSPATIAL_FILE, logger
+from wsfr_read.sites import read_geospatial
+
+ZIP_FILE = DATA_ROOT / "BasinATLAS_Data_v10.gdb.zip"
+LAYER_NAME_FORMAT = "BasinATLAS_v10_lev{level:02d}"
+# Pfafstetter level of the HydroBASINS subbasins, from 1 (largest) to 12 (smallest)
+DEFAULT_LEVEL = 12
+# Value of HydroATLAS attributes without data
+NODATA_VALUE = -999
+# Attributes with class or identifier values, e.g., "clz_cl_smj" for the climate zone, which are
+# combined by majority instead of by mean
+CLASS_COLUMN_PATTERN = re.compile(r"_(cl|id)_")
+# Equal-area projection (CONUS Albers) for areas of overlap
+AREA_CRS = "EPSG:5070"
+
+COMPILED_DIR_NAME = "basin_atlas"
+SOURCE_FILES = (GEOSPATIAL_FILE, ZIP_FILE)
+
+
+def get_basin_atlas_path() -> str:
+    """GDAL path to the BasinATLAS geodatabase inside the zip archive. Only the archive's central
+    directory is read to find it."""
+    with zipfile.ZipFile(ZIP_FILE) as zf:
+        names = zf.namelist()
+    for name in names:
+        if name.endswith(".gdbtable"):
+            return f"/vsizip/{ZIP_FILE}/{PurePosixPath(name).parent}"
+    raise FileNotFoundError(f"No file geodatabase found in {ZIP_FILE}")
+
+
+def get_basin_atlas_attributes(
+    level: int = DEFAULT_LEVEL, cache_dir: Path | None = None
+) -> pd.DataFrame:
+    """Returns BasinATLAS attributes of every drainage basin, combined over the HydroBASINS
+    subbasins of a Pfafstetter level that intersect it, weighted by the area of each subbasin that
+    is within the drainage basin. Numeric attributes are area-weighted means, skipping subbasins
+    without data. Class and identifier attributes (names with "_cl_" or "_id_") are the class
+    that covers the largest area. Only the lowercase HydroATLAS attribute columns are included,
+    not the HydroBASINS identifier and topology columns such as "HYBAS_ID".
+
+    The attributes are computed once and kept in memory by the `wsfr_read.cache` data file cache.
+    If a cache directory is configured, they are also saved as a Parquet file and loaded from
+    there in later processes while it is newer than the geospatial file and the BasinATLAS
+    archive.
+
+    Args:
+        level (int): Pfafstetter level of the subbasins, from 1 to 12. Defaults to 12, the
+            smallest subbasins.
+        cache_dir (Path | None): Directory to save the attributes to, in a subdirectory
+            "basin_atlas". Default of None uses the `WSFR_CACHE_ROOT` environment variable. If
+            neither is set, the attributes are only kept in memory.
+
+    Returns:
+        pd.DataFrame: dataframe with index "site_id" and columns "n_subbasins" (number of
+            intersecting subbasins), "covered_fraction" (fraction of the drainage basin's area
+            covered by subbasins), and one column per attribute
+    """
+    return cached_read(SOURCE_FILES, _load_basin_atlas_attributes, level, cache_dir)
+
+
+def read_basin_atlas_attributes(
+    site_id: str, level: int = DEFAULT_LEVEL, cache_dir: Path | None = None
+) -> pd.Series:
+    """Read BasinATLAS attributes for a given forecast site's drainage basin. See
+    `get_basin_atlas_attributes`.
+
+    Args:
+        site_id (str): Identifier for forecast site
+        level (int): Pfafstetter level of the subbasins, from 1 to 12
+        cache_dir (Path | None): Directory with saved attributes. Default of None uses the
+            `WSFR_CACHE_ROOT` environment variable.
+
+    Returns:
+        pd.Series: attribute values indexed by attribute name
+    """
+    return get_basin_atlas_attributes(level, cache_dir).loc[site_id].copy()
+
+
+def _load_basin_atlas_attributes(level: int, cache_dir: Path | None) -> pd.DataFrame:
+    cache_dir = cache_dir or CACHE_ROOT
+    saved_path = (
+        Path(cache_dir) / COMPILED_DIR_NAME / f"lev{level:02d}_basin_attributes.parquet"
+        if cache_dir
+        else None
+    )
+    if saved_path and is_compiled_current(SOURCE_FILES, saved_path):
+        return pd.read_parquet(saved_path)
+    attributes_df = _build_basin_atlas_attributes(level)
+    if saved_path:
+        logger.debug("Saving BasinATLAS attributes to {}", saved_path)
+        saved_path.parent.mkdir(exist_ok=True, parents=True)
+        # Write to a temporary file first so that an interrupted run doesn't leave a partial file
+        tmp_path = saved_path.with_suffix(".tmp")
+        attributes_df.to_parquet(tmp_path)
+        tmp_path.replace(saved_path)
+    return attributes_df
+
+
+def _read_subbasins(path: str, level: int, basin: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """Read the subbasins within the bounding box of a drainage basin, using the geodatabase's
+    spatial index."""
+    return gpd.read_file(path, layer=LAYER_NAME_FORMAT.format(level=level), bbox=basin)
+
+
+def _build_basin_atlas_attributes(level: int) -> pd.DataFrame:
+    path = get_basin_atlas_path()
+    basins_gdf = read_geospatial("basins")
+    rows = []
+    attribute_columns = None
+    for i, site_id in enumerate(basins_gdf["site_id"]):
+        basin = basins_gdf.iloc[[i]]
+        subbasins_gdf = _read_subbasins(path, level, basin)
+        if attribute_columns is None:
+            attribute_columns = [
+                col
+                for col in subbasins_gdf.columns
+                if col.islower() and pd.api.types.is_numeric_dtype(subbasins_gdf[col])
+            ]
+        basin_geometry = basin.geometry.to_crs(AREA_CRS).iloc[0]
+        areas = shapely.area(
+            shapely.intersection(
+                subbasins_gdf.geometry.to_crs(AREA_CRS).to_numpy(), basin_geometry
+            )
+        )
+        is_overlapping = areas > 0
+        areas = areas[is_overlapping]
+        values_df = subbasins_gdf.loc[is_overlapping, attribute_columns]
+        row = {
+            "site_id": site_id,
+            "n_subbasins": len(areas),
+            "covered_fraction": areas.sum() / basin_geometry.area,
+        }
+        for col in attribute_columns:
+            values = values_df[col].to_numpy(dtype="float64")
+            is_valid = values != NODATA_VALUE
+            if not is_valid.any():
+                row[col] = np.nan
+            elif CLASS_COLUMN_PATTERN.search(col):
+                class_areas = pd.Series(areas[is_valid]).groupby(values[is_valid]).sum()
+                row[col] = class_areas.idxmax()
+            else:
+                row[col] = np.average(values[is_valid], weights=areas[is_valid])
+        rows.append(row)
+    logger.info("Computed BasinATLAS level {} attributes for {} sites", level, len(rows))
+    return pd.DataFrame(rows).set_index("site_id")
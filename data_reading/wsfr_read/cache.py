@@ -0,0 +1,181 @@
+"""Process-wide in-memory cache for parsed data files.
+
+Readers load each source file through `cached_read`, so that a file is only parsed once per
+process no matter how many sites or issue dates it is read for. Entries are keyed by the loader
+function, its arguments, and the path, modification time, and size of each source file, so that
+changed files are reloaded. When the estimated size of all entries exceeds the memory budget, the
+least recently used entries are evicted. Classes of cached objects that hold arrays or
+dataframes should report their estimated size with an `nbytes` property.
+
+Cached objects are shared between calls. Readers must not modify them in place and should return
+new objects (e.g., subsets or copies) to the user.
+"""
+
+from collections import OrderedDict
+import os
+from pathlib import Path
+import sys
+import threading
+from typing import Any, Callable, Hashable, NamedTuple, Sequence, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from wsfr_read.config import CACHE_MAX_BYTES
+
+T = TypeVar("T")
+
+FileKey = tuple[tuple[Path, int, int], ...]
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    current_bytes: int
+    max_bytes: int
+
+
+def _estimate_nbytes(obj: Any) -> int:
+    """Estimate the memory used by a cached object."""
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        return int(np.sum(obj.memory_usage(deep=True)))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if hasattr(obj, "nbytes"):
+        # Sizing hook for classes that hold arrays or dataframes, e.g., indexes built by readers
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            _estimate_nbytes(key) + _estimate_nbytes(value) for key, value in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(_estimate_nbytes(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+def _get_file_key(paths: Path | Sequence[Path]) -> FileKey:
+    if isinstance(paths, Path):
+        paths = (paths,)
+    file_key = []
+    for path in paths:
+        stat = os.stat(path)
+        file_key.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(file_key)
+
+
+class FileCache:
+    """Least recently used cache of objects loaded from files, with a memory budget.
+
+    Args:
+        max_bytes (int): Memory budget in bytes. Objects larger than this are not cached.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        # (loader, args) -> (file key, value, estimated bytes), ordered from least to most recent
+        self._entries: OrderedDict[Hashable, tuple[FileKey, Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(
+        self, paths: Path | Sequence[Path], loader: Callable[..., T], *args: Hashable
+    ) -> T:
+        """Return the cached result of `loader(*args)`, calling the loader if it is not cached or
+        any of the source files at `paths` has changed since it was cached."""
+        key = (loader, args)
+        file_key = _get_file_key(paths)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == file_key:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # Load without holding the lock so that loaders can read other cached files
+        value = loader(*args)
+        nbytes = _estimate_nbytes(value)
+        with self._lock:
+            self._discard(key)
+            if nbytes <= self.max_bytes:
+                self._entries[key] = (file_key, value, nbytes)
+                self.current_bytes += nbytes
+                self._evict()
+        return value
+
+    def _discard(self, key: Hashable):
+        if (entry := self._entries.pop(key, None)) is not None:
+            self.current_bytes -= entry[2]
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, _, nbytes) = self._entries.popitem(last=False)
+            self.current_bytes -= nbytes
+            self.evictions += 1
+
+    def set_max_bytes(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                entries=len(self._entries),
+                current_bytes=self.current_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def clear(self):
+        """Remove all entries and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+_cache = FileCache(CACHE_MAX_BYTES)
+
+
+def cached_read(paths: Path | Sequence[Path], loader: Callable[..., T], *args: Hashable) -> T:
+    """Return `loader(*args)` from the process-wide cache. The result is reloaded if the
+    modification time or size of any of the source files at `paths` has changed."""
+    return _cache.get_or_load(paths, loader, *args)
+
+
+def is_compiled_current(source_paths: Path | Sequence[Path], compiled_path: Path) -> bool:
+    """Whether a compiled file exists and is newer than all of its source files. Compiled files
+    must be written to a temporary file and then replaced, since a partial file left by an
+    interrupted run would also be newer than its source files."""
+    if isinstance(source_paths, Path):
+        source_paths = (source_paths,)
+    return compiled_path.exists() and compiled_path.stat().st_mtime_ns >= max(
+        path.stat().st_mtime_ns for path in source_paths
+    )
+
+
+def cache_info() -> CacheInfo:
+    """Statistics for the process-wide data file cache: number of hits, misses, and evictions,
+    number of entries, and estimated current and maximum memory use in bytes."""
+    return _cache.info()
+
+
+def cache_clear():
+    """Remove all entries from the process-wide data file cache and reset its statistics."""
+    _cache.clear()
+
+
+def set_cache_max_bytes(max_bytes: int):
+    """Set the memory budget of the process-wide data file cache in bytes. Least recently used
+    entries are evicted if the cache is over the new budget. The initial budget can be set with
+    the `WSFR_CACHE_MAX_BYTES` environment variable."""
+    _cache.set_max_bytes(max_bytes)
@@ -1,6 +1,15 @@
-from wsfr_read.climate.cpc_outlooks import read_cpc_outlooks_precip, read_cpc_outlooks_temp
+from wsfr_read.climate.cpc_outlooks import (
+    CPCOutlooksIndex,
+    compile_cpc_outlooks,
+    get_site_climate_divisions,
+    read_cpc_outlooks_precip,
+    read_cpc_outlooks_temp,
+)
 
 __all__ = [
+    "CPCOutlooksIndex",
+    "compile_cpc_outlooks",
+    "get_site_climate_divisions",
     "read_cpc_outlooks_precip",
     "read_cpc_outlooks_temp",
 ]
@@ -1,16 +1,27 @@
 import datetime
 import enum
-from io import StringIO
-from typing import Iterator, Literal
+from io import BytesIO
+import json
+from pathlib import Path
+from typing import Iterable, Iterator, Literal
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 
-from wsfr_read.config import DATA_ROOT, logger
-from wsfr_read.sites import read_geospatial, read_metadata
+from wsfr_read.cache import cached_read, is_compiled_current
+from wsfr_read.config import CACHE_ROOT, DATA_ROOT, GEOSPATIAL_FILE, METADATA_FILE, logger
+from wsfr_read.sites import read_metadata, read_spatial_index
 
 CPC_OUTLOOKS_DIR = DATA_ROOT / "cpc_outlooks"
 CPC_CLIMATE_DIVISIONS_GEO_FILE = DATA_ROOT / "cpc_climate_divisions.gpkg"
+COMPILED_DIR_NAME = "cpc_outlooks"
+SITE_CLIMATE_DIVISIONS_FILE_NAME = "site_climate_divisions.json"
+SITE_CLIMATE_DIVISIONS_SOURCE_FILES = (
+    METADATA_FILE,
+    GEOSPATIAL_FILE,
+    CPC_CLIMATE_DIVISIONS_GEO_FILE,
+)
 
 TEMP_FILENAME_TEMPLATE = "cpcllftd.{year}.dat"
 PRECIP_FILENAME_TEMPLATE = "cpcllfpd.{year}.dat"
@@ -23,53 +34,22 @@ class Variable(str, enum.Enum):
     PRECIP = "precip"
 
 
-def _table_data_generator(
-    year: int, variable: Literal["temp", "precip"] | Variable
-) -> Iterator[tuple[datetime.date, StringIO]]:
-    """Generator function for reading the data tables in a CPC Outlooks data file."""
+def _get_outlook_path(year: int, variable: Literal["temp", "precip"] | Variable) -> Path:
+    """Path to the raw CPC Outlooks data file for a given calendar year and variable."""
+    variable = Variable(variable)
+    if variable == Variable.TEMP:
+        return CPC_OUTLOOKS_DIR / TEMP_FILENAME_TEMPLATE.format(year=year)
+    elif variable == Variable.PRECIP:
+        return CPC_OUTLOOKS_DIR / PRECIP_FILENAME_TEMPLATE.format(year=year)
+
+
+def _get_header_substr(variable: Literal["temp", "precip"] | Variable) -> bytes:
+    """Substring that identifies the first header line of each table in a data file."""
     variable = Variable(variable)
     if variable == Variable.TEMP:
-        path = CPC_OUTLOOKS_DIR / TEMP_FILENAME_TEMPLATE.format(year=year)
-        first_header_substr = "FORECAST TEMPERATURE PERCENTILES"
+        return b"FORECAST TEMPERATURE PERCENTILES"
     elif variable == Variable.PRECIP:
-        path = CPC_OUTLOOKS_DIR / PRECIP_FILENAME_TEMPLATE.format(year=year)
-        first_header_substr = "FORECAST PRECIPITATION PERCENTILES"
-    with path.open("r") as fp:
-        buffer = StringIO()
-        issue_date = None
-        for line in fp:
-            if line.startswith("9999"):
-                # End of data. Return buffer and exit generator
-                buffer.seek(0)
-                yield issue_date, buffer
-                buffer.close()
-                return
-            elif first_header_substr in line:
-                # Flush existing buffer
-                if buffer.tell():
-                    if issue_date is None:
-                        raise Exception("Parsing error. No issue date but buffer is not empty.")
-                    buffer.seek(0)
-                    yield issue_date, buffer
-                    buffer.close()
-                    buffer = StringIO()
-                # Read issue date from first header line
-                month, day, year = int(line[:2].strip()), int(line[2:4]), int(line[5:9])
-                issue_date = datetime.date(year, month, day)
-            elif line.startswith("YEAR"):
-                # Second header line with columns
-                # Skip column header row because the widths don't match the data
-                # We'll pass in hardcoded column names
-                continue
-            else:
-                # Add data line to buffer
-                buffer.write(line)
-    # End of file, flush buffer and exit generator
-    if buffer.tell():
-        buffer.seek(0)
-        yield issue_date, buffer
-        buffer.close()
-        return
+        return b"FORECAST PRECIPITATION PERCENTILES"
 
 
 TEMP_WIDTHS = (
@@ -177,12 +157,59 @@ PRECIP_ALT_WIDTHS = (
 
 
 def _read_outlook_for_year(
-    year: int, variable: Literal["temp", "precip"] | Variable
+    year: int, variable: Literal["temp", "precip"] | Variable, cache_dir: Path | None = None
 ) -> pd.DataFrame:
     """Read the full outlook data file for a given calendar year and variable. Use the function
-    `read_cpc_outlooks_temp` or `read_cpc_outlooks_precip` instead to properly subset by time."""
+    `read_cpc_outlooks_temp` or `read_cpc_outlooks_precip` instead to properly subset by time.
+
+    Parsed data is kept in memory by the `wsfr_read.cache` data file cache, so each data file is
+    only loaded once. If a compiled Parquet file from `compile_cpc_outlooks` exists in `cache_dir`
+    and is up to date, it is loaded instead of parsing the raw data file.
+    """
+    variable = Variable(variable)
+    path = _get_outlook_path(year, variable)
+    return cached_read(path, _load_outlook_for_year, year, variable, cache_dir)
+
+
+def _load_outlook_for_year(year: int, variable: Variable, cache_dir: Path | None) -> pd.DataFrame:
+    path = _get_outlook_path(year, variable)
+    compiled_path = _get_compiled_path(path, cache_dir)
+    if compiled_path and is_compiled_current(path, compiled_path):
+        return pd.read_parquet(compiled_path)
+    return _parse_outlook_for_year(year, variable)
+
+
+def _parse_fixed_width_numbers(
+    block: np.ndarray, widths: tuple[int, ...], columns: tuple[str, ...]
+) -> pd.DataFrame:
+    """Parse a 2D uint8 array of ASCII characters, where each row is a line of fixed-width
+    numeric fields, into a float64 dataframe. Instead of splitting each field in Python, a
+    delimiter is inserted at every field boundary of all rows at once, and the resulting bytes
+    are parsed in a single pass by pandas' C CSV parser. Blank fields are NaN."""
+    delimited = np.insert(block, np.cumsum(widths)[:-1], ord(","), axis=1)
+    delimited = np.column_stack([delimited, np.full(len(delimited), ord("\n"), dtype=np.uint8)])
+    return pd.read_csv(
+        BytesIO(delimited.tobytes()),
+        header=None,
+        names=columns,
+        skipinitialspace=True,
+        dtype="float64",
+    )
+
+
+def _parse_outlook_for_year(
+    year: int, variable: Literal["temp", "precip"] | Variable
+) -> pd.DataFrame:
+    """Parse the raw outlook data file for a given calendar year and variable.
+
+    A data file contains one table per issue date. Each table starts with a header line that
+    includes the issue date, followed by a column header line (whose widths don't match the data,
+    so hardcoded column names are used instead), followed by fixed-width data lines. Data may end
+    with a line starting with "9999". Rather than parsing each table separately, all lines are
+    classified in one pass and the fixed-width fields of all data lines are parsed together from a
+    single byte array.
+    """
     variable = Variable(variable)
-    table_gen = _table_data_generator(year=year, variable=variable)
     if variable == Variable.TEMP:
         columns = TEMP_COLUMNS
         widths = TEMP_WIDTHS
@@ -192,12 +219,95 @@ def _read_outlook_for_year(
             widths = PRECIP_ALT_WIDTHS
         else:
             widths = PRECIP_WIDTHS
-    dfs = {}
-    for issue_date, buffer in table_gen:
-        dfs[pd.to_datetime(issue_date)] = pd.read_fwf(
-            buffer, header=None, names=columns, widths=widths
-        ).set_index(["YEAR", "MN", "LEAD", "CD"])
-    return pd.concat(dfs, names=["issue_date"])
+    header_substr = _get_header_substr(variable)
+
+    issue_dates = []
+    data_lines = []
+    # Index of the table (i.e., issue date) that each data line belongs to
+    table_index = []
+    for line in _get_outlook_path(year, variable).read_bytes().splitlines():
+        if line.startswith(b"9999"):
+            # End of data
+            break
+        elif header_substr in line:
+            # Read issue date from first header line
+            month, day, year = int(line[:2].strip()), int(line[2:4]), int(line[5:9])
+            issue_dates.append(datetime.date(year, month, day))
+        elif line.startswith(b"YEAR") or not line.strip():
+            # Skip column header row because the widths don't match the data
+            # We'll pass in hardcoded column names
+            continue
+        else:
+            if not issue_dates:
+                raise Exception("Parsing error. No issue date but buffer is not empty.")
+            data_lines.append(line)
+            table_index.append(len(issue_dates) - 1)
+
+    # Fixed-width byte array of all data lines, with short lines padded by spaces
+    total_width = sum(widths)
+    block = np.frombuffer(
+        b"".join(line[:total_width].ljust(total_width) for line in data_lines), dtype=np.uint8
+    ).reshape(-1, total_width)
+    df = _parse_fixed_width_numbers(block, widths, columns)
+
+    index_columns = ["YEAR", "MN", "LEAD", "CD"]
+    df.index = pd.MultiIndex.from_arrays(
+        [np.array(issue_dates, dtype="datetime64[ns]")[table_index]]
+        + [df.pop(col).astype("int64") for col in index_columns],
+        names=["issue_date"] + index_columns,
+    )
+    return df
+
+
+def _get_compiled_path(path: Path, cache_dir: Path | None = None) -> Path | None:
+    """Path to the compiled Parquet file for a raw data file, or None if no cache directory is
+    configured."""
+    cache_dir = cache_dir or CACHE_ROOT
+    if cache_dir is None:
+        return None
+    return Path(cache_dir) / COMPILED_DIR_NAME / f"{path.stem}.parquet"
+
+
+def compile_cpc_outlooks(cache_dir: Path | None = None, overwrite: bool = False) -> list[Path]:
+    """Parse every raw CPC Outlooks data file once and save it as a typed Parquet file in
+    `cache_dir`. Subsequent reads with `read_cpc_outlooks_temp` and `read_cpc_outlooks_precip`
+    load the Parquet file's columns directly instead of parsing the fixed-width text. Compiled
+    files that are newer than their raw data file are skipped unless `overwrite` is True.
+
+    Since the data directory is read-only in the code execution runtime, you can, for example,
+    call this in your `preprocess` function with `cache_dir=preprocessed_dir`, and set the
+    `WSFR_CACHE_ROOT` environment variable to the same directory before importing `wsfr_read`.
+
+    Args:
+        cache_dir (Path | None): Directory to save compiled files to. Files will be saved in a
+            subdirectory "cpc_outlooks". Default of None uses the `WSFR_CACHE_ROOT` environment
+            variable.
+        overwrite (bool): Whether to recompile files that are up to date.
+
+    Returns:
+        list[Path]: Paths of the compiled files.
+    """
+    cache_dir = cache_dir or CACHE_ROOT
+    if cache_dir is None:
+        raise ValueError("cache_dir must be provided if WSFR_CACHE_ROOT is not set.")
+    compiled_paths = []
+    for variable, template in (
+        (Variable.TEMP, TEMP_FILENAME_TEMPLATE),
+        (Variable.PRECIP, PRECIP_FILENAME_TEMPLATE),
+    ):
+        for path in sorted(CPC_OUTLOOKS_DIR.glob(template.format(year="*"))):
+            year = int(path.suffixes[0].lstrip("."))
+            compiled_path = _get_compiled_path(path, cache_dir)
+            if overwrite or not is_compiled_current(path, compiled_path):
+                logger.debug("Compiling {} to {}", path, compiled_path)
+                compiled_path.parent.mkdir(exist_ok=True, parents=True)
+                # Write to a temporary file first so that an interrupted run doesn't leave a
+                # partial file that is newer than its data file
+                tmp_path = compiled_path.with_suffix(".tmp")
+                _parse_outlook_for_year(year, variable).to_parquet(tmp_path)
+                tmp_path.replace(compiled_path)
+            compiled_paths.append(compiled_path)
+    return compiled_paths
 
 
 def read_cpc_outlooks_temp(
@@ -304,27 +414,199 @@ def read_cpc_outlooks_precip(
     return df
 
 
+class CPCOutlooksIndex:
+    """As-of index over CPC Outlooks for a range of forecast years, for building features for
+    many (site_id, issue_date) pairs. Data files are loaded once when the index is created. For
+    each forecast year and site, the outlooks of that water year are sorted by issue date, so
+    that the outlooks available as of an issue date are a leading slice found with a binary
+    search. Returned dataframes are views into the index and should not be modified.
+
+    For a given issue date, `get` returns the same rows as `read_cpc_outlooks_temp` or
+    `read_cpc_outlooks_precip`, sorted by issue date.
+
+    Args:
+        variable (Literal["temp", "precip"]): Outlook variable.
+        forecast_years (Iterable[int]): Forecast years to load. The data files for each forecast
+            year and the previous calendar year are loaded.
+        site_ids (Iterable[str] | None): Sites to index. Default None indexes all sites in the
+            metadata.
+        fy_start_month (int): The start month to load data for. Used to determine the lookback
+            window in the previous calendar year to return outlooks starting from.
+    """
+
+    def __init__(
+        self,
+        variable: Literal["temp", "precip"] | Variable,
+        forecast_years: Iterable[int],
+        site_ids: Iterable[str] | None = None,
+        fy_start_month: int = 10,
+    ):
+        self.variable = Variable(variable)
+        self.fy_start_month = fy_start_month
+        site_climate_divisions = get_site_climate_divisions()
+        self.site_ids = list(site_ids) if site_ids is not None else list(site_climate_divisions)
+        # (site_id, forecast_year) -> (outlooks sorted by issue date, issue dates as datetime64)
+        self._slices: dict[tuple[str, int], tuple[pd.DataFrame, np.ndarray]] = {}
+        for forecast_year in sorted(set(forecast_years)):
+            fy_df = self._load_forecast_year(forecast_year)
+            cds = fy_df.index.get_level_values("CD").values
+            for site_id in self.site_ids:
+                site_df = fy_df[np.isin(cds, site_climate_divisions[site_id])]
+                self._slices[(site_id, forecast_year)] = (
+                    site_df,
+                    site_df.index.get_level_values("issue_date").values,
+                )
+
+    def _load_forecast_year(self, forecast_year: int) -> pd.DataFrame:
+        prev_year_df = _read_outlook_for_year(forecast_year - 1, self.variable)
+        data_frames = [
+            prev_year_df[prev_year_df.index.get_level_values("MN") >= self.fy_start_month]
+        ]
+        try:
+            data_frames.append(_read_outlook_for_year(forecast_year, self.variable))
+        except FileNotFoundError:
+            logger.warning(
+                "No CPC {} outlooks available for calender year {}. "
+                "Only data from calender year {} loaded.",
+                self.variable.value,
+                forecast_year,
+                forecast_year - 1,
+            )
+        fy_df = pd.concat(data_frames)
+        order = np.argsort(fy_df.index.get_level_values("issue_date").values, kind="stable")
+        return fy_df.iloc[order]
+
+    def get(self, site_id: str, issue_date: str | datetime.date | pd.Timestamp) -> pd.DataFrame:
+        """Outlooks for a site's climate divisions available as of an issue date, i.e., issued
+        in that issue date's water year before the issue date.
+
+        Args:
+            site_id (str): site_id for a forecast site from the challenge.
+            issue_date (str | datetime.date | pd.Timestamp): Issue date of forecast.
+
+        Returns:
+            pd.DataFrame: Dataframe with outlooks, sorted by issue date.
+        """
+        issue_date = pd.to_datetime(issue_date)
+        try:
+            site_df, issue_dates = self._slices[(site_id, issue_date.year)]
+        except KeyError:
+            raise KeyError(
+                f"Forecast year {issue_date.year} for site {site_id} is not in this index."
+            )
+        stop = np.searchsorted(issue_dates, issue_date.to_datetime64(), side="left")
+        return site_df.iloc[:stop]
+
+    def iter_submission_format(
+        self, submission_format: pd.DataFrame
+    ) -> Iterator[tuple[str, pd.Timestamp, pd.DataFrame]]:
+        """Generator over the rows of a submission format, yielding a tuple of site_id, issue
+        date, and the outlooks as of that issue date for each row.
+
+        Args:
+            submission_format (pd.DataFrame): Dataframe with a "site_id" and an "issue_date"
+                column or index level, such as the submission format or cross-validation
+                labels.
+        """
+        keys = submission_format.reset_index()[["site_id", "issue_date"]]
+        for site_id, issue_date in zip(keys["site_id"], pd.to_datetime(keys["issue_date"])):
+            yield site_id, issue_date, self.get(site_id, issue_date)
+
+    @classmethod
+    def from_submission_format(
+        cls,
+        variable: Literal["temp", "precip"] | Variable,
+        submission_format: pd.DataFrame,
+        fy_start_month: int = 10,
+    ) -> "CPCOutlooksIndex":
+        """Create an index for the sites and forecast years in a submission format."""
+        keys = submission_format.reset_index()[["site_id", "issue_date"]]
+        return cls(
+            variable,
+            forecast_years=pd.to_datetime(keys["issue_date"]).dt.year.unique(),
+            site_ids=keys["site_id"].unique(),
+            fy_start_month=fy_start_month,
+        )
+
+
 def read_cpc_climate_divisions_geo() -> gpd.GeoDataFrame:
     """Read geospatial vector data for the CPC climate divisions, also called forecast divisions.
     These are geographical regions for which the CPC Outlooks correspond to. The climate division
     is identifier is in the "cd" column.
     """
+    return cached_read(CPC_CLIMATE_DIVISIONS_GEO_FILE, _parse_cpc_climate_divisions_geo)
+
+
+def _parse_cpc_climate_divisions_geo() -> gpd.GeoDataFrame:
     gdf = gpd.read_file(CPC_CLIMATE_DIVISIONS_GEO_FILE)
     return gdf
 
 
-def get_climate_divisions_for_site_id(site_id: str) -> list[int]:
-    """Returns a list of CPC climate divisions that spatially intersect with a site_id's drainage
-    basin."""
+def _build_site_climate_divisions() -> dict[str, list[int]]:
+    """Query the drainage basins spatial index with all climate divisions at once. Climate
+    divisions for each site are in the order of the climate divisions file."""
     metadata_df = read_metadata()
-    basins_gdf = read_geospatial("basins")
+    basins_index = read_spatial_index("basins")
     climate_divisions_gdf = read_cpc_climate_divisions_geo()
-    # Inner join to get gdf row for this site_id
-    this_site_basin_gdf = basins_gdf.merge(
-        metadata_df.loc[[site_id], []], how="inner", left_on="site_id", right_on="site_id"
+    # Pairs of climate division and drainage basin positions that intersect, sorted by climate
+    # division position
+    cd_positions, basin_positions = basins_index.tree.query(
+        climate_divisions_gdf.geometry.to_numpy(), predicate="intersects"
     )
-    # Inner spatial join to get climate divisions intersecting this drainage basin
-    this_site_divisions_gdf = climate_divisions_gdf.sjoin(
-        this_site_basin_gdf[["geometry"]], how="inner"
+    order = np.lexsort((basin_positions, cd_positions))
+    site_climate_divisions = {site_id: [] for site_id in metadata_df.index}
+    for site_id, cd in zip(
+        basins_index.site_ids[basin_positions[order]],
+        climate_divisions_gdf["CD"].to_numpy()[cd_positions[order]],
+    ):
+        if site_id in site_climate_divisions:
+            site_climate_divisions[site_id].append(int(cd))
+    return site_climate_divisions
+
+
+def get_site_climate_divisions(cache_dir: Path | None = None) -> dict[str, list[int]]:
+    """Returns a dictionary mapping every site_id to the list of CPC climate divisions that
+    spatially intersect with its drainage basin.
+
+    The mapping is computed with a single spatial join over all drainage basins and kept in
+    memory by the `wsfr_read.cache` data file cache. If a cache directory is configured, it is
+    also saved as a JSON file and loaded from there in later processes while it is newer than the
+    metadata and geospatial files.
+
+    Args:
+        cache_dir (Path | None): Directory to save the mapping to, in a subdirectory
+            "cpc_outlooks". Default of None uses the `WSFR_CACHE_ROOT` environment variable. If
+            neither is set, the mapping is only kept in memory.
+
+    Returns:
+        dict[str, list[int]]: Climate divisions for each site_id
+    """
+    return cached_read(
+        SITE_CLIMATE_DIVISIONS_SOURCE_FILES, _load_site_climate_divisions, cache_dir
     )
-    return this_site_divisions_gdf["CD"].values.tolist()
+
+
+def _load_site_climate_divisions(cache_dir: Path | None) -> dict[str, list[int]]:
+    cache_dir = cache_dir or CACHE_ROOT
+    saved_path = (
+        Path(cache_dir) / COMPILED_DIR_NAME / SITE_CLIMATE_DIVISIONS_FILE_NAME
+        if cache_dir
+        else None
+    )
+    if saved_path and is_compiled_current(SITE_CLIMATE_DIVISIONS_SOURCE_FILES, saved_path):
+        return json.loads(saved_path.read_text())
+    site_climate_divisions = _build_site_climate_divisions()
+    if saved_path:
+        logger.debug("Saving site climate divisions to {}", saved_path)
+        saved_path.parent.mkdir(exist_ok=True, parents=True)
+        # Write to a temporary file first so that an interrupted run doesn't leave a partial file
+        tmp_path = saved_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(site_climate_divisions))
+        tmp_path.replace(saved_path)
+    return site_climate_divisions
+
+
+def get_climate_divisions_for_site_id(site_id: str) -> list[int]:
+    """Returns a list of CPC climate divisions that spatially intersect with a site_id's drainage
+    basin."""
+    return list(get_site_climate_divisions()[site_id])
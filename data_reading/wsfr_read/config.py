@@ -7,4 +7,14 @@ DATA_ROOT = Path(os.getenv("WSFR_DATA_ROOT", Path.cwd() / "data"))
 METADATA_FILE = DATA_ROOT / "metadata.csv"
 GEOSPATIAL_FILE = DATA_ROOT / "geospatial.gpkg"
 
+# Directory for compiled data files, e.g., Parquet sidecars of slow-to-parse source files. The data
+# directory is read-only in the code execution runtime, so this should point somewhere writable,
+# such as the preprocessed directory. Default of None means compiled files are not used.
+CACHE_ROOT = Path(os.environ["WSFR_CACHE_ROOT"]) if os.getenv("WSFR_CACHE_ROOT") else None
+
+# Memory budget in bytes for data files kept in memory by readers. See wsfr_read.cache.
+CACHE_MAX_BYTES = int(os.getenv("WSFR_CACHE_MAX_BYTES", 2 * 1024**3))
+
 logger.info(f"DATA_ROOT is {DATA_ROOT}")
+if CACHE_ROOT:
+    logger.info(f"CACHE_ROOT is {CACHE_ROOT}")
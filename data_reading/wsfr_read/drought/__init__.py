@@ -0,0 +1,7 @@
+from wsfr_read.drought.grace_indicators import read_grace_indicators
+from wsfr_read.drought.pdsi import read_pdsi
+
+__all__ = [
+    "read_grace_indicators",
+    "read_pdsi",
+]
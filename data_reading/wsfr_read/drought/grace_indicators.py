@@ -0,0 +1,136 @@
+import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+import netCDF4
+import numpy as np
+import pandas as pd
+
+from wsfr_read.cache import cached_read
+from wsfr_read.config import DATA_ROOT, GEOSPATIAL_FILE
+from wsfr_read.sites import AreaWeights, read_grid_window, read_spatial_index
+
+GRACE_DIR = DATA_ROOT / "grace_indicators"
+# e.g., GRACEDADM_CLSM0125US_7D.A20041004.030.nc4
+FILE_NAME_PATTERN = "GRACEDADM_CLSM0125US_7D.A*.nc4"
+
+DIMENSIONS = ("time", "lat", "lon")
+
+VARIABLES = (
+    "gws_inst",  # Groundwater storage percentile
+    "rtzsm_inst",  # Root zone soil moisture percentile
+    "sfsm_inst",  # Surface soil moisture percentile
+)
+
+
+class GraceFileIndex(NamedTuple):
+    """Weekly GRACE data files of a forecast year, sorted by date."""
+
+    # Dates from the file names as datetime64[D]
+    dates: np.ndarray
+    paths: list[Path]
+
+
+def read_grace_indicators(
+    site_id: str, issue_date: str | datetime.date | pd.Timestamp
+) -> pd.DataFrame:
+    """Read GRACE-based groundwater and soil moisture drought indicators averaged over a given
+    forecast site's drainage basin for the weeks before a given forecast issue date, for the
+    forecast year of the issue date. The last row is the latest week available as of the issue
+    date.
+
+    Basin averages are weighted by the area of each grid cell covered by the basin. Only the
+    basin's bounding box is read from each weekly file. The basin's series for the forecast year
+    is computed the first time the site is read, and kept in memory by the `wsfr_read.cache`
+    data file cache until any of the weekly files changes or a file is added.
+
+    Args:
+        site_id (str): Identifier for forecast site
+        issue_date (str | datetime.date | pd.Timestamp): Date that forecast is being issued for
+
+    Returns:
+        pd.DataFrame: dataframe with index "date" and columns ["gws_inst", "rtzsm_inst",
+            "sfsm_inst"]
+    """
+    issue_date = pd.to_datetime(issue_date)
+    forecast_year = issue_date.year
+    series_df = cached_read(
+        _get_source_files(forecast_year), _build_grace_site_series, forecast_year, site_id
+    )
+    stop = np.searchsorted(series_df.index.values, issue_date.to_datetime64(), side="left")
+    return series_df.iloc[:stop].copy()
+
+
+def _get_forecast_year_dir(forecast_year: int) -> Path:
+    return GRACE_DIR / f"FY{forecast_year}"
+
+
+def _get_source_files(forecast_year: int) -> list[Path]:
+    """The forecast year's directory and its weekly data files. The downloader rewrites files in
+    place, which doesn't change the directory's modification time, so the files themselves are
+    checked. Files are listed from the file index, which is only rebuilt when the directory
+    changes."""
+    return [_get_forecast_year_dir(forecast_year), *read_grace_file_index(forecast_year).paths]
+
+
+def read_grace_file_index(forecast_year: int) -> GraceFileIndex:
+    """Index the weekly data files of a forecast year by the date in their file names, without
+    opening them. If a date has more than one file version, the latest version is used."""
+    return cached_read(
+        _get_forecast_year_dir(forecast_year), _build_grace_file_index, forecast_year
+    )
+
+
+def _build_grace_file_index(forecast_year: int) -> GraceFileIndex:
+    paths_by_date = {}
+    # Sorted so that later versions (e.g., .040 after .030) replace earlier ones
+    for path in sorted(_get_forecast_year_dir(forecast_year).glob(FILE_NAME_PATTERN)):
+        date = datetime.datetime.strptime(path.name.split(".")[1], "A%Y%m%d").date()
+        paths_by_date[date] = path
+    dates = sorted(paths_by_date)
+    return GraceFileIndex(
+        dates=np.array(dates, dtype="datetime64[D]"),
+        paths=[paths_by_date[date] for date in dates],
+    )
+
+
+def _read_grace_site_weights(forecast_year: int) -> dict[str, AreaWeights]:
+    """Area weights of every drainage basin on the GRACE grid, computed once from the grid of a
+    forecast year's first file."""
+    return cached_read(
+        # The weights only depend on the grid of the first file
+        [
+            _get_forecast_year_dir(forecast_year),
+            *read_grace_file_index(forecast_year).paths[:1],
+            GEOSPATIAL_FILE,
+        ],
+        _build_grace_site_weights,
+        forecast_year,
+    )
+
+
+def _build_grace_site_weights(forecast_year: int) -> dict[str, AreaWeights]:
+    paths = read_grace_file_index(forecast_year).paths
+    if not paths:
+        return {}
+    with netCDF4.Dataset(paths[0]) as ds:
+        lon = np.asarray(ds.variables["lon"][:], dtype="float64")
+        lat = np.asarray(ds.variables["lat"][:], dtype="float64")
+    return read_spatial_index("basins").area_weights_by_site(lon, lat)
+
+
+def _build_grace_site_series(forecast_year: int, site_id: str) -> pd.DataFrame:
+    file_index = read_grace_file_index(forecast_year)
+    weights = _read_grace_site_weights(forecast_year)[site_id]
+    values = np.full((len(file_index.paths), len(VARIABLES)), np.nan)
+    for i, path in enumerate(file_index.paths):
+        with netCDF4.Dataset(path) as ds:
+            for j, variable in enumerate(VARIABLES):
+                values[i, j] = weights.mean(
+                    read_grid_window(ds.variables[variable], weights, DIMENSIONS, {"time": 0})
+                )
+    return pd.DataFrame(
+        values,
+        index=pd.DatetimeIndex(file_index.dates.astype("datetime64[ns]"), name="date"),
+        columns=list(VARIABLES),
+    )
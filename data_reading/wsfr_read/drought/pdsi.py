@@ -0,0 +1,85 @@
+import datetime
+from pathlib import Path
+
+import netCDF4
+import numpy as np
+import pandas as pd
+
+from wsfr_read.cache import cached_read
+from wsfr_read.config import DATA_ROOT, GEOSPATIAL_FILE
+from wsfr_read.sites import AreaWeights, read_grid_window, read_spatial_index
+
+PDSI_DIR = DATA_ROOT / "pdsi"
+# e.g., pdsi_2020-10-01_2021-07-21.nc
+FILE_NAME_PATTERN = "pdsi_*.nc"
+VARIABLE = "daily_mean_palmer_drought_severity_index"
+DIMENSIONS = ("day", "lat", "lon")
+
+
+def read_pdsi(site_id: str, issue_date: str | datetime.date | pd.Timestamp) -> pd.DataFrame:
+    """Read the gridMET Palmer Drought Severity Index (PDSI) averaged over a given forecast site's
+    drainage basin for the dates before a given forecast issue date, for the forecast year of the
+    issue date. The last row is the latest value available as of the issue date.
+
+    Basin averages are weighted by the area of each grid cell covered by the basin. Only the
+    hyperslab of the basin's bounding box is read from the forecast year's CONUS file, which is a
+    few MB for most basins rather than the whole file. The basin's series for the forecast year is
+    computed the first time the site is read, and kept in memory by the `wsfr_read.cache` data
+    file cache.
+
+    Args:
+        site_id (str): Identifier for forecast site
+        issue_date (str | datetime.date | pd.Timestamp): Date that forecast is being issued for
+
+    Returns:
+        pd.DataFrame: dataframe with index "date" and column "pdsi"
+    """
+    issue_date = pd.to_datetime(issue_date)
+    path = get_path_to_file(issue_date)
+    series_df = cached_read(path, _build_pdsi_site_series, path, site_id)
+    stop = np.searchsorted(series_df.index.values, issue_date.to_datetime64(), side="left")
+    return series_df.iloc[:stop].copy()
+
+
+def get_path_to_file(issue_date: str | datetime.date | pd.Timestamp) -> Path:
+    """Get path to the PDSI data file for the forecast year of an issue date.
+
+    Args:
+        issue_date (str | datetime.date | pd.Timestamp): Date that forecast is being issued for
+
+    Returns:
+        Path: path to NetCDF file
+    """
+    forecast_year = pd.to_datetime(issue_date).year
+    paths = sorted((PDSI_DIR / f"FY{forecast_year}").glob(FILE_NAME_PATTERN))
+    if not paths:
+        raise FileNotFoundError(f"No PDSI data file for forecast year {forecast_year}")
+    return paths[-1]
+
+
+def _read_pdsi_site_weights(path: Path) -> dict[str, AreaWeights]:
+    """Area weights of every drainage basin on the grid of a PDSI data file."""
+    return cached_read([path, GEOSPATIAL_FILE], _build_pdsi_site_weights, path)
+
+
+def _build_pdsi_site_weights(path: Path) -> dict[str, AreaWeights]:
+    with netCDF4.Dataset(path) as ds:
+        lon = np.asarray(ds.variables["lon"][:], dtype="float64")
+        lat = np.asarray(ds.variables["lat"][:], dtype="float64")
+    return read_spatial_index("basins").area_weights_by_site(lon, lat)
+
+
+def _build_pdsi_site_series(path: Path, site_id: str) -> pd.DataFrame:
+    weights = _read_pdsi_site_weights(path)[site_id]
+    with netCDF4.Dataset(path) as ds:
+        day = ds.variables["day"]
+        dates = netCDF4.num2date(
+            day[:], day.units, only_use_cftime_datetimes=False, only_use_python_datetimes=True
+        )
+        values = weights.mean(read_grid_window(ds.variables[VARIABLE], weights, DIMENSIONS))
+    df = pd.DataFrame(
+        {"pdsi": values},
+        index=pd.DatetimeIndex(pd.to_datetime(list(dates)).normalize(), name="date"),
+    )
+    # Sorted by date for as-of lookups
+    return df.sort_index(kind="stable")
@@ -0,0 +1,13 @@
+from wsfr_read.land_cover.nlcd_impervious import (
+    build_nlcd_impervious_summary,
+    list_nlcd_impervious_members,
+    read_nlcd_impervious,
+    read_nlcd_release_dates,
+)
+
+__all__ = [
+    "build_nlcd_impervious_summary",
+    "list_nlcd_impervious_members",
+    "read_nlcd_impervious",
+    "read_nlcd_release_dates",
+]
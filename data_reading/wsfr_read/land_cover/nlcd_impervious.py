@@ -0,0 +1,217 @@
+"""Urban imperviousness of each drainage basin from the National Land Cover Database (NLCD),
+saved as one small Parquet file so that models can use it without reading the 19 GB archive at
+predict time. The rasters are read directly from the zip archive through GDAL's `/vsizip/`
+virtual file system, so the archive doesn't need to be extracted. Build the table with
+`build_nlcd_impervious_summary`, e.g., in your `preprocess` function, and read it with
+`read_nlcd_impervious`.
+"""
+
+import datetime
+from pathlib import Path
+import re
+from typing import NamedTuple
+import zipfile
+
+import numpy as np
+import pandas as pd
+import rasterio
+import rasterio.errors
+import rasterio.features
+import rasterio.windows
+
+from wsfr_read.cache import cached_read
+from wsfr_read.config import CACHE_ROOT, DATA_ROOT, logger
+from wsfr_read.sites import read_geospatial
+
+ZIP_FILE = DATA_ROOT / "NLCD_impervious_2021_release_all_files_20230630.zip"
+RELEASE_DATES_FILE = DATA_ROOT / "nlcd_release_dates.csv"
+# e.g., nlcd_2021_impervious_l48_20230630.img. Excludes the impervious descriptor rasters.
+MEMBER_NAME_PATTERN = re.compile(r"nlcd_(\d{4})_impervious_l48_\d{8}\.img$")
+
+COMPILED_DIR_NAME = "nlcd"
+SUMMARY_FILE_NAME = "impervious_basin_summary.parquet"
+# Values are percent impervious from 0 to 100. Anything above is background or no data.
+MAX_VALUE = 100
+# Number of raster rows read at a time, which bounds memory use for large basins
+BLOCK_ROWS = 2048
+
+
+class NlcdMember(NamedTuple):
+    """Impervious surface raster of an NLCD year in the zip archive."""
+
+    year: int
+    # Name of the member in the zip archive
+    name: str
+
+
+def _get_summary_path(cache_dir: Path | None = None) -> Path:
+    cache_dir = cache_dir or CACHE_ROOT
+    if cache_dir is None:
+        raise ValueError("cache_dir must be provided if WSFR_CACHE_ROOT is not set.")
+    return Path(cache_dir) / COMPILED_DIR_NAME / SUMMARY_FILE_NAME
+
+
+def list_nlcd_impervious_members() -> list[NlcdMember]:
+    """List the impervious surface rasters in the NLCD zip archive, sorted by year. Only the
+    archive's central directory is read."""
+    with zipfile.ZipFile(ZIP_FILE) as zf:
+        names = zf.namelist()
+    members = []
+    for name in names:
+        if match := MEMBER_NAME_PATTERN.search(name):
+            members.append(NlcdMember(year=int(match.group(1)), name=name))
+    return sorted(members)
+
+
+def _summarize_member(member: NlcdMember) -> pd.DataFrame:
+    """Zonal statistics of one impervious surface raster for every drainage basin. Only the
+    window of the raster that covers each basin is read, in blocks of rows."""
+    basins_gdf = read_geospatial("basins")
+    impervious_sum = np.zeros(len(basins_gdf))
+    impervious_count = np.zeros(len(basins_gdf), dtype="int64")
+    n_cells = np.zeros(len(basins_gdf), dtype="int64")
+    with rasterio.open(f"/vsizip/{ZIP_FILE}/{member.name}") as src:
+        geometries = basins_gdf.geometry.to_crs(src.crs)
+        for i, geometry in enumerate(geometries):
+            try:
+                window = rasterio.features.geometry_window(src, [geometry])
+            except rasterio.errors.WindowError:
+                # Basin is outside of the raster
+                continue
+            for row_off in range(window.row_off, window.row_off + window.height, BLOCK_ROWS):
+                block = rasterio.windows.Window(
+                    window.col_off,
+                    row_off,
+                    window.width,
+                    min(BLOCK_ROWS, window.row_off + window.height - row_off),
+                )
+                # True for cells with centers in the basin
+                in_basin = rasterio.features.geometry_mask(
+                    [geometry],
+                    out_shape=(block.height, block.width),
+                    transform=src.window_transform(block),
+                    invert=True,
+                )
+                values = src.read(1, window=block)[in_basin]
+                is_valid = values <= MAX_VALUE
+                impervious_sum[i] += values[is_valid].sum(dtype="int64")
+                impervious_count[i] += is_valid.sum()
+                n_cells[i] += len(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        impervious_fraction = impervious_sum / MAX_VALUE / impervious_count
+    return pd.DataFrame(
+        {
+            "site_id": basins_gdf["site_id"].values,
+            "year": member.year,
+            "impervious_fraction": impervious_fraction,
+            "impervious_count": impervious_count,
+            "n_cells": n_cells,
+        }
+    )
+
+
+def build_nlcd_impervious_summary(cache_dir: Path | None = None) -> Path:
+    """Compute the impervious fraction of every drainage basin for each NLCD year in the zip
+    archive and save it as a Parquet file in `cache_dir`, with a row per site and year and
+    columns "impervious_fraction" (mean impervious percent of the basin's cells with data,
+    divided by 100), "impervious_count" (number of cells with data), and "n_cells" (number of
+    cells with centers in the basin).
+
+    Building is incremental: years that are already in the file are skipped, so the archive is
+    only read once.
+
+    Args:
+        cache_dir (Path | None): Directory to save the summary file to. The file will be saved in
+            a subdirectory "nlcd". Default of None uses the `WSFR_CACHE_ROOT` environment
+            variable.
+
+    Returns:
+        Path: Path of the summary file.
+    """
+    summary_path = _get_summary_path(cache_dir)
+    existing_df = pd.read_parquet(summary_path) if summary_path.exists() else None
+    processed_years = set(existing_df["year"]) if existing_df is not None else set()
+    new_members = [
+        member for member in list_nlcd_impervious_members() if member.year not in processed_years
+    ]
+    logger.info(
+        "Summarizing {} new NLCD impervious years ({} already processed)",
+        len(new_members),
+        len(processed_years),
+    )
+    if new_members:
+        year_dfs = []
+        for member in new_members:
+            logger.info("Summarizing NLCD impervious {}", member.year)
+            year_dfs.append(_summarize_member(member))
+        dfs = [df for df in [existing_df, *year_dfs] if df is not None]
+        df = pd.concat(dfs, ignore_index=True).sort_values(
+            ["site_id", "year"], kind="stable", ignore_index=True
+        )
+        summary_path.parent.mkdir(exist_ok=True, parents=True)
+        # Write to a temporary file first so that an interrupted run doesn't leave a partial file
+        tmp_path = summary_path.with_suffix(".tmp")
+        df.to_parquet(tmp_path, index=False)
+        tmp_path.replace(summary_path)
+    return summary_path
+
+
+def read_nlcd_release_dates() -> pd.Series:
+    """Read the release date of each NLCD year.
+
+    Returns:
+        pd.Series: release dates with index "year"
+    """
+    return cached_read(RELEASE_DATES_FILE, _parse_nlcd_release_dates)
+
+
+def _parse_nlcd_release_dates() -> pd.Series:
+    df = pd.read_csv(RELEASE_DATES_FILE)
+    # Columns are the NLCD year and its release date
+    return pd.Series(
+        pd.to_datetime(df.iloc[:, 1]).values,
+        index=pd.Index(df.iloc[:, 0].astype("int64").values, name="year"),
+        name="release_date",
+    ).sort_index()
+
+
+def read_nlcd_impervious(
+    site_id: str,
+    issue_date: str | datetime.date | pd.Timestamp,
+    cache_dir: Path | None = None,
+) -> pd.DataFrame:
+    """Read the impervious fraction of a given forecast site's drainage basin from
+    `build_nlcd_impervious_summary` for the NLCD years that were released before a given
+    forecast issue date, according to nlcd_release_dates.csv. The last row is the latest NLCD
+    year available as of the issue date.
+
+    Args:
+        site_id (str): Identifier for forecast site
+        issue_date (str | datetime.date | pd.Timestamp): Date that forecast is being issued for
+        cache_dir (Path | None): Directory with the summary file. Default of None uses the
+            `WSFR_CACHE_ROOT` environment variable.
+
+    Returns:
+        pd.DataFrame: dataframe with index "year" and columns "release_date",
+            "impervious_fraction", "impervious_count", and "n_cells"
+    """
+    issue_date = pd.to_datetime(issue_date)
+    path = _get_summary_path(cache_dir)
+    site_dfs = cached_read([path, RELEASE_DATES_FILE], _load_nlcd_impervious_summary, path)
+    if site_id not in site_dfs:
+        raise KeyError(f"No NLCD impervious summaries for site_id {site_id} in {path}")
+    site_df = site_dfs[site_id]
+    return site_df[site_df["release_date"] < issue_date].copy()
+
+
+def _load_nlcd_impervious_summary(path: Path) -> dict[str, pd.DataFrame]:
+    """Loads the summary file split into a dataframe per site indexed by year, with the release
+    date of each year. Years without a release date are left out."""
+    df = pd.read_parquet(path)
+    release_dates = read_nlcd_release_dates()
+    df = df[df["year"].isin(release_dates.index)].copy()
+    df.insert(2, "release_date", release_dates.loc[df["year"]].values)
+    return {
+        site_id: site_df.drop(columns="site_id").set_index("year").sort_index()
+        for site_id, site_df in df.groupby("site_id", sort=False)
+    }
@@ -1,10 +1,13 @@
 import enum
-from functools import cache
-from typing import Literal
+import sys
+from typing import Literal, NamedTuple, Sequence
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
+import shapely
 
+from wsfr_read.cache import cached_read
 from wsfr_read.config import GEOSPATIAL_FILE, METADATA_FILE
 
 
@@ -13,16 +16,244 @@ class Layer(str, enum.Enum):
     SITES = "sites"
 
 
-@cache
 def read_metadata() -> pd.DataFrame:
     """Load competition metadata.csv file with site metadata."""
+    return cached_read(METADATA_FILE, _parse_metadata)
+
+
+def _parse_metadata() -> pd.DataFrame:
     metadata_df = pd.read_csv(METADATA_FILE, index_col="site_id", dtype={"usgs_id": "string"})
     return metadata_df
 
 
 def read_geospatial(layer: Literal["basins", "sites"] | Layer):
     """Load competition geospatial.gpkg file with site polygons. Valid layers are "basins" for
-    drainage basin delineations or "sites" for forecast site point locations.
+    drainage basin delineations or "sites" for forecast site point locations. The layer is kept
+    in memory, so the returned dataframe should not be modified in place.
     """
     layer = Layer(layer)
+    return cached_read(GEOSPATIAL_FILE, _parse_geospatial, layer)
+
+
+def _parse_geospatial(layer: Layer) -> gpd.GeoDataFrame:
     return gpd.read_file(GEOSPATIAL_FILE, layer=layer, index_col="site_id")
+
+
+class AreaWeights(NamedTuple):
+    """Weights of the cells of a regular lon/lat grid for a geometry, proportional to the area of
+    each cell that the geometry covers. Weights are for the window of the grid given by `rows`
+    and `cols` and sum to 1."""
+
+    rows: slice
+    cols: slice
+    # Array of shape (rows, cols)
+    weights: np.ndarray
+
+    def mean(self, values: np.ndarray) -> np.ndarray | float:
+        """Area-weighted mean of gridded values over the geometry, skipping NaN values. `values`
+        are for the window and have shape (..., rows, cols), e.g., with a leading time
+        dimension. The mean is NaN where no covered cells have data."""
+        is_valid = ~np.isnan(values)
+        weights = np.where(is_valid, self.weights, 0.0)
+        weighted_sums = (np.where(is_valid, values, 0.0) * weights).sum(axis=(-2, -1))
+        total_weights = weights.sum(axis=(-2, -1))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return weighted_sums / np.where(total_weights > 0, total_weights, np.nan)
+
+
+def read_grid_window(
+    variable,
+    weights: AreaWeights,
+    dimensions: Sequence[str],
+    indexes: dict[str, int] | None = None,
+) -> np.ndarray:
+    """Read only the window of `weights` from a gridded variable, e.g., a `netCDF4.Variable`,
+    with missing values as NaN.
+
+    Args:
+        variable: Array-like variable with a `dimensions` attribute of dimension names, which may
+            be in any order
+        weights (AreaWeights): Area weights with the window of the grid to read
+        dimensions (Sequence[str]): Names of the variable's dimensions in the order of the
+            returned array, ending with the latitude and longitude dimensions, e.g.,
+            ("day", "lat", "lon")
+        indexes (dict[str, int] | None): Index to read along other dimensions, e.g., {"time": 0}.
+            These dimensions are dropped from the returned array. Dimensions without an index
+            are read in full.
+
+    Returns:
+        np.ndarray: float64 array with the dimensions that don't have an index, in the order of
+            `dimensions`
+    """
+    *other_dims, lat_dim, lon_dim = dimensions
+    slices = {dim: slice(None) for dim in other_dims} | (indexes or {})
+    slices |= {lat_dim: weights.rows, lon_dim: weights.cols}
+    slab = variable[tuple(slices[dim] for dim in variable.dimensions)]
+    slab = np.ma.filled(np.ma.asarray(slab, dtype="float64"), np.nan)
+    read_dims = [dim for dim in variable.dimensions if isinstance(slices[dim], slice)]
+    return slab.transpose([read_dims.index(dim) for dim in dimensions if dim in read_dims])
+
+
+class SpatialIndex:
+    """Shapely STRtree over the geometries of a layer of geospatial.gpkg, with lookups of sites by
+    location. Coordinates must be in the CRS of the layer (`crs`), which is WGS 84 longitude and
+    latitude for the competition file. Use `read_spatial_index` to get the shared instance for a
+    layer.
+
+    Args:
+        gdf (gpd.GeoDataFrame): Layer with columns "site_id" and "geometry"
+    """
+
+    def __init__(self, gdf: gpd.GeoDataFrame):
+        self.crs = gdf.crs
+        self.site_ids = gdf["site_id"].to_numpy()
+        self.geometries = gdf.geometry.to_numpy()
+        self.tree = shapely.STRtree(self.geometries)
+        self._positions = {site_id: i for i, site_id in enumerate(self.site_ids)}
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated memory used by the index, for the `wsfr_read.cache` memory budget."""
+        site_ids_nbytes = self.site_ids.nbytes + sum(
+            sys.getsizeof(site_id) for site_id in self.site_ids
+        )
+        # 2D float64 coordinates of the geometries, and about 100 bytes per geometry for its
+        # Python object, tree node, and entry in the positions lookup
+        n_coordinates = int(shapely.get_num_coordinates(self.geometries).sum())
+        return site_ids_nbytes + 16 * n_coordinates + 100 * len(self.geometries)
+
+    def geometry(self, site_id: str) -> shapely.Geometry:
+        """Geometry for a site."""
+        return self.geometries[self._positions[site_id]]
+
+    def bounds(self, site_id: str) -> tuple[float, float, float, float]:
+        """Bounding box (minx, miny, maxx, maxy) of a site's geometry."""
+        return tuple(shapely.bounds(self.geometry(site_id)).tolist())
+
+    def sites_containing_points(self, x: Sequence[float], y: Sequence[float]) -> pd.DataFrame:
+        """Find the sites whose geometries contain each point, e.g., the drainage basins that a
+        set of stations are in. Points on a geometry's boundary count as contained.
+
+        Args:
+            x (Sequence[float]): x coordinates (longitude) of the points
+            y (Sequence[float]): y coordinates (latitude) of the points
+
+        Returns:
+            pd.DataFrame: dataframe with a row per matching point and site and columns "point"
+                (position of the point in x and y) and "site_id", sorted by point and then in the
+                order of the layer. Points outside of all geometries have no rows.
+        """
+        points = shapely.points(np.asarray(x, dtype="float64"), np.asarray(y, dtype="float64"))
+        point_positions, site_positions = self.tree.query(points, predicate="intersects")
+        order = np.lexsort((site_positions, point_positions))
+        return pd.DataFrame(
+            {
+                "point": point_positions[order],
+                "site_id": self.site_ids[site_positions[order]],
+            }
+        )
+
+    def sites_intersecting_bbox(
+        self, minx: float, miny: float, maxx: float, maxy: float
+    ) -> list[str]:
+        """site_ids whose geometries intersect a bounding box, in the order of the layer."""
+        positions = self.tree.query(shapely.box(minx, miny, maxx, maxy), predicate="intersects")
+        return self.site_ids[np.sort(positions)].tolist()
+
+    def raster_window(
+        self, site_id: str, x: Sequence[float], y: Sequence[float], pad: int = 0
+    ) -> tuple[slice, slice]:
+        """Window of a regular grid that covers the bounding box of a site's geometry, so that
+        gridded data can be read or subset to only the cells around a site.
+
+        Args:
+            site_id (str): Identifier for forecast site
+            x (Sequence[float]): Cell center x coordinates (longitude) of the grid's columns,
+                sorted ascending or descending
+            y (Sequence[float]): Cell center y coordinates (latitude) of the grid's rows, sorted
+                ascending or descending
+            pad (int): Number of extra cells to include on each side
+
+        Returns:
+            tuple[slice, slice]: Slices of the grid's rows and columns, i.e., to index an array
+                with shape (len(y), len(x)). The slices are empty if the site is outside the grid.
+        """
+        return raster_window_for_bounds(self.bounds(site_id), x, y, pad=pad)
+
+    def area_weights(self, site_id: str, x: Sequence[float], y: Sequence[float]) -> AreaWeights:
+        """Area weights of a site's geometry on a regular lon/lat grid, for area-weighted means
+        of gridded data over a drainage basin. Each cell's weight is the area of the cell that is
+        covered by the geometry, accounting for cells being smaller towards the poles. Unlike
+        testing cell centers, this works for basins that are small relative to the grid cells.
+
+        Args:
+            site_id (str): Identifier for forecast site
+            x (Sequence[float]): Cell center longitudes of the grid's columns
+            y (Sequence[float]): Cell center latitudes of the grid's rows
+
+        Returns:
+            AreaWeights: Window of the grid around the site and weights of its cells
+        """
+        x = np.asarray(x, dtype="float64")
+        y = np.asarray(y, dtype="float64")
+        rows, cols = self.raster_window(site_id, x, y)
+        half_width = abs(x[1] - x[0]) / 2
+        half_height = abs(y[1] - y[0]) / 2
+        yy, xx = np.meshgrid(y[rows], x[cols], indexing="ij")
+        cells = shapely.box(xx - half_width, yy - half_height, xx + half_width, yy + half_height)
+        covered_area = shapely.area(shapely.intersection(cells, self.geometry(site_id)))
+        weights = covered_area * np.cos(np.deg2rad(yy))
+        if weights.sum() > 0:
+            weights = weights / weights.sum()
+        return AreaWeights(rows=rows, cols=cols, weights=weights)
+
+    def area_weights_by_site(
+        self, x: Sequence[float], y: Sequence[float]
+    ) -> dict[str, AreaWeights]:
+        """Area weights of every site's geometry on a regular lon/lat grid. See `area_weights`."""
+        return {site_id: self.area_weights(site_id, x, y) for site_id in self.site_ids}
+
+
+def raster_window_for_bounds(
+    bounds: tuple[float, float, float, float],
+    x: Sequence[float],
+    y: Sequence[float],
+    pad: int = 0,
+) -> tuple[slice, slice]:
+    """Window of a regular grid that covers a bounding box (minx, miny, maxx, maxy) in the grid's
+    coordinates. See `SpatialIndex.raster_window`, which uses this with a site's bounding box.
+
+    Returns:
+        tuple[slice, slice]: Slices of the grid's rows and columns
+    """
+    minx, miny, maxx, maxy = bounds
+    return _axis_window(y, miny, maxy, pad), _axis_window(x, minx, maxx, pad)
+
+
+def _axis_window(coords: Sequence[float], lower: float, upper: float, pad: int) -> slice:
+    """Slice of sorted cell center coordinates for the cells that overlap [lower, upper]."""
+    coords = np.asarray(coords, dtype="float64")
+    half_cell = abs(coords[1] - coords[0]) / 2 if len(coords) > 1 else 0.0
+    if len(coords) > 1 and coords[1] < coords[0]:
+        # Descending coordinates, e.g., latitude from north to south
+        start = np.searchsorted(-coords, -(upper + half_cell), side="left")
+        stop = np.searchsorted(-coords, -(lower - half_cell), side="right")
+    else:
+        start = np.searchsorted(coords, lower - half_cell, side="left")
+        stop = np.searchsorted(coords, upper + half_cell, side="right")
+    if start >= stop:
+        return slice(0, 0)
+    return slice(int(max(start - pad, 0)), int(min(stop + pad, len(coords))))
+
+
+def read_spatial_index(layer: Literal["basins", "sites"] | Layer = "basins") -> SpatialIndex:
+    """Load a shared spatial index over a layer of the competition geospatial.gpkg file. The index
+    is built once per process and kept in memory with the layer. Valid layers are "basins" for
+    drainage basin delineations or "sites" for forecast site point locations.
+    """
+    layer = Layer(layer)
+    return cached_read(GEOSPATIAL_FILE, _build_spatial_index, layer)
+
+
+def _build_spatial_index(layer: Layer) -> SpatialIndex:
+    return SpatialIndex(read_geospatial(layer))
@@ -0,0 +1,41 @@
+from wsfr_read.snowpack.cdec import (
+    compile_cdec,
+    read_cdec,
+    read_cdec_arrays,
+    read_cdec_forecast_year,
+)
+from wsfr_read.snowpack.snodas import (
+    compute_snodas_basin_stats,
+    get_snodas_basin_masks,
+    get_snodas_grid_coords,
+    read_snodas_basin_stats,
+    read_snodas_grid,
+)
+from wsfr_read.snowpack.snodas_summary import (
+    build_snodas_basin_summaries,
+    read_snodas_basin_summary,
+)
+from wsfr_read.snowpack.snotel import (
+    compile_snotel,
+    read_snotel,
+    read_snotel_arrays,
+    read_snotel_forecast_year,
+)
+
+__all__ = [
+    "build_snodas_basin_summaries",
+    "compile_cdec",
+    "compile_snotel",
+    "compute_snodas_basin_stats",
+    "get_snodas_basin_masks",
+    "get_snodas_grid_coords",
+    "read_cdec",
+    "read_cdec_arrays",
+    "read_cdec_forecast_year",
+    "read_snodas_basin_stats",
+    "read_snodas_basin_summary",
+    "read_snodas_grid",
+    "read_snotel",
+    "read_snotel_arrays",
+    "read_snotel_forecast_year",
+]
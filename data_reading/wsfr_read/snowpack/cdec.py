@@ -0,0 +1,266 @@
+import datetime
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from wsfr_read.cache import cached_read, is_compiled_current
+from wsfr_read.config import CACHE_ROOT, DATA_ROOT, logger
+from wsfr_read.snowpack.utils import (
+    build_site_station_index,
+    get_cache_key_files,
+    get_compiled_path,
+    get_source_files,
+    load_compiled,
+    save_compiled,
+)
+
+CDEC_DIR = DATA_ROOT / "cdec"
+SITES_TO_CDEC_STATIONS_FILE = CDEC_DIR / "sites_to_cdec_stations.csv"
+COMPILED_DIR_NAME = "cdec"
+
+# See https://cdec.water.ca.gov/misc/senslist.html
+SENSOR_NUMBERS = (
+    2,  # RAIN | PRECIPITATION, ACCUMULATED | INCHES
+    3,  # SNOW WC | SNOW, WATER CONTENT | INCHES
+    18,  # SNOW DP | SNOW DEPTH | INCHES
+    30,  # TEMP | TEMPERATURE, AIR AVERAGE | DEG F
+    31,  # TEMP MX | TEMPERATURE, AIR MAXIMUM | DEG F
+    32,  # TEMP MN | TEMPERATURE, AIR MINIMUM | DEG F
+    82,  # SNO ADJ | SNOW, WATER CONTENT(REVISED) | INCHES
+    237,  # SNWCMIN | SNOW WATER CONTENT, MIN | INCHES
+    238,  # SNWCMAX | SNOW WATER CONTENT, MAX | INCHES
+)
+# Value used by CDEC for missing data
+MISSING_VALUE = -9999
+
+
+class CdecForecastYear(NamedTuple):
+    """CDEC daily data for all stations in a forecast year, pivoted from the long format of the
+    data files to a dense array with a row per station and consecutive dates. Values are NaN for
+    missing data."""
+
+    # Three-character station IDs, sorted
+    station_ids: np.ndarray
+    # Consecutive dates as datetime64[D]
+    dates: np.ndarray
+    # float32 array of shape (station, date, sensor), with sensors in the order of SENSOR_NUMBERS
+    values: np.ndarray
+
+
+class CdecArrays(NamedTuple):
+    """CDEC daily data for the stations of a site before an issue date."""
+
+    station_ids: np.ndarray
+    # Whether each station is in the site's drainage basin, otherwise within its buffer
+    in_basin: np.ndarray
+    dates: np.ndarray
+    # float32 array of shape (station, date, sensor), with sensors in the order of SENSOR_NUMBERS
+    values: np.ndarray
+
+
+def read_cdec(
+    site_id: str, issue_date: str | datetime.date | pd.Timestamp, in_basin_only: bool = False
+) -> pd.DataFrame:
+    """Read CDEC daily sensor data from the stations near a given forecast site as of a given
+    forecast issue date. Stations are matched to sites with sites_to_cdec_stations.csv. Returns
+    data for the forecast year of the issue date before the issue date.
+
+    Args:
+        site_id (str): Identifier for forecast site
+        issue_date (str | datetime.date | pd.Timestamp): Date that forecast is being issued for
+        in_basin_only (bool): Whether to only include stations within the site's drainage basin.
+            Default False also includes stations within the buffer around the basin.
+
+    Returns:
+        pd.DataFrame: dataframe with index ("station_id", "date") and a float32 column per sensor
+            number in SENSOR_NUMBERS, e.g., 3 for snow water content
+    """
+    arrays = read_cdec_arrays(site_id, issue_date, in_basin_only=in_basin_only)
+    index = pd.MultiIndex.from_product(
+        [arrays.station_ids, pd.DatetimeIndex(arrays.dates.astype("datetime64[ns]"))],
+        names=["station_id", "date"],
+    )
+    return pd.DataFrame(
+        arrays.values.reshape(-1, len(SENSOR_NUMBERS)),
+        index=index,
+        columns=pd.Index(SENSOR_NUMBERS, name="SENSOR_NUM"),
+    )
+
+
+def read_cdec_arrays(
+    site_id: str, issue_date: str | datetime.date | pd.Timestamp, in_basin_only: bool = False
+) -> CdecArrays:
+    """Same as `read_cdec`, but returns the data as arrays of shape (station, date, sensor)
+    without building a dataframe. The forecast year's data is loaded once, and the stations of
+    each site and the dates before the issue date are looked up from a prebuilt index.
+    """
+    issue_date = pd.to_datetime(issue_date)
+    forecast_year = issue_date.year
+    data = read_cdec_forecast_year(forecast_year)
+    positions, in_basin = _read_cdec_site_index(forecast_year).get(
+        site_id, (np.array([], dtype="int64"), np.array([], dtype=bool))
+    )
+    if in_basin_only:
+        positions, in_basin = positions[in_basin], in_basin[in_basin]
+    stop = np.searchsorted(data.dates, np.datetime64(issue_date.date()), side="left")
+    return CdecArrays(
+        station_ids=data.station_ids[positions],
+        in_basin=in_basin,
+        dates=data.dates[:stop],
+        values=data.values[positions, :stop],
+    )
+
+
+def read_cdec_forecast_year(forecast_year: int, cache_dir: Path | None = None) -> CdecForecastYear:
+    """Read CDEC data for all stations in a forecast year. The arrays are kept in memory by the
+    `wsfr_read.cache` data file cache and should not be modified in place.
+
+    The station data files are pivoted into one array the first time a forecast year is read. If
+    a compiled file from `compile_cdec` exists in `cache_dir` and is newer than all of the
+    forecast year's station data files, it is loaded instead of the station data files. The
+    arrays are reloaded if station data files are added or removed or the compiled file changes.
+    Station data files are only checked against the compiled file when a forecast year is loaded,
+    so that lookups stay fast. To pick up station data files that were rewritten in place while
+    a process is running, rebuild the compiled file or call `wsfr_read.cache_clear`.
+
+    Args:
+        forecast_year (int): Forecast year
+        cache_dir (Path | None): Directory with compiled files. Default of None uses the
+            `WSFR_CACHE_ROOT` environment variable.
+
+    Returns:
+        CdecForecastYear: Station IDs, dates, and array of values
+    """
+    compiled_path = get_compiled_path(COMPILED_DIR_NAME, forecast_year, cache_dir)
+    return cached_read(
+        get_cache_key_files(_get_forecast_year_dir(forecast_year), compiled_path),
+        _load_cdec_forecast_year,
+        forecast_year,
+        cache_dir,
+    )
+
+
+def _get_forecast_year_dir(forecast_year: int) -> Path:
+    return CDEC_DIR / f"FY{forecast_year}"
+
+
+def _load_cdec_forecast_year(forecast_year: int, cache_dir: Path | None) -> CdecForecastYear:
+    compiled_path = get_compiled_path(COMPILED_DIR_NAME, forecast_year, cache_dir)
+    if compiled_path and is_compiled_current(
+        get_source_files(_get_forecast_year_dir(forecast_year)), compiled_path
+    ):
+        return load_compiled(compiled_path, CdecForecastYear)
+    return _parse_cdec_forecast_year(forecast_year)
+
+
+def _parse_cdec_forecast_year(forecast_year: int) -> CdecForecastYear:
+    paths = sorted(_get_forecast_year_dir(forecast_year).glob("*.csv"))
+    station_ids = np.array([path.stem for path in paths], dtype=str)
+    empty = CdecForecastYear(
+        station_ids=station_ids,
+        dates=np.array([], dtype="datetime64[D]"),
+        values=np.empty((len(paths), 0, len(SENSOR_NUMBERS)), dtype="float32"),
+    )
+    if not paths:
+        return empty
+    # SENSOR_NUM can be missing, so it is read as float. Rows without it are dropped below.
+    dfs = [
+        pd.read_csv(
+            path,
+            usecols=["SENSOR_NUM", "date", "value"],
+            dtype={"SENSOR_NUM": "float64", "date": str, "value": "float32"},
+        )
+        for path in paths
+    ]
+    df = pd.concat(dfs, ignore_index=True)
+    station_positions = np.repeat(np.arange(len(paths)), [len(station_df) for station_df in dfs])
+
+    # Dates repeat for every station and sensor, so only parse each unique date string once
+    date_codes, date_strings = pd.factorize(df["date"])
+    unique_dates = pd.to_datetime(date_strings, format="%Y-%m-%d %H:%M").values
+    unique_dates = unique_dates.astype("datetime64[D]")
+    if not len(unique_dates):
+        # Every station's data file is empty or has no dates
+        return empty
+    dates = np.arange(unique_dates.min(), unique_dates.max() + 1, dtype="datetime64[D]")
+    date_positions = (unique_dates - dates[0]).astype("int64")[date_codes]
+    sensor_positions = pd.Index(SENSOR_NUMBERS).get_indexer(df["SENSOR_NUM"])
+    values = df["value"].to_numpy(dtype="float32")
+    values[values == MISSING_VALUE] = np.nan
+
+    # Scatter the long-format rows into the cube, dropping rows for other or missing sensors or
+    # with no date
+    keep = (sensor_positions >= 0) & (date_codes >= 0)
+    cube = np.full((len(paths), len(dates), len(SENSOR_NUMBERS)), np.nan, dtype="float32")
+    cube[station_positions[keep], date_positions[keep], sensor_positions[keep]] = values[keep]
+    return CdecForecastYear(station_ids=station_ids, dates=dates, values=cube)
+
+
+def compile_cdec(
+    forecast_years: Iterable[int] | None = None,
+    cache_dir: Path | None = None,
+    overwrite: bool = False,
+) -> list[Path]:
+    """Pivot the CDEC station data files of each forecast year into a single compiled file in
+    `cache_dir` with a float32 array of shape (station, date, sensor). Subsequent reads load the
+    compiled file instead of parsing every station's data file. Compiled files that are newer
+    than all of their forecast year's station data files are skipped unless `overwrite` is True.
+
+    See `wsfr_read.snowpack.compile_snotel` for how to use compiled files in the code execution
+    runtime.
+
+    Args:
+        forecast_years (Iterable[int] | None): Forecast years to compile. Default of None
+            compiles all forecast years in the data directory.
+        cache_dir (Path | None): Directory to save compiled files to. Files will be saved in a
+            subdirectory "cdec". Default of None uses the `WSFR_CACHE_ROOT` environment variable.
+        overwrite (bool): Whether to recompile files that are up to date.
+
+    Returns:
+        list[Path]: Paths of the compiled files.
+    """
+    cache_dir = cache_dir or CACHE_ROOT
+    if cache_dir is None:
+        raise ValueError("cache_dir must be provided if WSFR_CACHE_ROOT is not set.")
+    if forecast_years is None:
+        forecast_years = sorted(int(path.name[2:]) for path in CDEC_DIR.glob("FY*"))
+    compiled_paths = []
+    for forecast_year in forecast_years:
+        compiled_path = get_compiled_path(COMPILED_DIR_NAME, forecast_year, cache_dir)
+        if overwrite or not is_compiled_current(
+            get_source_files(_get_forecast_year_dir(forecast_year)), compiled_path
+        ):
+            logger.debug("Compiling CDEC FY{} to {}", forecast_year, compiled_path)
+            save_compiled(compiled_path, _parse_cdec_forecast_year(forecast_year))
+        compiled_paths.append(compiled_path)
+    return compiled_paths
+
+
+def read_sites_to_cdec_stations() -> pd.DataFrame:
+    """Load the mapping of forecast sites to nearby CDEC stations, with columns "site_id",
+    "station_id", and "in_basin"."""
+    return cached_read(SITES_TO_CDEC_STATIONS_FILE, _parse_sites_to_cdec_stations)
+
+
+def _parse_sites_to_cdec_stations() -> pd.DataFrame:
+    return pd.read_csv(SITES_TO_CDEC_STATIONS_FILE, dtype={"in_basin": bool})
+
+
+def _read_cdec_site_index(forecast_year: int) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Positions in the forecast year's data of each site's stations, and whether each station is
+    in the site's drainage basin. Stations without data in the forecast year are left out."""
+    return cached_read(
+        [_get_forecast_year_dir(forecast_year), SITES_TO_CDEC_STATIONS_FILE],
+        _build_cdec_site_index,
+        forecast_year,
+    )
+
+
+def _build_cdec_site_index(forecast_year: int) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    return build_site_station_index(
+        read_cdec_forecast_year(forecast_year).station_ids,
+        read_sites_to_cdec_stations(),
+        station_col="station_id",
+    )
@@ -0,0 +1,290 @@
+"""Reader for the SNODAS daily archives downloaded by `wsfr_download.snodas`. Each archive
+SNODAS_YYYYMMDD.tar holds one gzipped flat binary grid (.dat.gz) and a header (.txt.gz) per
+product. Grids are read straight out of the archive without extracting it.
+
+See the user guide for the file format and products:
+https://nsidc.org/sites/default/files/g02158-v001-userguide_2_1.pdf
+"""
+
+import datetime
+import enum
+import gzip
+from pathlib import Path
+import sys
+import tarfile
+from typing import Literal, NamedTuple, Sequence
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from wsfr_read.cache import cached_read
+from wsfr_read.config import DATA_ROOT, GEOSPATIAL_FILE
+from wsfr_read.sites import read_spatial_index
+
+SNODAS_DIR = DATA_ROOT / "snodas"
+
+# Masked grid over the contiguous US: rows from north to south and columns from west to east of
+# 2-byte big-endian signed integers
+N_ROWS = 3351
+N_COLS = 6935
+CELL_SIZE = 0.00833333333333333
+NODATA_VALUE = -9999
+# Bytes to decompress at a time
+READ_CHUNK_BYTES = 1024**2
+# Grid edges (minx, maxy) moved by half a cell on 2013-10-01
+EXTENT_CHANGE_DATE = datetime.date(2013, 10, 1)
+EXTENT_BEFORE_CHANGE = (-124.73375000000000, 52.87458333333333)
+EXTENT_AFTER_CHANGE = (-124.73333333333333, 52.87500000000000)
+
+
+class Variable(str, enum.Enum):
+    SWE = "swe"
+    SNOW_DEPTH = "snow_depth"
+    SNOWMELT_RUNOFF = "snowmelt_runoff"
+    SUBLIMATION = "sublimation"
+    BLOWING_SNOW_SUBLIMATION = "blowing_snow_sublimation"
+    SOLID_PRECIP = "solid_precip"
+    LIQUID_PRECIP = "liquid_precip"
+    SNOWPACK_TEMP = "snowpack_temp"
+
+
+class Product(NamedTuple):
+    # Start of the data file names in the archive, followed by the date
+    file_prefix: str
+    # Divide stored integers by this to get values in units
+    scale_factor: float
+    units: str
+
+
+PRODUCTS = {
+    Variable.SWE: Product("us_ssmv11034tS__T0001TTNATS", 1000, "m"),
+    Variable.SNOW_DEPTH: Product("us_ssmv11036tS__T0001TTNATS", 1000, "m"),
+    Variable.SNOWMELT_RUNOFF: Product("us_ssmv11044bS__T0024TTNATS", 100_000, "m"),
+    Variable.SUBLIMATION: Product("us_ssmv11050lL00T0024TTNATS", 100_000, "m"),
+    Variable.BLOWING_SNOW_SUBLIMATION: Product("us_ssmv11039lL00T0024TTNATS", 100_000, "m"),
+    Variable.SOLID_PRECIP: Product("us_ssmv01025SlL01T0024TTNATS", 10, "kg/m^2"),
+    Variable.LIQUID_PRECIP: Product("us_ssmv01025SlL00T0024TTNATS", 10, "kg/m^2"),
+    Variable.SNOWPACK_TEMP: Product("us_ssmv11038wS__A0024TTNATS", 1, "K"),
+}
+
+VariableLike = (
+    Literal[
+        "swe",
+        "snow_depth",
+        "snowmelt_runoff",
+        "sublimation",
+        "blowing_snow_sublimation",
+        "solid_precip",
+        "liquid_precip",
+        "snowpack_temp",
+    ]
+    | Variable
+)
+
+
+def get_path_to_file(date: str | datetime.date | pd.Timestamp, fy_start_month: int = 10) -> Path:
+    """Get path to the SNODAS archive for a date, in the directory for the date's forecast
+    year."""
+    date = pd.to_datetime(date)
+    forecast_year = date.year + 1 if date.month >= fy_start_month else date.year
+    return SNODAS_DIR / f"FY{forecast_year}" / f"SNODAS_{date.strftime('%Y%m%d')}.tar"
+
+
+def read_snodas_grid(
+    date: str | datetime.date | pd.Timestamp,
+    variable: VariableLike = "swe",
+    fy_start_month: int = 10,
+) -> np.ndarray:
+    """Read one SNODAS product grid for a date, decompressing the product's member of the daily
+    archive directly into an array. Nothing is extracted to disk, and the grid is the only copy
+    of the data held in memory.
+
+    Values are the stored integers. Divide by `PRODUCTS[variable].scale_factor` to convert to
+    `PRODUCTS[variable].units`. Cells without data, e.g., outside the contiguous US, are
+    `NODATA_VALUE` (-9999). Use `get_snodas_grid_coords` for the coordinates of the grid cells.
+
+    Args:
+        date (str | datetime.date | pd.Timestamp): Date of the data
+        variable (str | Variable): SNODAS product, e.g., "swe" for snow water equivalent or
+            "snow_depth"
+        fy_start_month (int): Month that forecast years start, used to find the archive's
+            forecast year directory
+
+    Returns:
+        np.ndarray: int16 array of shape (N_ROWS, N_COLS), with rows from north to south and
+            columns from west to east
+    """
+    product = PRODUCTS[Variable(variable)]
+    path = get_path_to_file(date, fy_start_month=fy_start_month)
+    with tarfile.open(path, mode="r:") as tar:
+        for member in tar:
+            if member.name.startswith(product.file_prefix) and member.name.endswith(".dat.gz"):
+                break
+        else:
+            raise KeyError(f"No {variable} data file in {path}")
+        with tar.extractfile(member) as f, gzip.GzipFile(fileobj=f) as gz:
+            grid = np.empty((N_ROWS, N_COLS), dtype=">i2")
+            buffer = memoryview(grid).cast("B")
+            n_read = 0
+            while n_read < len(buffer):
+                # GzipFile.readinto reads into a temporary bytes object of the requested size,
+                # so read in chunks to keep memory use to about one grid
+                n = gz.readinto(buffer[n_read : n_read + READ_CHUNK_BYTES])
+                if n == 0:
+                    raise ValueError(f"Unexpected end of {member.name} in {path}")
+                n_read += n
+    # Convert to native byte order in place
+    if sys.byteorder == "little":
+        grid = grid.byteswap(inplace=True).view("int16")
+    return grid
+
+
+def get_snodas_grid_coords(
+    date: str | datetime.date | pd.Timestamp,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Cell center coordinates of the SNODAS masked grid for a date, as longitudes of the columns
+    (west to east) and latitudes of the rows (north to south). These can be used with
+    `wsfr_read.sites.SpatialIndex.raster_window` to subset a grid to a drainage basin."""
+    return _get_grid_coords(_get_extent(date))
+
+
+def _get_extent(date: str | datetime.date | pd.Timestamp) -> tuple[float, float]:
+    date = pd.to_datetime(date).date()
+    return EXTENT_BEFORE_CHANGE if date < EXTENT_CHANGE_DATE else EXTENT_AFTER_CHANGE
+
+
+def _get_grid_coords(extent: tuple[float, float]) -> tuple[np.ndarray, np.ndarray]:
+    minx, maxy = extent
+    x = minx + (np.arange(N_COLS) + 0.5) * CELL_SIZE
+    y = maxy - (np.arange(N_ROWS) + 0.5) * CELL_SIZE
+    return x, y
+
+
+class SnodasBasinMasks(NamedTuple):
+    """Grid cells of each drainage basin on the SNODAS masked grid, as a sparse list of flat
+    indices into the grid (row * N_COLS + col) and the position of the basin that each cell
+    belongs to. A cell belongs to a basin if its center is in the basin's polygon. Cells are
+    listed once per basin, so overlapping basins are supported."""
+
+    site_ids: np.ndarray
+    # int32 flat indices of the cells in each basin, sorted by label and then flat index
+    flat_indices: np.ndarray
+    # int32 position in site_ids of the basin for each flat index
+    labels: np.ndarray
+    # Number of cells in each basin
+    n_cells: np.ndarray
+
+
+def get_snodas_basin_masks(date: str | datetime.date | pd.Timestamp) -> SnodasBasinMasks:
+    """Masks of the drainage basins on the SNODAS grid for a date. The masks are rasterized from
+    geospatial.gpkg once per grid extent and kept in memory by the `wsfr_read.cache` data file
+    cache."""
+    return cached_read(GEOSPATIAL_FILE, _build_snodas_basin_masks, _get_extent(date))
+
+
+def _build_snodas_basin_masks(extent: tuple[float, float]) -> SnodasBasinMasks:
+    basins_index = read_spatial_index("basins")
+    x, y = _get_grid_coords(extent)
+    flat_indices = []
+    for site_id in basins_index.site_ids:
+        # Only test the cell centers in the window around the basin
+        rows, cols = basins_index.raster_window(site_id, x, y)
+        yy, xx = np.meshgrid(y[rows], x[cols], indexing="ij")
+        window_rows, window_cols = np.nonzero(
+            shapely.contains_xy(basins_index.geometry(site_id), xx, yy)
+        )
+        flat_indices.append(
+            ((window_rows + rows.start) * N_COLS + window_cols + cols.start).astype("int32")
+        )
+    n_cells = np.array([len(basin_indices) for basin_indices in flat_indices])
+    return SnodasBasinMasks(
+        site_ids=basins_index.site_ids,
+        flat_indices=np.concatenate(flat_indices),
+        labels=np.repeat(np.arange(len(flat_indices), dtype="int32"), n_cells),
+        n_cells=n_cells,
+    )
+
+
+def compute_snodas_basin_stats(
+    grid: np.ndarray,
+    masks: SnodasBasinMasks,
+    scale_factor: float = 1,
+    percentiles: Sequence[float] = (),
+) -> pd.DataFrame:
+    """Zonal statistics of a SNODAS grid for every drainage basin at once, with a single gather
+    of the basins' cells and bincounts over the basin labels. Cells without data are skipped.
+
+    Args:
+        grid (np.ndarray): SNODAS grid from `read_snodas_grid`
+        masks (SnodasBasinMasks): Basin masks for the grid's date from `get_snodas_basin_masks`
+        scale_factor (float): Divide the grid's values by this, e.g.,
+            `PRODUCTS[variable].scale_factor` to convert to physical units
+        percentiles (Sequence[float]): Percentiles between 0 and 100 of each basin's values to
+            also compute, with linear interpolation like `np.percentile`
+
+    Returns:
+        pd.DataFrame: dataframe with index "site_id" and columns "mean" and "sum" of the values
+            of the basin's cells with data, "covered_fraction" of the cells with data that have
+            a value greater than 0 (e.g., snow-covered for SWE), "count" of the cells with data,
+            "n_cells" in the basin, and "p{percentile}" for each percentile. Statistics of the
+            values are NaN if no cells have data.
+    """
+    n_basins = len(masks.site_ids)
+    values = grid.ravel()[masks.flat_indices]
+    is_valid = values != NODATA_VALUE
+    values = values[is_valid]
+    labels = masks.labels[is_valid]
+    sums = np.bincount(labels, weights=values, minlength=n_basins) / scale_factor
+    counts = np.bincount(labels, minlength=n_basins)
+    n_positive = np.bincount(labels, weights=values > 0, minlength=n_basins)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stats = {
+            "mean": np.where(counts > 0, sums / counts, np.nan),
+            "sum": sums,
+            "covered_fraction": np.where(counts > 0, n_positive / counts, np.nan),
+            "count": counts,
+            "n_cells": masks.n_cells,
+        }
+    if len(percentiles):
+        # Labels are sorted, so sorting by label and value puts each basin's sorted values in a
+        # contiguous segment
+        sorted_values = values[np.lexsort((values, labels))] / scale_factor
+        starts = np.cumsum(counts) - counts
+        has_data = counts > 0
+        for percentile in percentiles:
+            positions = starts + percentile / 100 * np.maximum(counts - 1, 0)
+            lower = np.clip(np.floor(positions).astype("int64"), 0, max(len(values) - 1, 0))
+            upper = np.clip(np.ceil(positions).astype("int64"), 0, max(len(values) - 1, 0))
+            if len(values):
+                interpolated = sorted_values[lower] + (
+                    sorted_values[upper] - sorted_values[lower]
+                ) * (positions - lower)
+            else:
+                interpolated = np.full(n_basins, np.nan)
+            stats[f"p{percentile:g}"] = np.where(has_data, interpolated, np.nan)
+    return pd.DataFrame(stats, index=pd.Index(masks.site_ids, name="site_id"))
+
+
+def read_snodas_basin_stats(
+    date: str | datetime.date | pd.Timestamp,
+    variable: VariableLike = "swe",
+    fy_start_month: int = 10,
+) -> pd.DataFrame:
+    """Read a SNODAS product for a date and compute its zonal statistics in physical units for
+    every drainage basin. See `compute_snodas_basin_stats`.
+
+    Args:
+        date (str | datetime.date | pd.Timestamp): Date of the data
+        variable (str | Variable): SNODAS product, e.g., "swe" for snow water equivalent
+        fy_start_month (int): Month that forecast years start, used to find the archive's
+            forecast year directory
+
+    Returns:
+        pd.DataFrame: dataframe with index "site_id" and columns "mean", "sum",
+            "covered_fraction", "count", and "n_cells"
+    """
+    grid = read_snodas_grid(date, variable, fy_start_month=fy_start_month)
+    return compute_snodas_basin_stats(
+        grid, get_snodas_basin_masks(date), PRODUCTS[Variable(variable)].scale_factor
+    )
@@ -0,0 +1,188 @@
+"""Daily SNODAS summaries for each drainage basin, saved as one small Parquet file per forecast
+year so that models can use SNODAS features without reading the daily archives at predict time.
+Build the summaries with `build_snodas_basin_summaries`, e.g., in your `preprocess` function, and
+read them with `read_snodas_basin_summary`.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import datetime
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from wsfr_read.cache import cached_read
+from wsfr_read.config import CACHE_ROOT, logger
+from wsfr_read.snowpack.snodas import (
+    PRODUCTS,
+    SNODAS_DIR,
+    Variable,
+    VariableLike,
+    compute_snodas_basin_stats,
+    get_snodas_basin_masks,
+    read_snodas_grid,
+)
+
+COMPILED_DIR_NAME = "snodas"
+DEFAULT_VARIABLES = (Variable.SWE, Variable.SNOW_DEPTH)
+PERCENTILES = (10, 50, 90)
+SUMMARY_STATS = ["mean", "covered_fraction"] + [f"p{percentile}" for percentile in PERCENTILES]
+
+
+def _get_summary_path(forecast_year: int, cache_dir: Path | None = None) -> Path:
+    cache_dir = cache_dir or CACHE_ROOT
+    if cache_dir is None:
+        raise ValueError("cache_dir must be provided if WSFR_CACHE_ROOT is not set.")
+    return Path(cache_dir) / COMPILED_DIR_NAME / f"FY{forecast_year}_basin_summary.parquet"
+
+
+def _get_archive_dates(forecast_year: int) -> pd.DatetimeIndex:
+    """Dates of the daily archives in a forecast year's directory."""
+    paths = (SNODAS_DIR / f"FY{forecast_year}").glob("SNODAS_*.tar")
+    return pd.to_datetime(
+        sorted(path.stem.removeprefix("SNODAS_") for path in paths), format="%Y%m%d"
+    )
+
+
+def _summarize_day(
+    date: pd.Timestamp, variables: tuple[Variable, ...], fy_start_month: int
+) -> pd.DataFrame | None:
+    """Basin summaries of each variable for a date, or None if the archive can't be read. Runs in
+    a worker process."""
+    masks = get_snodas_basin_masks(date)
+    stats_dfs = []
+    for variable in variables:
+        try:
+            grid = read_snodas_grid(date, variable, fy_start_month=fy_start_month)
+        except KeyError:
+            # Product missing from this day's archive
+            stats_dfs.append(
+                pd.DataFrame(
+                    np.nan,
+                    index=pd.Index(masks.site_ids, name="site_id"),
+                    columns=[f"{variable.value}_{stat}" for stat in SUMMARY_STATS],
+                )
+            )
+            continue
+        except Exception as e:
+            logger.warning("Failed to read SNODAS {} for {}: {}", variable.value, date.date(), e)
+            return None
+        stats_df = compute_snodas_basin_stats(
+            grid, masks, PRODUCTS[variable].scale_factor, percentiles=PERCENTILES
+        )
+        stats_dfs.append(stats_df[SUMMARY_STATS].add_prefix(f"{variable.value}_"))
+        del grid
+    df = pd.concat(stats_dfs, axis=1).astype("float32").reset_index()
+    df.insert(0, "date", date)
+    return df
+
+
+def build_snodas_basin_summaries(
+    forecast_years: Iterable[int] | None = None,
+    variables: Sequence[VariableLike] = DEFAULT_VARIABLES,
+    cache_dir: Path | None = None,
+    max_workers: int | None = None,
+    fy_start_month: int = 10,
+) -> list[Path]:
+    """Summarize the daily SNODAS archives of each forecast year for every drainage basin and save
+    them as a Parquet file per forecast year in `cache_dir`, with a row per date and site and
+    columns "{variable}_{statistic}" for the mean, covered fraction, and 10th, 50th, and 90th
+    percentiles of each variable. See `wsfr_read.snowpack.compute_snodas_basin_stats`.
+
+    Days are processed in parallel in a process pool. Building is incremental: days that are
+    already in a forecast year's file are skipped, so re-running after downloading new archives
+    only processes the new days. Days whose archive can't be read are logged and left out, and
+    are retried on the next run. To change the variables, delete the existing files first.
+
+    Args:
+        forecast_years (Iterable[int] | None): Forecast years to build. Default of None builds
+            all forecast years in the data directory.
+        variables (Sequence[str | Variable]): SNODAS products to summarize. Defaults to SWE and
+            snow depth.
+        cache_dir (Path | None): Directory to save summary files to. Files will be saved in a
+            subdirectory "snodas". Default of None uses the `WSFR_CACHE_ROOT` environment
+            variable.
+        max_workers (int | None): Number of worker processes. Default of None uses the number of
+            CPUs.
+        fy_start_month (int): Month that forecast years start
+
+    Returns:
+        list[Path]: Paths of the summary files.
+    """
+    variables = tuple(Variable(variable) for variable in variables)
+    if forecast_years is None:
+        forecast_years = sorted(int(path.name[2:]) for path in SNODAS_DIR.glob("FY*"))
+    summary_paths = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for forecast_year in forecast_years:
+            summary_path = _get_summary_path(forecast_year, cache_dir)
+            existing_df = pd.read_parquet(summary_path) if summary_path.exists() else None
+            processed_dates = pd.DatetimeIndex(
+                existing_df["date"].unique() if existing_df is not None else []
+            )
+            archive_dates = _get_archive_dates(forecast_year)
+            new_dates = list(archive_dates[~archive_dates.isin(processed_dates)])
+            logger.info(
+                "Summarizing {} new SNODAS days for FY{} ({} already processed)",
+                len(new_dates),
+                forecast_year,
+                len(processed_dates),
+            )
+            if new_dates:
+                day_dfs = executor.map(
+                    _summarize_day,
+                    new_dates,
+                    [variables] * len(new_dates),
+                    [fy_start_month] * len(new_dates),
+                )
+                dfs = [df for df in [existing_df, *day_dfs] if df is not None]
+                df = pd.concat(dfs, ignore_index=True).sort_values(
+                    ["date", "site_id"], kind="stable", ignore_index=True
+                )
+                summary_path.parent.mkdir(exist_ok=True, parents=True)
+                # Write to a temporary file first so that an interrupted run doesn't leave a
+                # partial file
+                tmp_path = summary_path.with_suffix(".tmp")
+                df.to_parquet(tmp_path, index=False)
+                tmp_path.replace(summary_path)
+            if summary_path.exists():
+                summary_paths.append(summary_path)
+    return summary_paths
+
+
+def read_snodas_basin_summary(
+    site_id: str,
+    issue_date: str | datetime.date | pd.Timestamp,
+    cache_dir: Path | None = None,
+) -> pd.DataFrame:
+    """Read daily SNODAS basin summaries from `build_snodas_basin_summaries` for a given forecast
+    site as of a given forecast issue date. Returns the summaries for the forecast year of the
+    issue date before the issue date.
+
+    Args:
+        site_id (str): Identifier for forecast site
+        issue_date (str | datetime.date | pd.Timestamp): Date that forecast is being issued for
+        cache_dir (Path | None): Directory with summary files. Default of None uses the
+            `WSFR_CACHE_ROOT` environment variable.
+
+    Returns:
+        pd.DataFrame: dataframe with index "date" and float32 columns "{variable}_{statistic}"
+    """
+    issue_date = pd.to_datetime(issue_date)
+    path = _get_summary_path(issue_date.year, cache_dir)
+    site_dfs = cached_read(path, _load_snodas_basin_summary, path)
+    if site_id not in site_dfs:
+        raise KeyError(f"No SNODAS summaries for site_id {site_id} in {path}")
+    site_df = site_dfs[site_id]
+    stop = np.searchsorted(site_df.index.values, issue_date.to_datetime64(), side="left")
+    return site_df.iloc[:stop].copy()
+
+
+def _load_snodas_basin_summary(path: Path) -> dict[str, pd.DataFrame]:
+    """Loads a summary file split into a dataframe per site indexed by date."""
+    df = pd.read_parquet(path)
+    return {
+        site_id: site_df.drop(columns="site_id").set_index("date").sort_index()
+        for site_id, site_df in df.groupby("site_id", sort=False)
+    }
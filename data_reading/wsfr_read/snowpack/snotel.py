@@ -0,0 +1,244 @@
+import datetime
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from wsfr_read.cache import cached_read, is_compiled_current
+from wsfr_read.config import CACHE_ROOT, DATA_ROOT, logger
+from wsfr_read.snowpack.utils import (
+    build_site_station_index,
+    get_cache_key_files,
+    get_compiled_path,
+    get_source_files,
+    load_compiled,
+    save_compiled,
+)
+
+SNOTEL_DIR = DATA_ROOT / "snotel"
+SITES_TO_SNOTEL_STATIONS_FILE = SNOTEL_DIR / "sites_to_snotel_stations.csv"
+COMPILED_DIR_NAME = "snotel"
+
+ELEMENT_CODES = (
+    "WTEQ",  # Snow Water Equivalent (in)
+    "SNWD",  # Snow Depth (in)
+    "PREC",  # Precipitation Accmulation (in)
+    "TMAX",  # Air Temperature Maximum (°F)
+    "TMIN",  # Air Temperature Minimum (°F)
+    "TAVG",  # Air Temperature Average (°F)
+)
+# Column names in the data files
+ELEMENT_COLUMNS = [f"{code}_DAILY" for code in ELEMENT_CODES]
+
+
+class SnotelForecastYear(NamedTuple):
+    """SNOTEL daily data for all stations in a forecast year, as a dense array with a row per
+    station and consecutive dates. Values are NaN for missing data."""
+
+    # Station triplets, e.g., "1005:CO:SNTL", sorted
+    station_triplets: np.ndarray
+    # Consecutive dates as datetime64[D]
+    dates: np.ndarray
+    # float32 array of shape (station, date, element), with elements in the order of ELEMENT_CODES
+    values: np.ndarray
+
+
+class SnotelArrays(NamedTuple):
+    """SNOTEL daily data for the stations of a site before an issue date."""
+
+    station_triplets: np.ndarray
+    # Whether each station is in the site's drainage basin, otherwise within its buffer
+    in_basin: np.ndarray
+    dates: np.ndarray
+    # float32 array of shape (station, date, element), with elements in the order of ELEMENT_CODES
+    values: np.ndarray
+
+
+def read_snotel(
+    site_id: str, issue_date: str | datetime.date | pd.Timestamp, in_basin_only: bool = False
+) -> pd.DataFrame:
+    """Read SNOTEL daily data from the stations near a given forecast site as of a given forecast
+    issue date. Stations are matched to sites with sites_to_snotel_stations.csv. Returns data for
+    the forecast year of the issue date before the issue date.
+
+    Args:
+        site_id (str): Identifier for forecast site
+        issue_date (str | datetime.date | pd.Timestamp): Date that forecast is being issued for
+        in_basin_only (bool): Whether to only include stations within the site's drainage basin.
+            Default False also includes stations within the buffer around the basin.
+
+    Returns:
+        pd.DataFrame: dataframe with index ("stationTriplet", "date") and float32 columns
+            ["WTEQ_DAILY", "SNWD_DAILY", "PREC_DAILY", "TMAX_DAILY", "TMIN_DAILY", "TAVG_DAILY"]
+    """
+    arrays = read_snotel_arrays(site_id, issue_date, in_basin_only=in_basin_only)
+    index = pd.MultiIndex.from_product(
+        [arrays.station_triplets, pd.DatetimeIndex(arrays.dates.astype("datetime64[ns]"))],
+        names=["stationTriplet", "date"],
+    )
+    return pd.DataFrame(
+        arrays.values.reshape(-1, len(ELEMENT_COLUMNS)), index=index, columns=ELEMENT_COLUMNS
+    )
+
+
+def read_snotel_arrays(
+    site_id: str, issue_date: str | datetime.date | pd.Timestamp, in_basin_only: bool = False
+) -> SnotelArrays:
+    """Same as `read_snotel`, but returns the data as arrays of shape (station, date, element)
+    without building a dataframe. The forecast year's data is loaded once, and the stations of
+    each site and the dates before the issue date are looked up from a prebuilt index.
+    """
+    issue_date = pd.to_datetime(issue_date)
+    forecast_year = issue_date.year
+    data = read_snotel_forecast_year(forecast_year)
+    positions, in_basin = _read_snotel_site_index(forecast_year).get(
+        site_id, (np.array([], dtype="int64"), np.array([], dtype=bool))
+    )
+    if in_basin_only:
+        positions, in_basin = positions[in_basin], in_basin[in_basin]
+    stop = np.searchsorted(data.dates, np.datetime64(issue_date.date()), side="left")
+    return SnotelArrays(
+        station_triplets=data.station_triplets[positions],
+        in_basin=in_basin,
+        dates=data.dates[:stop],
+        values=data.values[positions, :stop],
+    )
+
+
+def read_snotel_forecast_year(
+    forecast_year: int, cache_dir: Path | None = None
+) -> SnotelForecastYear:
+    """Read SNOTEL data for all stations in a forecast year. The arrays are kept in memory by the
+    `wsfr_read.cache` data file cache and should not be modified in place.
+
+    The station data files are consolidated into one array the first time a forecast year is
+    read. If a compiled file from `compile_snotel` exists in `cache_dir` and is newer than all of
+    the forecast year's station data files, it is loaded instead of the station data files. The
+    arrays are reloaded if station data files are added or removed or the compiled file changes.
+    Station data files are only checked against the compiled file when a forecast year is loaded,
+    so that lookups stay fast. To pick up station data files that were rewritten in place while
+    a process is running, rebuild the compiled file or call `wsfr_read.cache_clear`.
+
+    Args:
+        forecast_year (int): Forecast year
+        cache_dir (Path | None): Directory with compiled files. Default of None uses the
+            `WSFR_CACHE_ROOT` environment variable.
+
+    Returns:
+        SnotelForecastYear: Station triplets, dates, and array of values
+    """
+    compiled_path = get_compiled_path(COMPILED_DIR_NAME, forecast_year, cache_dir)
+    return cached_read(
+        get_cache_key_files(_get_forecast_year_dir(forecast_year), compiled_path),
+        _load_snotel_forecast_year,
+        forecast_year,
+        cache_dir,
+    )
+
+
+def _get_forecast_year_dir(forecast_year: int) -> Path:
+    return SNOTEL_DIR / f"FY{forecast_year}"
+
+
+def _load_snotel_forecast_year(forecast_year: int, cache_dir: Path | None) -> SnotelForecastYear:
+    compiled_path = get_compiled_path(COMPILED_DIR_NAME, forecast_year, cache_dir)
+    if compiled_path and is_compiled_current(
+        get_source_files(_get_forecast_year_dir(forecast_year)), compiled_path
+    ):
+        return load_compiled(compiled_path, SnotelForecastYear)
+    return _parse_snotel_forecast_year(forecast_year)
+
+
+def _parse_snotel_forecast_year(forecast_year: int) -> SnotelForecastYear:
+    paths = sorted(_get_forecast_year_dir(forecast_year).glob("*.csv"))
+    # Station triplets use ":" as the separator, which is replaced by "_" in file names
+    station_triplets = np.array([path.stem.replace("_", ":") for path in paths], dtype=str)
+    station_data = []
+    for path in paths:
+        df = pd.read_csv(path, index_col="date").reindex(columns=ELEMENT_COLUMNS)
+        station_data.append((df.index.values.astype("datetime64[D]"), df.to_numpy("float32")))
+
+    all_dates = np.concatenate(
+        [np.array([], dtype="datetime64[D]")] + [d for d, _ in station_data]
+    )
+    if len(all_dates):
+        dates = np.arange(all_dates.min(), all_dates.max() + 1, dtype="datetime64[D]")
+    else:
+        dates = all_dates
+    values = np.full((len(paths), len(dates), len(ELEMENT_CODES)), np.nan, dtype="float32")
+    for i, (station_dates, station_values) in enumerate(station_data):
+        if len(station_dates):
+            values[i, (station_dates - dates[0]).astype("int64")] = station_values
+    return SnotelForecastYear(station_triplets=station_triplets, dates=dates, values=values)
+
+
+def compile_snotel(
+    forecast_years: Iterable[int] | None = None,
+    cache_dir: Path | None = None,
+    overwrite: bool = False,
+) -> list[Path]:
+    """Consolidate the SNOTEL station data files of each forecast year into a single compiled
+    file in `cache_dir` with a float32 array of shape (station, date, element). Subsequent reads
+    load the compiled file instead of parsing every station's data file. Compiled files that are
+    newer than all of their forecast year's station data files are skipped unless `overwrite` is
+    True.
+
+    Since the data directory is read-only in the code execution runtime, you can, for example,
+    call this in your `preprocess` function with `cache_dir=preprocessed_dir`, and set the
+    `WSFR_CACHE_ROOT` environment variable to the same directory before importing `wsfr_read`.
+
+    Args:
+        forecast_years (Iterable[int] | None): Forecast years to compile. Default of None
+            compiles all forecast years in the data directory.
+        cache_dir (Path | None): Directory to save compiled files to. Files will be saved in a
+            subdirectory "snotel". Default of None uses the `WSFR_CACHE_ROOT` environment
+            variable.
+        overwrite (bool): Whether to recompile files that are up to date.
+
+    Returns:
+        list[Path]: Paths of the compiled files.
+    """
+    cache_dir = cache_dir or CACHE_ROOT
+    if cache_dir is None:
+        raise ValueError("cache_dir must be provided if WSFR_CACHE_ROOT is not set.")
+    if forecast_years is None:
+        forecast_years = sorted(int(path.name[2:]) for path in SNOTEL_DIR.glob("FY*"))
+    compiled_paths = []
+    for forecast_year in forecast_years:
+        compiled_path = get_compiled_path(COMPILED_DIR_NAME, forecast_year, cache_dir)
+        if overwrite or not is_compiled_current(
+            get_source_files(_get_forecast_year_dir(forecast_year)), compiled_path
+        ):
+            logger.debug("Compiling SNOTEL FY{} to {}", forecast_year, compiled_path)
+            save_compiled(compiled_path, _parse_snotel_forecast_year(forecast_year))
+        compiled_paths.append(compiled_path)
+    return compiled_paths
+
+
+def read_sites_to_snotel_stations() -> pd.DataFrame:
+    """Load the mapping of forecast sites to nearby SNOTEL stations, with columns "site_id",
+    "stationTriplet", and "in_basin"."""
+    return cached_read(SITES_TO_SNOTEL_STATIONS_FILE, _parse_sites_to_snotel_stations)
+
+
+def _parse_sites_to_snotel_stations() -> pd.DataFrame:
+    return pd.read_csv(SITES_TO_SNOTEL_STATIONS_FILE, dtype={"in_basin": bool})
+
+
+def _read_snotel_site_index(forecast_year: int) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Positions in the forecast year's data of each site's stations, and whether each station is
+    in the site's drainage basin. Stations without data in the forecast year are left out."""
+    return cached_read(
+        [_get_forecast_year_dir(forecast_year), SITES_TO_SNOTEL_STATIONS_FILE],
+        _build_snotel_site_index,
+        forecast_year,
+    )
+
+
+def _build_snotel_site_index(forecast_year: int) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    return build_site_station_index(
+        read_snotel_forecast_year(forecast_year).station_triplets,
+        read_sites_to_snotel_stations(),
+        station_col="stationTriplet",
+    )
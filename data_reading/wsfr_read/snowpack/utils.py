@@ -0,0 +1,80 @@
+from pathlib import Path
+from typing import NamedTuple, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from wsfr_read.config import CACHE_ROOT
+
+T = TypeVar("T", bound=NamedTuple)
+
+
+def get_compiled_path(
+    compiled_dir_name: str, forecast_year: int, cache_dir: Path | None = None
+) -> Path | None:
+    """Path to the compiled file for a forecast year of a station data source, or None if no
+    cache directory is configured."""
+    cache_dir = cache_dir or CACHE_ROOT
+    if cache_dir is None:
+        return None
+    return Path(cache_dir) / compiled_dir_name / f"FY{forecast_year}.npz"
+
+
+def get_source_files(forecast_year_dir: Path) -> list[Path]:
+    """The station data files of a forecast year and their directory, to check whether a
+    compiled file is current. Rewriting a data file in place, as the downloaders do, doesn't
+    change the directory's modification time, so the files themselves are checked. The directory
+    is included for files that are added or removed."""
+    return [forecast_year_dir, *sorted(forecast_year_dir.glob("*.csv"))]
+
+
+def get_cache_key_files(forecast_year_dir: Path, compiled_path: Path | None) -> list[Path]:
+    """Files that a forecast year's in-memory data is keyed on: the forecast year's directory,
+    which changes when station data files are added or removed, and the compiled file if there is
+    one, which changes when it is rebuilt. Lookups only check these files instead of listing and
+    checking every station data file. The station data files are checked against the compiled
+    file once, when the data is loaded (see `get_source_files`)."""
+    if compiled_path is not None and compiled_path.exists():
+        return [forecast_year_dir, compiled_path]
+    return [forecast_year_dir]
+
+
+def save_compiled(compiled_path: Path, arrays: NamedTuple):
+    """Save a named tuple of arrays to a compiled .npz file. The file is written to a temporary
+    file first so that an interrupted run doesn't leave a partial file that is newer than its
+    station data files."""
+    compiled_path.parent.mkdir(exist_ok=True, parents=True)
+    tmp_path = compiled_path.with_suffix(".tmp")
+    # Saved through a file object, since np.savez would add ".npz" to the temporary path
+    with tmp_path.open("wb") as fp:
+        np.savez(fp, **arrays._asdict())
+    tmp_path.replace(compiled_path)
+
+
+def load_compiled(compiled_path: Path, cls: type[T]) -> T:
+    """Load a named tuple of arrays from a compiled .npz file."""
+    with np.load(compiled_path) as npz:
+        return cls(**{field: npz[field] for field in cls._fields})
+
+
+def build_site_station_index(
+    station_ids: np.ndarray, sites_df: pd.DataFrame, station_col: str
+) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Map each site to the positions of its stations in `station_ids` and whether each station is
+    in the site's drainage basin. Stations not in `station_ids` are left out.
+
+    Args:
+        station_ids (np.ndarray): Station identifiers of a forecast year's data
+        sites_df (pd.DataFrame): Sites to stations mapping with columns "site_id", `station_col`,
+            and "in_basin"
+        station_col (str): Name of the station identifier column in sites_df
+    """
+    positions = pd.Index(station_ids).get_indexer(sites_df[station_col])
+    has_data = positions >= 0
+    positions = positions[has_data]
+    in_basin = sites_df["in_basin"].to_numpy(dtype=bool)[has_data]
+    site_ids = sites_df["site_id"].to_numpy()[has_data]
+    return {
+        site_id: (positions[rows], in_basin[rows])
+        for site_id, rows in pd.Series(site_ids).groupby(site_ids, sort=False).indices.items()
+    }
@@ -1,7 +1,17 @@
-from wsfr_read.streamflow.naturalized_flow import read_test_monthly_naturalized_flow
-from wsfr_read.streamflow.usgs_streamflow import read_usgs_streamflow_data
+from wsfr_read.streamflow.naturalized_flow import (
+    read_test_monthly_naturalized_flow,
+    read_test_monthly_naturalized_flow_batch,
+)
+from wsfr_read.streamflow.usgs_streamflow import (
+    read_usgs_streamflow_data,
+    read_usgs_streamflow_stats,
+    read_usgs_streamflow_stats_batch,
+)
 
 __all__ = [
     "read_test_monthly_naturalized_flow",
+    "read_test_monthly_naturalized_flow_batch",
     "read_usgs_streamflow_data",
+    "read_usgs_streamflow_stats",
+    "read_usgs_streamflow_stats_batch",
 ]
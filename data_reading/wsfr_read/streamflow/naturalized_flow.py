@@ -1,12 +1,35 @@
 import datetime
-from functools import cache
+from typing import Iterable, NamedTuple
 
+import numpy as np
 import pandas as pd
 
+from wsfr_read.cache import cached_read
 from wsfr_read.config import DATA_ROOT
 
 FILE = DATA_ROOT / "test_monthly_naturalized_flow.csv"
 
+# Spacing between (site_id, forecast_year) groups in the global sort key. Must be larger than any
+# month key (year * 12 + month).
+_GROUP_KEY_STRIDE = 1_000_000
+
+
+class _NaturalizedFlowIndex(NamedTuple):
+    """Monthly naturalized flow sorted by site_id, forecast_year, year, and month, with the
+    start and stop row positions of each (site_id, forecast_year) group."""
+
+    # Index ("year", "month") and column "volume"
+    df: pd.DataFrame
+    # (site_id, forecast_year) -> (start, stop) row positions
+    offsets: dict[tuple[str, int], tuple[int, int]]
+    # Unique (site_id, forecast_year) groups in sorted order, and their start positions
+    groups: pd.MultiIndex
+    group_starts: np.ndarray
+    # year * 12 + month for each row, sorted within each group
+    month_keys: np.ndarray
+    # Group position * _GROUP_KEY_STRIDE + month key for each row, sorted ascending
+    sort_keys: np.ndarray
+
 
 def read_test_monthly_naturalized_flow(
     site_id: str, issue_date: str | datetime.date | pd.Timestamp
@@ -23,19 +46,105 @@ def read_test_monthly_naturalized_flow(
     """
 
     issue_date = pd.to_datetime(issue_date)
-    df = _read_full_test_monthly_naturalized_flow()
-    df = df.loc[site_id].loc[issue_date.year]
-    # Subset by issue date
-    df = df[
-        (df["year"] < issue_date.year)
-        | ((df["year"] == issue_date.year) & (df["month"] < issue_date.month))
-    ]
-    return df.set_index(["year", "month"])
+    index = _read_test_monthly_naturalized_flow_index()
+    start, stop = index.offsets[(site_id, issue_date.year)]
+    # Subset by issue date with a binary search over the group's sorted months
+    stop = start + np.searchsorted(
+        index.month_keys[start:stop], issue_date.year * 12 + issue_date.month, side="left"
+    )
+    return index.df.iloc[start:stop].copy()
+
+
+def read_test_monthly_naturalized_flow_batch(
+    site_ids: Iterable[str], issue_dates: Iterable[str | datetime.date | pd.Timestamp]
+) -> pd.DataFrame:
+    """Read monthly antecedent naturalized flow for test set years for many pairs of site_id and
+    issue_date, e.g., all rows of a submission format. Each pair is subset to months before its
+    issue_date, like `read_test_monthly_naturalized_flow`. All pairs are looked up together with
+    a single binary search.
+
+    Args:
+        site_ids (Iterable[str]): Identifiers for forecast sites
+        issue_dates (Iterable[str | datetime.date | pd.Timestamp]): Issue dates, one per site_id
+
+    Returns:
+        pd.DataFrame: dataframe with index ("site_id", "issue_date", "year", "month") and column
+            "volume". Pairs without data for their site and forecast year have no rows.
+    """
+    site_ids = np.asarray(list(site_ids), dtype=object)
+    issue_dates = pd.to_datetime(list(issue_dates))
+    index = _read_test_monthly_naturalized_flow_index()
+
+    group_positions = index.groups.get_indexer(
+        pd.MultiIndex.from_arrays([site_ids, issue_dates.year])
+    )
+    has_data = group_positions >= 0
+    starts = np.where(has_data, index.group_starts[group_positions], 0)
+    stops = np.where(
+        has_data,
+        np.searchsorted(
+            index.sort_keys,
+            group_positions * _GROUP_KEY_STRIDE + issue_dates.year * 12 + issue_dates.month,
+            side="left",
+        ),
+        0,
+    )
+
+    # Row positions of all pairs' slices concatenated
+    lengths = stops - starts
+    pair_positions = np.repeat(np.arange(len(lengths)), lengths)
+    row_positions = starts[pair_positions] + (
+        np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    )
+    df = index.df.iloc[row_positions]
+    df.index = pd.MultiIndex.from_arrays(
+        [
+            site_ids[pair_positions],
+            issue_dates[pair_positions],
+            df.index.get_level_values("year"),
+            df.index.get_level_values("month"),
+        ],
+        names=["site_id", "issue_date", "year", "month"],
+    )
+    return df
+
+
+def _read_test_monthly_naturalized_flow_index() -> _NaturalizedFlowIndex:
+    """Loads the full 'test_monthly_naturalized_flow.csv' file sorted and indexed for as-of
+    lookups."""
+    return cached_read(FILE, _build_test_monthly_naturalized_flow_index)
+
+
+def _build_test_monthly_naturalized_flow_index() -> _NaturalizedFlowIndex:
+    df = _read_full_test_monthly_naturalized_flow().reset_index()
+    df = df.sort_values(
+        ["site_id", "forecast_year", "year", "month"], kind="stable", ignore_index=True
+    )
+    group_codes = df.groupby(["site_id", "forecast_year"], sort=False).ngroup().values
+    group_starts = np.flatnonzero(np.diff(group_codes, prepend=-1))
+    group_stops = np.append(group_starts[1:], len(df))
+    groups = pd.MultiIndex.from_frame(df.loc[group_starts, ["site_id", "forecast_year"]])
+    offsets = {
+        (site_id, int(forecast_year)): (int(start), int(stop))
+        for (site_id, forecast_year), start, stop in zip(groups, group_starts, group_stops)
+    }
+    month_keys = (df["year"].values * 12 + df["month"].values).astype("int64")
+    return _NaturalizedFlowIndex(
+        df=df.drop(columns=["site_id", "forecast_year"]).set_index(["year", "month"]),
+        offsets=offsets,
+        groups=groups,
+        group_starts=group_starts,
+        month_keys=month_keys,
+        sort_keys=group_codes * _GROUP_KEY_STRIDE + month_keys,
+    )
 
 
-@cache
 def _read_full_test_monthly_naturalized_flow():
     """Reads the full 'test_monthly_naturalized_flow.csv' file to a dataframe. You should use
     'read_test_monthly_naturalized_flow' instead to get subsetting to a particular site and by
     time for an issue date."""
+    return cached_read(FILE, _parse_test_monthly_naturalized_flow)
+
+
+def _parse_test_monthly_naturalized_flow():
     return pd.read_csv(FILE, index_col=["site_id", "forecast_year"])
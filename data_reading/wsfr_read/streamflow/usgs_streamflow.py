@@ -1,8 +1,11 @@
 import datetime
 from pathlib import Path
+from typing import Iterable, NamedTuple
 
+import numpy as np
 import pandas as pd
 
+from wsfr_read.cache import cached_read
 from wsfr_read.config import DATA_ROOT
 from wsfr_read.sites import read_metadata
 
@@ -12,6 +15,25 @@ MEAN_DISCHARGE_RAW_COL = "00060_Mean"
 MEAN_DISCHARGE_READABLE_COL = "discharge_cfs_mean"
 
 
+class StreamflowArrays(NamedTuple):
+    """Daily mean discharge for a site and forecast year as contiguous arrays sorted by date.
+    The cumulative arrays have one more element than `dates`, starting with 0, so that the total
+    over positions [i, j) is `cumulative_discharge[j] - cumulative_discharge[i]`."""
+
+    dates: np.ndarray
+    discharge_cfs_mean: np.ndarray
+    # Running sum of daily mean discharge (cfs-days), with missing values counted as 0
+    cumulative_discharge: np.ndarray
+    # Running count of days with non-missing discharge
+    cumulative_count: np.ndarray
+
+
+class StreamflowStats(NamedTuple):
+    total: float
+    mean: float
+    count: int
+
+
 def read_usgs_streamflow_data(
     site_id: str, issue_date: str | datetime.date | pd.Timestamp
 ) -> pd.DataFrame:
@@ -28,12 +50,136 @@ def read_usgs_streamflow_data(
 
     issue_date = pd.to_datetime(issue_date)
     path = get_path_to_file(site_id, issue_date)
-    df = pd.read_csv(path, parse_dates=["datetime"])
-    df = df[df["datetime"].dt.date < issue_date.date()][["datetime", MEAN_DISCHARGE_RAW_COL]]
+    stop = np.searchsorted(
+        _read_usgs_streamflow_arrays(path).dates, np.datetime64(issue_date.date()), side="left"
+    )
+    df = _read_full_usgs_streamflow_data(path).iloc[:stop][["datetime", MEAN_DISCHARGE_RAW_COL]]
     df = df.rename(columns={MEAN_DISCHARGE_RAW_COL: MEAN_DISCHARGE_READABLE_COL})
     return df.copy()
 
 
+def read_usgs_streamflow_stats(
+    site_id: str,
+    issue_date: str | datetime.date | pd.Timestamp,
+    n_days: int | None = None,
+) -> StreamflowStats:
+    """Summary statistics of USGS daily mean streamflow for a given forecast site as of a given
+    forecast issue date, computed from precomputed running sums of the forecast year's data.
+
+    Args:
+        site_id (str): Identifier for forecast site
+        issue_date (str | datetime.date | pd.Timestamp): Date that forecast is being issued for
+        n_days (int | None): If provided, only use the last n_days calendar days before the issue
+            date. Default None uses all data in the forecast year before the issue date.
+
+    Returns:
+        StreamflowStats: Tuple of total (sum of daily mean discharge in cfs-days), mean (mean of
+            daily mean discharge in cfs), and count (number of days with data). Missing days are
+            skipped. Mean is NaN if there are no days with data.
+    """
+    issue_date = pd.to_datetime(issue_date)
+    arrays = _read_usgs_streamflow_arrays(get_path_to_file(site_id, issue_date))
+    total, count = _sum_before(arrays, np.datetime64(issue_date.date()), n_days)
+    return StreamflowStats(
+        total=float(total), mean=float(total / count) if count else np.nan, count=int(count)
+    )
+
+
+def read_usgs_streamflow_stats_batch(
+    site_ids: Iterable[str],
+    issue_dates: Iterable[str | datetime.date | pd.Timestamp],
+    n_days: int | None = None,
+) -> pd.DataFrame:
+    """Summary statistics of USGS daily mean streamflow for many pairs of forecast site and issue
+    date, e.g., all rows of a submission format. See `read_usgs_streamflow_stats`. Each data file
+    is loaded once, and the pairs for a file are looked up together with a binary search.
+
+    Args:
+        site_ids (Iterable[str]): Identifiers for forecast sites
+        issue_dates (Iterable[str | datetime.date | pd.Timestamp]): Issue dates, one per site_id
+        n_days (int | None): If provided, only use the last n_days calendar days before each
+            issue date. Default None uses all data in the forecast year before the issue date.
+
+    Returns:
+        pd.DataFrame: Dataframe with index ("site_id", "issue_date") in the order of the inputs
+            and columns "total", "mean", and "count". Values are NaN for pairs with no data file.
+    """
+    index = pd.MultiIndex.from_arrays(
+        [list(site_ids), pd.to_datetime(list(issue_dates))], names=["site_id", "issue_date"]
+    )
+    end_dates = index.get_level_values("issue_date").values.astype("datetime64[D]")
+    total = np.full(len(index), np.nan)
+    count = np.full(len(index), np.nan)
+    groups = pd.DataFrame(
+        {
+            "site_id": index.get_level_values("site_id"),
+            "forecast_year": index.get_level_values("issue_date").year,
+        }
+    ).groupby(["site_id", "forecast_year"])
+    for (site_id, forecast_year), positions in groups.indices.items():
+        path = get_path_to_file(site_id, pd.Timestamp(year=forecast_year, month=1, day=1))
+        if not path.exists():
+            continue
+        total[positions], count[positions] = _sum_before(
+            _read_usgs_streamflow_arrays(path), end_dates[positions], n_days
+        )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(count > 0, total / count, np.nan)
+    return pd.DataFrame({"total": total, "mean": mean, "count": count}, index=index)
+
+
+def _sum_before(
+    arrays: StreamflowArrays, end_dates: np.datetime64 | np.ndarray, n_days: int | None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Total discharge and number of days with data before each end date, optionally limited to
+    the last n_days calendar days."""
+    stops = np.searchsorted(arrays.dates, end_dates, side="left")
+    if n_days is None:
+        starts = np.zeros_like(stops)
+    else:
+        starts = np.searchsorted(
+            arrays.dates, end_dates - np.timedelta64(n_days, "D"), side="left"
+        )
+    total = arrays.cumulative_discharge[stops] - arrays.cumulative_discharge[starts]
+    count = arrays.cumulative_count[stops] - arrays.cumulative_count[starts]
+    return total, count
+
+
+def _read_usgs_streamflow_arrays(path: Path) -> StreamflowArrays:
+    """Loads a full USGS streamflow data file as arrays with running sums for as-of lookups."""
+    return cached_read(path, _build_usgs_streamflow_arrays, path)
+
+
+def _build_usgs_streamflow_arrays(path: Path) -> StreamflowArrays:
+    df = _read_full_usgs_streamflow_data(path)
+    datetimes = df["datetime"]
+    if isinstance(datetimes.dtype, pd.DatetimeTZDtype):
+        # Use local dates like the data's timestamps
+        datetimes = datetimes.dt.tz_localize(None)
+    discharge = df[MEAN_DISCHARGE_RAW_COL].to_numpy(dtype="float64")
+    is_valid = ~np.isnan(discharge)
+    return StreamflowArrays(
+        dates=datetimes.values.astype("datetime64[D]"),
+        discharge_cfs_mean=discharge,
+        cumulative_discharge=np.concatenate(
+            [[0.0], np.cumsum(np.where(is_valid, discharge, 0.0))]
+        ),
+        cumulative_count=np.concatenate([[0], np.cumsum(is_valid)]),
+    )
+
+
+def _read_full_usgs_streamflow_data(path: Path) -> pd.DataFrame:
+    """Loads a full USGS streamflow data file. You should use the `read_usgs_streamflow_data`
+    function instead to properly subset by time."""
+    return cached_read(path, _parse_usgs_streamflow_data, path)
+
+
+def _parse_usgs_streamflow_data(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path, parse_dates=["datetime"])
+    # Sorted by date for as-of lookups
+    return df.sort_values("datetime", kind="stable", ignore_index=True)
+
+
 def get_path_to_file(site_id: str, issue_date: str | datetime.date | pd.Timestamp) -> Path:
     """Get path to data file given site_id and an issue_date (for the forecast year of that issue
     date).
@@ -1,4 +1,8 @@
 from wsfr_read.teleconnections.mjo import read_mjo_data
+from wsfr_read.teleconnections.monthly import (
+    MonthlyTeleconnections,
+    read_monthly_teleconnections,
+)
 from wsfr_read.teleconnections.nino_regions_sst import read_nino_regions_sst_data
 from wsfr_read.teleconnections.oni import read_oni_data
 from wsfr_read.teleconnections.pdo import read_pdo_data
@@ -6,7 +10,9 @@ from wsfr_read.teleconnections.pna import read_pna_data
 from wsfr_read.teleconnections.soi import read_soi_data
 
 __all__ = [
+    "MonthlyTeleconnections",
     "read_mjo_data",
+    "read_monthly_teleconnections",
     "read_nino_regions_sst_data",
     "read_oni_data",
     "read_pdo_data",
@@ -1,8 +1,10 @@
 import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+from wsfr_read.cache import cached_read
 from wsfr_read.config import DATA_ROOT
 
 FILE_PATH_PARTS = ("teleconnections", "mjo.txt")
@@ -29,10 +31,8 @@ def read_mjo_data(
     issue_date = pd.to_datetime(issue_date)
 
     df = _read_full_mjo_data(path=path)
-
-    df["DATE"] = pd.to_datetime(df["DATE"], format=DATE_COL_FORMAT)
-    df = df[df["DATE"] <= issue_date]
-    return df.copy()
+    stop = np.searchsorted(df["DATE"].values, issue_date.to_datetime64(), side="right")
+    return df.iloc[:stop].copy()
 
 
 def _read_full_mjo_data(path: Path | None = None) -> pd.DataFrame:
@@ -40,10 +40,16 @@ def _read_full_mjo_data(path: Path | None = None) -> pd.DataFrame:
     properly subset by time."""
 
     data_file = path or DATA_ROOT.joinpath(*FILE_PATH_PARTS)
+    return cached_read(data_file, _parse_mjo_data, data_file)
+
+
+def _parse_mjo_data(data_file: Path) -> pd.DataFrame:
     with data_file.open("r") as fp:
         # Read first line to get column headers
         cols = next(fp).split()
         # Skip next row which has the longitude of the index pattern centers
         next(fp)
         df = pd.read_csv(fp, sep=r"\s+", header=None, names=["DATE"] + cols, na_values=("*****",))
-    return df
+    df["DATE"] = pd.to_datetime(df["DATE"], format=DATE_COL_FORMAT)
+    # Sorted by date for as-of lookups
+    return df.sort_values("DATE", kind="stable", ignore_index=True)
@@ -0,0 +1,145 @@
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from wsfr_read.cache import cached_read
+from wsfr_read.config import DATA_ROOT
+from wsfr_read.teleconnections import mjo, nino_regions_sst, oni, pdo, pna, soi
+from wsfr_read.teleconnections.utils import month_key
+
+MJO_COLUMNS = [f"INDEX_{i}" for i in (9, 10, 1, 2, 3, 4, 5, 6, 7, 8)]
+NINO_REGIONS_SST_COLUMNS = [
+    "NINO1+2",
+    "NINO1+2 ANOM",
+    "NINO3",
+    "NINO3 ANOM",
+    "NINO4",
+    "NINO4 ANOM",
+    "NINO3.4",
+    "NINO3.4 ANOM",
+]
+
+
+class MonthlyTeleconnections:
+    """All teleconnection indices in one matrix with a row per month, where each row has the
+    values of every index that become available in that month. Availability follows the
+    conventions of the individual readers:
+
+    - PDO, PNA, SOI, and Niño regions SST: a month's value is available from the following month.
+    - ONI: a season's value is available from the month given by `oni.SEAS_TO_AVAILABLE_MONTH`
+      and `oni.SEAS_TO_AVAILABLE_YEAR_DELTA`, e.g., DJF is available from March.
+    - MJO: daily values are averaged over each calendar month, and the monthly mean is available
+      from the following month.
+
+    So, the row for the month of an issue date is the most recent data available as of that issue
+    date, and only contains data from before that issue date.
+
+    Args:
+        frame (pd.DataFrame): Dataframe with one float column per index and a monthly
+            pd.PeriodIndex of consecutive months, named "available_month".
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.columns = list(frame.columns)
+        self.values = frame.to_numpy(dtype="float64")
+        self._start_key = month_key(frame.index[0].year, frame.index[0].month)
+        # Values padded with a row of NaN that out-of-range lookups are pointed to
+        self._padded_values = np.vstack([self.values, np.full((1, len(self.columns)), np.nan)])
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated memory used by the matrix, for the `wsfr_read.cache` memory budget."""
+        return (
+            int(self.frame.memory_usage(deep=True).sum())
+            + self.values.nbytes
+            + self._padded_values.nbytes
+        )
+
+    def _row_positions(self, issue_dates: Iterable, n_months: int) -> np.ndarray:
+        issue_dates = pd.DatetimeIndex(pd.to_datetime(issue_dates))
+        positions = month_key(issue_dates.year.values, issue_dates.month.values) - self._start_key
+        positions = positions[:, None] - np.arange(n_months - 1, -1, -1)
+        out_of_range = (positions < 0) | (positions >= len(self.values))
+        positions[out_of_range] = len(self.values)
+        return positions
+
+    def window(self, issue_dates: Iterable, n_months: int = 1) -> np.ndarray:
+        """Values available as of each issue date for the last `n_months` months.
+
+        Args:
+            issue_dates (Iterable): Issue dates, anything pandas.to_datetime can parse.
+            n_months (int): Number of months in the window.
+
+        Returns:
+            np.ndarray: Array of shape (number of issue dates, n_months, number of columns),
+                ordered from oldest to most recent month. Months outside of the data are NaN.
+        """
+        return self._padded_values[self._row_positions(issue_dates, n_months)]
+
+    def window_frame(self, issue_dates: Iterable, n_months: int = 1) -> pd.DataFrame:
+        """Same as `window`, flattened to a dataframe with one row per issue date and columns
+        named "{column}_lag{i}", where lag 0 is the most recent month available as of the issue
+        date."""
+        values = self.window(issue_dates, n_months)[:, ::-1, :]
+        columns = [f"{col}_lag{lag}" for lag in range(n_months) for col in self.columns]
+        return pd.DataFrame(
+            values.reshape(len(values), -1),
+            index=pd.DatetimeIndex(pd.to_datetime(issue_dates), name="issue_date"),
+            columns=columns,
+        )
+
+
+def read_monthly_teleconnections() -> MonthlyTeleconnections:
+    """Loads MJO, Niño regions SST, ONI, PDO, PNA, and SOI data aligned to a single monthly matrix
+    by when each value becomes available. Use `MonthlyTeleconnections.window` or `window_frame`
+    to get the values available as of a batch of issue dates.
+
+    Returns:
+        MonthlyTeleconnections: Aligned teleconnection indices
+    """
+    paths = [
+        DATA_ROOT.joinpath(*module.FILE_PATH_PARTS)
+        for module in (mjo, nino_regions_sst, oni, pdo, pna, soi)
+    ]
+    return cached_read(paths, _build_monthly_teleconnections)
+
+
+def _build_monthly_teleconnections() -> MonthlyTeleconnections:
+    # Each series is indexed by the month key of the month that its values become available
+    series = []
+    for name, (df, month_keys) in (
+        ("pdo_index", pdo._read_long_pdo_data()),
+        ("pna_index", pna._read_long_pna_data()),
+        ("soi", soi._read_long_soi_data()),
+    ):
+        series.append(pd.Series(df[name].values, index=month_keys + 1, name=name))
+
+    oni_df = oni._read_full_oni_data()
+    oni_keys = month_key(
+        oni_df["YR"].values + oni_df["SEAS"].map(oni.SEAS_TO_AVAILABLE_YEAR_DELTA).values,
+        oni_df["SEAS"].map(oni.SEAS_TO_AVAILABLE_MONTH).values,
+    )
+    for col in ("TOTAL", "ANOM"):
+        series.append(pd.Series(oni_df[col].values, index=oni_keys, name=f"oni_{col.lower()}"))
+
+    nino_df = nino_regions_sst._read_full_nino_regions_sst_data()
+    nino_keys = month_key(nino_df["YR"].values, nino_df["MON"].values) + 1
+    for col in NINO_REGIONS_SST_COLUMNS:
+        name = col.lower().replace("+", "").replace(".", "").replace(" ", "_")
+        series.append(pd.Series(nino_df[col].values, index=nino_keys, name=name))
+
+    mjo_df = mjo._read_full_mjo_data()
+    mjo_keys = month_key(mjo_df["DATE"].dt.year.values, mjo_df["DATE"].dt.month.values) + 1
+    mjo_monthly_df = mjo_df[MJO_COLUMNS].groupby(mjo_keys).mean()
+    for col in MJO_COLUMNS:
+        series.append(mjo_monthly_df[col].rename(f"mjo_{col.lower()}"))
+
+    df = pd.concat(series, axis=1).astype("float64")
+    # Reindex to consecutive months
+    month_keys = np.arange(df.index.min(), df.index.max() + 1)
+    df = df.reindex(month_keys)
+    start = pd.Period(year=(month_keys[0] - 1) // 12, month=(month_keys[0] - 1) % 12 + 1, freq="M")
+    df.index = pd.period_range(start, periods=len(month_keys), freq="M", name="available_month")
+    return MonthlyTeleconnections(df)
@@ -3,6 +3,7 @@ from pathlib import Path
 
 import pandas as pd
 
+from wsfr_read.cache import cached_read
 from wsfr_read.config import DATA_ROOT
 
 FILE_PATH_PARTS = ("teleconnections", "nino_regions_sst.txt")
@@ -40,6 +41,10 @@ def _read_full_nino_regions_sst_data(path: Path | None = None) -> pd.DataFrame:
     """Loads the full Nino Regions SST dataframe. You should use the `read_nino_regions_sst_data`
     function instead to properly subset by time."""
     data_file = path or DATA_ROOT.joinpath(*FILE_PATH_PARTS)
+    return cached_read(data_file, _parse_nino_regions_sst_data, data_file)
+
+
+def _parse_nino_regions_sst_data(data_file: Path) -> pd.DataFrame:
     df = pd.read_csv(data_file, sep=r"\s+")
     # Rename "ANOM" columns to include region labels
     return df.rename(
@@ -3,6 +3,7 @@ from pathlib import Path
 
 import pandas as pd
 
+from wsfr_read.cache import cached_read
 from wsfr_read.config import DATA_ROOT
 
 FILE_PATH_PARTS = ("teleconnections", "oni.txt")
@@ -76,4 +77,8 @@ def _read_full_oni_data(path: Path | None = None) -> pd.DataFrame:
     """Loads the full ONI dataframe. You should use the `read_oni_data` function instead to
     properly subset by time."""
     path = path or DATA_ROOT.joinpath(*FILE_PATH_PARTS)
+    return cached_read(path, _parse_oni_data, path)
+
+
+def _parse_oni_data(path: Path) -> pd.DataFrame:
     return pd.read_csv(path, sep=r"\s+")
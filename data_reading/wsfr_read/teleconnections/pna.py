@@ -1,9 +1,12 @@
 import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+from wsfr_read.cache import cached_read
 from wsfr_read.config import DATA_ROOT
+from wsfr_read.teleconnections.utils import melt_monthly_table, month_key, monthly_asof_slice
 
 FILE_PATH_PARTS = ("teleconnections", "pna.txt")
 
@@ -22,30 +25,32 @@ def read_pna_data(
             path relative to the data root directory.
 
     Returns:
-        pd.DataFrame: Dataframe with the columns "year", "month", "pna_index"
+        pd.DataFrame: Dataframe with the columns "year", "month", "pna_index".
     """
     issue_date = pd.to_datetime(issue_date)
 
-    # Melt to get long format
-    df = pd.melt(
-        frame=_read_full_pna_data(path=path),
-        id_vars=("year",),
-        var_name="month",
-        value_name="pna_index",
-    )
-    # Convert month abbrevation to number value
-    df["month"] = df["month"].apply(datetime.datetime.strptime, args=(r"%b",)).dt.month
-    df = df.sort_values(["year", "month"], ignore_index=True)
-    # Subset by issue_date
-    df = df[
-        (df["year"] < issue_date.year)
-        | ((df["year"] == issue_date.year) & (df["month"] < issue_date.month))
-    ]
-    return df
+    df, month_keys = _read_long_pna_data(path=path)
+    return monthly_asof_slice(df, month_keys, issue_date)
+
+
+def _read_long_pna_data(path: Path | None = None) -> tuple[pd.DataFrame, np.ndarray]:
+    """Loads the PNA index data in long format with columns "year", "month", and
+    "pna_index", sorted by month, along with an array of month keys for as-of lookups."""
+    path = path or DATA_ROOT.joinpath(*FILE_PATH_PARTS)
+    return cached_read(path, _normalize_pna_data, path)
+
+
+def _normalize_pna_data(path: Path) -> tuple[pd.DataFrame, np.ndarray]:
+    df = melt_monthly_table(_parse_pna_data(path), year_col="year", value_name="pna_index")
+    return df, month_key(df["year"].values, df["month"].values)
 
 
 def _read_full_pna_data(path: Path | None = None) -> pd.DataFrame:
     """Loads the full PNA dataframe. You should use the `read_pna_data` function instead to
     properly subset by time."""
     path = path or DATA_ROOT.joinpath(*FILE_PATH_PARTS)
+    return cached_read(path, _parse_pna_data, path)
+
+
+def _parse_pna_data(path: Path) -> pd.DataFrame:
     return pd.read_fwf(path, widths=(4,) + (7,) * 12).rename(columns={"Unnamed: 0": "year"})
@@ -1,9 +1,12 @@
 import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+from wsfr_read.cache import cached_read
 from wsfr_read.config import DATA_ROOT
+from wsfr_read.teleconnections.utils import melt_monthly_table, month_key, monthly_asof_slice
 
 FILE_PATH_PARTS = ("teleconnections", "soi.txt")
 
@@ -22,34 +25,36 @@ def read_soi_data(
             path relative to the data root directory.
 
     Returns:
-        pd.DataFrame: Dataframe with the columns "year", "month", "soi"
+        pd.DataFrame: Dataframe with the columns "year", "month", "soi".
     """
     issue_date = pd.to_datetime(issue_date)
 
-    # Melt to get long format
-    df = pd.melt(
-        frame=_read_full_soi_data(path=path),
-        id_vars=("YEAR",),
-        var_name="month",
-        value_name="soi",
-    )
-    df = df.rename(columns={"YEAR": "year"})
-    # Convert month abbrevation to number value
-    df["month"] = df["month"].apply(datetime.datetime.strptime, args=(r"%b",)).dt.month
-    df = df.sort_values(["year", "month"], ignore_index=True)
-    df = df[
-        (df["year"] < issue_date.year)
-        | ((df["year"] == issue_date.year) & (df["month"] < issue_date.month))
-    ]
-    return df
+    df, month_keys = _read_long_soi_data(path=path)
+    return monthly_asof_slice(df, month_keys, issue_date)
+
+
+def _read_long_soi_data(path: Path | None = None) -> tuple[pd.DataFrame, np.ndarray]:
+    """Loads the SOI data in long format with columns "year", "month", and "soi", sorted
+    by month, along with an array of month keys for as-of lookups."""
+    path = path or DATA_ROOT.joinpath(*FILE_PATH_PARTS)
+    return cached_read(path, _normalize_soi_data, path)
+
+
+def _normalize_soi_data(path: Path) -> tuple[pd.DataFrame, np.ndarray]:
+    df = melt_monthly_table(_parse_soi_data(path), year_col="YEAR", value_name="soi")
+    return df, month_key(df["year"].values, df["month"].values)
 
 
 def _read_full_soi_data(path: Path | None = None) -> pd.DataFrame:
     """Loads full SOI dataframe. You should use the `read_soi_data` function instead to properly
     subset by time."""
+    path = path or DATA_ROOT.joinpath(*FILE_PATH_PARTS)
+    return cached_read(path, _parse_soi_data, path)
+
+
+def _parse_soi_data(path: Path) -> pd.DataFrame:
     # Raw data file contains two fixed-width files: first is not standardized, and second is
     # standardized. The standardized values are the most common representation of SOI.
-    path = path or DATA_ROOT.joinpath(*FILE_PATH_PARTS)
     with path.open("r") as fp:
         # Get line number that contains "STANDARDIZED DATA"
         line_no = 0
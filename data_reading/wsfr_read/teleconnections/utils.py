@@ -0,0 +1,37 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+
+def month_key(year: int | np.ndarray, month: int | np.ndarray) -> int | np.ndarray:
+    """Integer key for a calendar month that increases by one each month, i.e., year * 12 +
+    month."""
+    return year * 12 + month
+
+
+def melt_monthly_table(df: pd.DataFrame, year_col: str, value_name: str) -> pd.DataFrame:
+    """Convert a table with one row per year and one column per month (named by month
+    abbreviations, e.g., "Jan") to a long-format dataframe with columns "year", "month", and
+    `value_name`, sorted by year and month."""
+    # Convert month abbreviations to numbers once per column rather than once per row
+    month_numbers = {
+        col: datetime.datetime.strptime(col, r"%b").month for col in df.columns if col != year_col
+    }
+    df = pd.melt(
+        frame=df.rename(columns=month_numbers),
+        id_vars=(year_col,),
+        var_name="month",
+        value_name=value_name,
+    )
+    df = df.rename(columns={year_col: "year"}).astype({"month": "int32"})
+    return df.sort_values(["year", "month"], ignore_index=True)
+
+
+def monthly_asof_slice(
+    df: pd.DataFrame, month_keys: np.ndarray, issue_date: pd.Timestamp
+) -> pd.DataFrame:
+    """Rows of a dataframe sorted by month for months before the month of issue_date, as a copy
+    so that callers can't modify cached data."""
+    stop = np.searchsorted(month_keys, month_key(issue_date.year, issue_date.month), side="left")
+    return df.iloc[:stop].copy()
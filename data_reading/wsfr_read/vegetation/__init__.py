@@ -0,0 +1,5 @@
+from wsfr_read.vegetation.modis_vegetation import read_modis_vegetation
+
+__all__ = [
+    "read_modis_vegetation",
+]
@@ -0,0 +1,228 @@
+import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+import geopandas as gpd
+import netCDF4
+import numpy as np
+import pandas as pd
+import shapely
+
+from wsfr_read.cache import cached_read
+from wsfr_read.config import DATA_ROOT, GEOSPATIAL_FILE, logger
+from wsfr_read.sites import raster_window_for_bounds, read_spatial_index
+
+MODIS_DIR = DATA_ROOT / "modis_vegetation"
+SITES_TO_ITEMS_FILE_NAME = "sites_to_items.csv"
+VEGETATION_FILE_NAME = "vegetation.nc"
+
+# Vegetation index name -> variable in vegetation.nc
+BANDS = {
+    "ndvi": "500m_16_days_NDVI",
+    "evi": "500m_16_days_EVI",
+}
+# Stored integers times the scale factor are index values
+SCALE_FACTOR = 0.0001
+# Fill value used by MOD13A1/MYD13A1 if the file doesn't have a "nodata" attribute
+NODATA_VALUE = -3000
+
+
+class ModisWindow(NamedTuple):
+    """Pixel window of a MODIS tile that covers a drainage basin."""
+
+    rows: slice
+    cols: slice
+    # Boolean array of the window's shape, True for pixels with centers in the basin
+    mask: np.ndarray
+
+
+def read_modis_vegetation(
+    site_id: str, issue_date: str | datetime.date | pd.Timestamp
+) -> pd.DataFrame:
+    """Read MODIS vegetation index statistics for a given forecast site's drainage basin for the
+    16-day composites that ended before a given forecast issue date, for the forecast year of the
+    issue date. Statistics of the basin's pixels are combined over all MODIS tiles that the basin
+    spans. Pixels without data are skipped.
+
+    Only the pixel window of each tile that covers the basin is read. The statistics of all of a
+    site's composites in a forecast year are computed the first time the site is read, and kept
+    in memory by the `wsfr_read.cache` data file cache until sites_to_items.csv or any of the
+    site's vegetation.nc files changes, or a missing vegetation.nc file is added.
+
+    Args:
+        site_id (str): Identifier for forecast site
+        issue_date (str | datetime.date | pd.Timestamp): Date that forecast is being issued for
+
+    Returns:
+        pd.DataFrame: dataframe with index ("start_date", "end_date") of the composites' date
+            ranges, sorted by end_date, and columns "ndvi_mean", "evi_mean", "ndvi_count",
+            "evi_count" (number of pixels with data), and "n_cells" (number of pixels in the
+            basin)
+    """
+    issue_date = pd.to_datetime(issue_date)
+    forecast_year = issue_date.year
+    stats_df = cached_read(
+        _get_source_files(forecast_year, site_id),
+        _build_modis_vegetation_stats,
+        forecast_year,
+        site_id,
+    )
+    stop = np.searchsorted(
+        stats_df.index.get_level_values("end_date").values,
+        issue_date.to_datetime64(),
+        side="left",
+    )
+    return stats_df.iloc[:stop].copy()
+
+
+def _get_sites_to_items_path(forecast_year: int) -> Path:
+    return MODIS_DIR / f"FY{forecast_year}" / SITES_TO_ITEMS_FILE_NAME
+
+
+def _get_item_path(forecast_year: int, item_id: str) -> Path:
+    return MODIS_DIR / f"FY{forecast_year}" / item_id / VEGETATION_FILE_NAME
+
+
+def _get_source_files(forecast_year: int, site_id: str | None = None) -> list[Path]:
+    """sites_to_items.csv and the vegetation.nc files that exist for a site's items, or for all
+    items if `site_id` is None. Since cache keys include the paths, adding a missing
+    vegetation.nc file also changes the key."""
+    item_paths = _read_item_paths(forecast_year)
+    if site_id is None:
+        paths = sorted({path for site_paths in item_paths.values() for path in site_paths})
+    else:
+        paths = item_paths.get(site_id, [])
+    return [_get_sites_to_items_path(forecast_year), *(path for path in paths if path.exists())]
+
+
+def _read_item_paths(forecast_year: int) -> dict[str, list[Path]]:
+    """Paths of the vegetation.nc files of each site's items, whether they exist or not."""
+    return cached_read(_get_sites_to_items_path(forecast_year), _build_item_paths, forecast_year)
+
+
+def _build_item_paths(forecast_year: int) -> dict[str, list[Path]]:
+    sites_df = read_sites_to_items(forecast_year)
+    return {
+        site_id: [_get_item_path(forecast_year, item_id) for item_id in site_df["item_id"]]
+        for site_id, site_df in sites_df.groupby("site_id", sort=False)
+    }
+
+
+def read_sites_to_items(forecast_year: int) -> pd.DataFrame:
+    """Load the mapping of forecast sites to MODIS items for a forecast year, with columns
+    "site_id", "item_id", "tile" (e.g., "h09v04"), "start_date", and "end_date"."""
+    path = _get_sites_to_items_path(forecast_year)
+    return cached_read(path, _parse_sites_to_items, path)
+
+
+def _parse_sites_to_items(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path, usecols=["site_id", "item_id", "start_datetime", "end_datetime"])
+    # Item IDs are like "MOD13A1.A2004273.h08v05.061.2020206215108"
+    df["tile"] = df["item_id"].str.split(".").str[2]
+    for col in ("start", "end"):
+        df[f"{col}_date"] = (
+            pd.to_datetime(df.pop(f"{col}_datetime"), utc=True).dt.tz_localize(None).dt.normalize()
+        )
+    return df
+
+
+def _read_item_grid(path: Path) -> tuple[np.ndarray, np.ndarray, str]:
+    """Cell center coordinates of the columns and rows of a MODIS item, and the WKT of its CRS.
+    Only the coordinate variables are read."""
+    with netCDF4.Dataset(path) as ds:
+        x = np.asarray(ds.variables["x"][:], dtype="float64")
+        y = np.asarray(ds.variables["y"][:], dtype="float64")
+        grid_mapping = ds.variables[BANDS["ndvi"]].getncattr("grid_mapping")
+        crs_wkt = ds.variables[grid_mapping].getncattr("crs_wkt")
+    return x, y, crs_wkt
+
+
+def _read_modis_site_windows(forecast_year: int) -> dict[tuple[str, str], ModisWindow]:
+    """Pixel windows of each (site_id, tile) in a forecast year. Tiles have the same grid for all
+    composites, so the window is computed once per tile from one of its items."""
+    return cached_read(
+        [*_get_source_files(forecast_year), GEOSPATIAL_FILE],
+        _build_modis_site_windows,
+        forecast_year,
+    )
+
+
+def _build_modis_site_windows(forecast_year: int) -> dict[tuple[str, str], ModisWindow]:
+    sites_df = read_sites_to_items(forecast_year)
+    basins_index = read_spatial_index("basins")
+    basins = gpd.GeoSeries(basins_index.geometries, index=basins_index.site_ids)
+    basins = basins.set_crs(basins_index.crs)
+    projected_basins = {}
+    windows = {}
+    for tile, tile_df in sites_df.groupby("tile"):
+        paths = [_get_item_path(forecast_year, item_id) for item_id in tile_df["item_id"]]
+        paths = [path for path in paths if path.exists()]
+        if not paths:
+            continue
+        x, y, crs_wkt = _read_item_grid(paths[0])
+        if crs_wkt not in projected_basins:
+            projected_basins[crs_wkt] = basins.to_crs(crs_wkt)
+        for site_id in tile_df["site_id"].unique():
+            geometry = projected_basins[crs_wkt][site_id]
+            rows, cols = raster_window_for_bounds(geometry.bounds, x, y)
+            yy, xx = np.meshgrid(y[rows], x[cols], indexing="ij")
+            mask = shapely.contains_xy(geometry, xx, yy)
+            if mask.any():
+                windows[(site_id, tile)] = ModisWindow(rows=rows, cols=cols, mask=mask)
+    return windows
+
+
+def _read_window(variable: netCDF4.Variable, window: ModisWindow) -> np.ndarray:
+    """Read only a window of a variable with dimensions ("time", "y", "x") in any order."""
+    slices = {"time": 0, "y": window.rows, "x": window.cols}
+    return np.asarray(variable[tuple(slices[dim] for dim in variable.dimensions)])
+
+
+def _build_modis_vegetation_stats(forecast_year: int, site_id: str) -> pd.DataFrame:
+    sites_df = read_sites_to_items(forecast_year)
+    windows = _read_modis_site_windows(forecast_year)
+    records = []
+    missing_paths = []
+    for item in sites_df[sites_df["site_id"] == site_id].itertuples():
+        window = windows.get((site_id, item.tile))
+        path = _get_item_path(forecast_year, item.item_id)
+        if not path.exists():
+            missing_paths.append(path)
+            continue
+        if window is None:
+            # Basin doesn't contain any pixel centers of the tile
+            continue
+        record = {
+            "start_date": item.start_date,
+            "end_date": item.end_date,
+            "n_cells": int(window.mask.sum()),
+        }
+        with netCDF4.Dataset(path) as ds:
+            ds.set_auto_maskandscale(False)
+            for name, band in BANDS.items():
+                variable = ds.variables[band]
+                nodata = getattr(variable, "nodata", NODATA_VALUE)
+                values = _read_window(variable, window)[window.mask]
+                values = values[values != nodata]
+                record[f"{name}_sum"] = values.sum(dtype="float64") * SCALE_FACTOR
+                record[f"{name}_count"] = len(values)
+        records.append(record)
+    if missing_paths:
+        logger.warning(
+            "Skipped {} MODIS items of {} without a vegetation file, e.g., {}",
+            len(missing_paths),
+            site_id,
+            missing_paths[0],
+        )
+
+    columns = ["n_cells"] + [f"{name}_{stat}" for name in BANDS for stat in ("sum", "count")]
+    df = pd.DataFrame.from_records(records, columns=["start_date", "end_date"] + columns)
+    # Combine the tiles of each composite
+    df = df.groupby(["start_date", "end_date"])[columns].sum()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for name in BANDS:
+            df[f"{name}_mean"] = df.pop(f"{name}_sum") / df[f"{name}_count"].where(
+                df[f"{name}_count"] > 0
+            )
+    df = df[[f"{name}_mean" for name in BANDS] + [f"{name}_count" for name in BANDS] + ["n_cells"]]
+    return df.sort_index(level=["end_date", "start_date"])